@@ -1,20 +1,146 @@
 import requests
+import hashlib
 import json
+import random
+import threading
+import os
 import time
+from collections import deque
 from datetime import datetime
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+import click
 from config import Config
+from database import execute_single, execute_insert
+
+# Bump whenever _create_evaluation_prompt() or the system message changes,
+# so cached evaluations made with the old prompt are no longer served
+PROMPT_VERSION = '1'
+PROMPT_FIELDS = ('title', 'problem_statement', 'solution_description', 'category', 'development_stage',
+                 'target_market', 'budget_range', 'timeline', 'tags')
+
+def evaluation_cache_key(idea_data, model, prompt_version=PROMPT_VERSION):
+    payload = {
+        'fields': {field: idea_data.get(field) for field in PROMPT_FIELDS},
+        'model': model,
+        'prompt_version': prompt_version
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class EvaluationError(Exception):
+    pass
+
+def retry_after_seconds(response):
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class LLMClientMetrics:
+    # One sample per HTTP attempt, retries included
+    def __init__(self, max_samples=500):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=max_samples)
+        self._attempts = 0
+        self._retries = 0
+        self._failures = 0
+        self._statuses = {}
+        self._prompt_tokens = 0
+        self._completion_tokens = 0
+
+    def record(self, attempt, status, elapsed_ms, usage=None):
+        with self._lock:
+            self._samples.append(elapsed_ms)
+            self._attempts += 1
+            if attempt > 0:
+                self._retries += 1
+            self._statuses[str(status)] = self._statuses.get(str(status), 0) + 1
+            if usage:
+                self._prompt_tokens += usage.get('prompt_tokens', 0)
+                self._completion_tokens += usage.get('completion_tokens', 0)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+
+    def stats(self):
+        with self._lock:
+            samples = sorted(self._samples)
+            return {
+                'attempts': self._attempts,
+                'retries': self._retries,
+                'failures': self._failures,
+                'statuses': dict(self._statuses),
+                'prompt_tokens': self._prompt_tokens,
+                'completion_tokens': self._completion_tokens,
+                'p50_ms': round(samples[len(samples) // 2], 1) if samples else None,
+                'p95_ms': round(samples[int(len(samples) * 0.95)], 1) if samples else None,
+                'max_ms': round(samples[-1], 1) if samples else None
+            }
 
 class IdeaEvaluator:
-    def __init__(self):
-        self.api_url = Config.GROQ_API_URL
-        self.api_key = Config.GROQ_API_KEY
-        self.model = Config.GROQ_MODEL
+    def __init__(self, api_url=None, api_key=None, model=None):
+        self.api_url = api_url or Config.GROQ_API_URL
+        self.api_key = api_key or Config.GROQ_API_KEY
+        self.model = model or Config.GROQ_MODEL
+        self.cache_ttl = Config.EVALUATION_CACHE_TTL
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.max_retries = Config.LLM_MAX_RETRIES
+        self.backoff_base = Config.LLM_BACKOFF_BASE
+        self.backoff_max = Config.LLM_BACKOFF_MAX
+        self.timeout = (Config.LLM_CONNECT_TIMEOUT, Config.LLM_READ_TIMEOUT)
+        self.metrics = LLMClientMetrics()
+        self.session = self._create_session(Config.LLM_POOL_SIZE)
+    
+    def _create_session(self, pool_size):
+        # Kept for the evaluator's lifetime so connections (and TLS sessions)
+        # are reused; retries are handled in _call_llama_api, not by urllib3
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        })
+        return session
+    
+    def close(self):
+        self.session.close()
+    
+    def _backoff_delay(self, attempt, response=None):
+        retry_after = retry_after_seconds(response) if response is not None else None
+        if retry_after is not None:
+            return retry_after
+        # Full jitter keeps retries from many workers from arriving together
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
         
-    def evaluate_idea(self, idea_data):
-       
+    def evaluate_idea(self, idea_data, force_refresh=False, strict=False):
+        # strict raises EvaluationError instead of returning the placeholder
+        # fallback, for callers that must not store it as a real result
         try:
+            cache_key = evaluation_cache_key(idea_data, self.model)
+            if not force_refresh:
+                cached = self._get_cached_evaluation(cache_key)
+                if cached is not None:
+                    self.cache_hits += 1
+                    return cached
+            self.cache_misses += 1
+            
             if not self.api_key or self.api_key == 'your_groq_api_key_here':
                 print("Warning: No valid API key found, falling back to mock evaluation")
+                if strict:
+                    raise EvaluationError('No valid API key configured')
                 return self._get_fallback_evaluation()
                 
             prompt = self._create_evaluation_prompt(idea_data)
@@ -23,14 +149,45 @@ class IdeaEvaluator:
             
             if response:
                 evaluation = self._parse_evaluation_response(response)
+                self._store_cached_evaluation(cache_key, evaluation)
                 return evaluation
             else:
+                if strict:
+                    raise EvaluationError('LLM API request failed')
                 return self._get_fallback_evaluation()
                 
+        except EvaluationError:
+            raise
         except Exception as e:
             print(f"Error evaluating idea: {e}")
+            if strict:
+                raise EvaluationError(str(e))
             return self._get_fallback_evaluation()
     
+    def _get_cached_evaluation(self, cache_key):
+        if self.cache_ttl <= 0:
+            return None
+        try:
+            row = execute_single('''SELECT evaluation_data FROM evaluation_cache 
+                                    WHERE cache_key = ? AND created_at > ?''',
+                                 (cache_key, time.time() - self.cache_ttl))
+        except Exception as e:
+            print(f"Warning: evaluation cache lookup failed: {e}")
+            return None
+        return json.loads(row[0]) if row else None
+    
+    def _store_cached_evaluation(self, cache_key, evaluation):
+        # Only parsed API responses are stored; fallbacks are never cached
+        if self.cache_ttl <= 0:
+            return
+        try:
+            execute_insert('''INSERT OR REPLACE INTO evaluation_cache 
+                              (cache_key, model, prompt_version, evaluation_data, created_at)
+                              VALUES (?, ?, ?, ?, ?)''',
+                           (cache_key, self.model, PROMPT_VERSION, json.dumps(evaluation), time.time()))
+        except Exception as e:
+            print(f"Warning: evaluation cache store failed: {e}")
+    
     def _create_evaluation_prompt(self, idea_data):
         prompt = f"""
 You are an expert business consultant and startup advisor. Please evaluate the following business idea comprehensively and provide a detailed analysis.
@@ -97,11 +254,6 @@ Focus on being constructive, realistic, and actionable in your feedback. Conside
         return prompt
     
     def _call_llama_api(self, prompt):
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
         payload = {
             "model": self.model,
             "messages": [
@@ -119,24 +271,37 @@ Focus on being constructive, realistic, and actionable in your feedback. Conside
             "top_p": 0.9
         }
         
-        try:
-            response = requests.post(
-                self.api_url,
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result['choices'][0]['message']['content']
-            else:
-                print(f"API Error: {response.status_code} - {response.text}")
-                return None
+        for attempt in range(self.max_retries + 1):
+            response = None
+            start = time.perf_counter()
+            try:
+                response = self.session.post(self.api_url, json=payload, timeout=self.timeout)
                 
-        except requests.exceptions.RequestException as e:
-            print(f"Request failed: {e}")
-            return None
+                if response.status_code == 200:
+                    result = response.json()
+                    self.metrics.record(attempt, 200, (time.perf_counter() - start) * 1000, result.get('usage'))
+                    return result['choices'][0]['message']['content']
+                
+                self.metrics.record(attempt, response.status_code, (time.perf_counter() - start) * 1000)
+                if response.status_code not in RETRY_STATUSES:
+                    print(f"API Error: {response.status_code} - {response.text}")
+                    break
+                print(f"API Error: {response.status_code} (attempt {attempt + 1})")
+                
+            except requests.exceptions.RequestException as e:
+                self.metrics.record(attempt, type(e).__name__, (time.perf_counter() - start) * 1000)
+                print(f"Request failed (attempt {attempt + 1}): {e}")
+            
+            if attempt == self.max_retries:
+                break
+            delay = self._backoff_delay(attempt, response)
+            if delay > self.backoff_max:
+                print(f"Retry-After of {delay:.0f}s exceeds the backoff limit, giving up")
+                break
+            time.sleep(delay)
+        
+        self.metrics.record_failure()
+        return None
     
     def _parse_evaluation_response(self, response_text):
         try:
@@ -239,9 +404,7 @@ Focus on being constructive, realistic, and actionable in your feedback. Conside
 
 class MockIdeaEvaluator:
     
-    def evaluate_idea(self, idea_data):
-        import random
-        
+    def evaluate_idea(self, idea_data, force_refresh=False, strict=False):
         time.sleep(2)
         
         title = idea_data.get('title', 'Untitled Idea')
@@ -382,14 +545,119 @@ class MockIdeaEvaluator:
         return random.sample(next_steps, min(2, len(next_steps)))
 
 
+EVALUATOR_BACKENDS = ('mock', 'groq', 'stub')
+
+def create_evaluator(backend):
+    if backend == 'mock':
+        return MockIdeaEvaluator()
+    if backend == 'groq':
+        return IdeaEvaluator()
+    if backend == 'stub':
+        # Own model name, so stub results never share cache keys with real ones
+        return IdeaEvaluator(api_url=Config.LLM_STUB_URL, api_key='stub', model='stub')
+    raise ValueError(f"Unknown evaluator backend '{backend}'")
+
+class EvaluatorHolder:
+    # One evaluator per process, built at startup and reused by every
+    # request and job. The backend can be switched at runtime through the
+    # app_settings row; each process rechecks it every check_interval
+    def __init__(self, default_backend='mock', check_interval=5.0):
+        self.default_backend = default_backend
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._backend = None
+        self._evaluator = None
+        self._pid = None
+        self._checked_at = None
+        self._swaps = 0
+
+    def configured_backend(self):
+        try:
+            row = execute_single("SELECT value FROM app_settings WHERE key = 'evaluator_backend'")
+        except Exception:
+            # app_settings does not exist until migrations have run
+            return self.default_backend
+        return row[0] if row and row[0] in EVALUATOR_BACKENDS else self.default_backend
+
+    def _refresh(self):
+        with self._lock:
+            now = time.monotonic()
+            forked = self._pid != os.getpid()
+            if not forked and self._checked_at is not None and now - self._checked_at < self.check_interval:
+                return
+            backend = self.configured_backend()
+            # A forked worker must not share the parent's pooled connections
+            if forked or backend != self._backend:
+                # In-flight calls keep their reference to the old evaluator
+                # and finish on it; closing its session only drops the idle
+                # pooled connections, any still in use close when released
+                previous = self._evaluator
+                self._evaluator = create_evaluator(backend)
+                close = getattr(previous, 'close', None)
+                if close:
+                    close()
+                if self._backend is not None:
+                    self._swaps += 1
+                    print(f"Evaluator backend switched from {self._backend} to {backend}")
+                self._backend = backend
+                self._pid = os.getpid()
+            self._checked_at = now
+
+    @property
+    def backend(self):
+        return self._backend
+
+    def get(self):
+        checked_at = self._checked_at
+        if (self._pid != os.getpid() or checked_at is None
+                or time.monotonic() - checked_at >= self.check_interval):
+            self._refresh()
+        return self._evaluator
+
+    def switch(self, backend):
+        if backend is not None and backend not in EVALUATOR_BACKENDS:
+            raise ValueError(f"Unknown evaluator backend '{backend}'")
+        if backend is None:
+            execute_insert("DELETE FROM app_settings WHERE key = 'evaluator_backend'")
+        else:
+            execute_insert('''INSERT OR REPLACE INTO app_settings (key, value, updated_date)
+                              VALUES ('evaluator_backend', ?, CURRENT_TIMESTAMP)''', (backend,))
+        with self._lock:
+            self._checked_at = None
+        return self.get()
+
+    def stats(self):
+        evaluator = self.get()
+        stats = {'backend': self.backend, 'class': type(evaluator).__name__, 'swaps': self._swaps}
+        if isinstance(evaluator, IdeaEvaluator):
+            stats.update({
+                'model': evaluator.model,
+                'cache_hits': evaluator.cache_hits,
+                'cache_misses': evaluator.cache_misses,
+                'http': evaluator.metrics.stats()
+            })
+        return stats
+
+evaluator_holder = EvaluatorHolder()
+
 def get_evaluator(use_mock=None):
-   
     if use_mock is None:
-        use_mock = Config.USE_MOCK_EVALUATOR
-    
-    if use_mock:
-        print("Using MockIdeaEvaluator for development/testing")
-        return MockIdeaEvaluator()
-    else:
-        print("Using real IdeaEvaluator with API")
-        return IdeaEvaluator()
\ No newline at end of file
+        return evaluator_holder.get()
+    return create_evaluator('mock' if use_mock else 'groq')
+
+@click.command('set-evaluator')
+@click.argument('backend', type=click.Choice(EVALUATOR_BACKENDS + ('default',)))
+def set_evaluator_command(backend):
+    evaluator_holder.switch(None if backend == 'default' else backend)
+    print(f"Evaluator backend set to {evaluator_holder.configured_backend()}; "
+          f"running workers pick it up within {evaluator_holder.check_interval:g}s")
+
+def init_app(app):
+    evaluator_holder.default_backend = app.config.get('EVALUATOR_BACKEND') or (
+        'mock' if app.config.get('USE_MOCK_EVALUATOR') else 'groq')
+    evaluator_holder.check_interval = app.config.get('EVALUATOR_CHECK_INTERVAL', evaluator_holder.check_interval)
+    app.cli.add_command(set_evaluator_command)
+    # Build the evaluator (and its connection pool) now rather than on the
+    # first evaluation
+    evaluator = evaluator_holder.get()
+    print(f"Evaluator backend: {evaluator_holder.backend} ({type(evaluator).__name__})")
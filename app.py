@@ -1,6 +1,20 @@
 from flask import Flask, session
 from config import config, Config
-from database import init_db, populate_sample_data, update_database_schema
+from database import populate_sample_data, check_pragmas, init_app as init_db_app
+from migrations import run_migrations, init_app as init_migrations
+from view_counter import init_app as init_view_counter
+from idea_search import init_app as init_idea_search
+from user_stats import init_app as init_user_stats
+from response_cache import init_app as init_response_cache
+from assets import init_app as init_assets
+from image_variants import init_app as init_image_variants
+from upload_store import init_app as init_upload_store
+from quiz_bank import init_app as init_quiz_bank
+from evaluation_jobs import init_app as init_evaluation_jobs
+from bulk_evaluation import init_app as init_bulk_evaluation
+from llm_stub import init_app as init_llm_stub
+from redis_stub import init_app as init_redis_stub
+from ai_evaluator import init_app as init_evaluator, evaluator_holder
 import json
 import os
 import sys
@@ -24,6 +38,25 @@ def create_app(config_name=None):
     app.config.from_object(config[config_name])
     
     config[config_name].init_app(app)
+    init_db_app(app)
+    init_migrations(app)
+    init_view_counter(app)
+    init_idea_search(app)
+    init_user_stats(app)
+    init_response_cache(app)
+    init_assets(app)
+    init_image_variants(app)
+    init_upload_store(app)
+    init_quiz_bank(app)
+    init_evaluator(app)
+    init_evaluation_jobs(app)
+    init_bulk_evaluation(app)
+    init_llm_stub(app)
+    init_redis_stub(app)
+    try:
+        check_pragmas(app.config.get('SQLITE_PRAGMAS'))
+    except Exception as e:
+        print(f"Warning: Could not verify SQLite PRAGMA settings: {e}")
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(main_bp)
@@ -62,12 +95,8 @@ def create_app(config_name=None):
 
 def initialize_database():
     try:
-        init_db()
-        print("Database tables created.")
-        
-        print("Updating database schema...")
-        update_database_schema()
-        print("Database schema updated.")
+        print("Checking database schema...")
+        run_migrations()
         
         print("Populating sample data...")
         populate_sample_data()
@@ -95,7 +124,7 @@ if __name__ == '__main__':
     
     print(f"Running in {app.config.get('ENV', 'development')} mode")
     print(f"Debug: {app.config.get('DEBUG', False)}")
-    print(f"Using mock evaluator: {app.config.get('USE_MOCK_EVALUATOR', True)}")
+    print(f"Evaluator backend: {evaluator_holder.backend}")
     
     app.run(
         debug=Config.DEBUG,
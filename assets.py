@@ -0,0 +1,166 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+import click
+from flask import current_app, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BUILD_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+SOURCE_DIRS = ('css', 'js', 'images')
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json')
+IMMUTABLE_MAX_AGE = 31536000  # one year
+
+_manifest = {}
+
+def minify_css(source):
+    source = re.sub(r'/\*.*?\*/', '', source, flags=re.S)
+    source = re.sub(r'\s+', ' ', source)
+    source = re.sub(r'\s*([{};,>])\s*', r'\1', source)
+    source = source.replace(';}', '}')
+    return source.strip()
+
+def minify_js(source):
+    # Line-based and deliberately conservative: drops indentation, blank
+    # lines and whole-line comments, keeps line breaks so ASI is unaffected,
+    # and leaves multi-line template literals exactly as written
+    lines = []
+    in_template = False
+    in_comment = False
+    for line in source.splitlines():
+        if in_template:
+            lines.append(line)
+        else:
+            stripped = line.strip()
+            if in_comment:
+                if '*/' in stripped:
+                    in_comment = False
+                    stripped = stripped.split('*/', 1)[1].strip()
+                else:
+                    continue
+            if stripped.startswith('/*'):
+                if '*/' not in stripped:
+                    in_comment = True
+                    continue
+                stripped = stripped.split('*/', 1)[1].strip()
+            if not stripped or stripped.startswith('//'):
+                continue
+            lines.append(stripped)
+            line = stripped
+        if len(re.findall(r'(?<!\\)`', line)) % 2:
+            in_template = not in_template
+    return '\n'.join(lines) + '\n'
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+def _hashed_name(path, content):
+    root, ext = os.path.splitext(path)
+    return f'{root}.{hashlib.sha256(content).hexdigest()[:12]}{ext}'
+
+def _write_compressed(path, content):
+    with open(path + '.gz', 'wb') as f:
+        # mtime=0 keeps rebuilds of unchanged files byte-identical
+        with gzip.GzipFile(fileobj=f, mode='wb', compresslevel=9, mtime=0) as gz:
+            gz.write(content)
+    if brotli is not None:
+        with open(path + '.br', 'wb') as f:
+            f.write(brotli.compress(content, quality=11))
+
+def build_assets(static_folder):
+    build_root = os.path.join(static_folder, BUILD_DIR)
+    if os.path.isdir(build_root):
+        shutil.rmtree(build_root)
+
+    manifest = {}
+    original_bytes = built_bytes = 0
+    for source_dir in SOURCE_DIRS:
+        for dirpath, _, filenames in os.walk(os.path.join(static_folder, source_dir)):
+            for filename in sorted(filenames):
+                source_path = os.path.join(dirpath, filename)
+                # Extensionless files are editor/placeholder leftovers, not assets
+                ext = os.path.splitext(filename)[1].lower()
+                if not ext:
+                    continue
+
+                with open(source_path, 'rb') as f:
+                    content = f.read()
+                original_bytes += len(content)
+                if ext in MINIFIERS:
+                    content = MINIFIERS[ext](content.decode('utf-8')).encode('utf-8')
+                built_bytes += len(content)
+
+                logical_name = os.path.relpath(source_path, static_folder).replace(os.sep, '/')
+                built_name = f'{BUILD_DIR}/' + _hashed_name(logical_name, content)
+                built_path = os.path.join(static_folder, *built_name.split('/'))
+                os.makedirs(os.path.dirname(built_path), exist_ok=True)
+                with open(built_path, 'wb') as f:
+                    f.write(content)
+                if ext in COMPRESSIBLE:
+                    _write_compressed(built_path, content)
+                manifest[logical_name] = built_name
+
+    with open(os.path.join(build_root, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest, original_bytes, built_bytes
+
+def load_manifest(static_folder):
+    path = os.path.join(static_folder, BUILD_DIR, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def _resolve_static_filename(endpoint, values):
+    # url_for('static', filename='css/ideas.css') -> the hashed build output
+    if endpoint == 'static' and _manifest and 'filename' in values:
+        values['filename'] = _manifest.get(values['filename'], values['filename'])
+
+def _accepted_encodings():
+    accepted = request.accept_encodings
+    return [encoding for encoding in ('br', 'gzip') if accepted[encoding]]
+
+def serve_static(filename):
+    if not filename.startswith(f'{BUILD_DIR}/'):
+        return current_app.send_static_file(filename)
+
+    # Hashed names never change content, so they can be cached for good
+    static_folder = current_app.static_folder
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    for encoding in _accepted_encodings():
+        suffix = '.br' if encoding == 'br' else '.gz'
+        if os.path.isfile(os.path.join(static_folder, filename + suffix)):
+            response = send_from_directory(static_folder, filename + suffix, mimetype=mimetype, max_age=IMMUTABLE_MAX_AGE)
+            response.headers['Content-Encoding'] = encoding
+            break
+    else:
+        response = send_from_directory(static_folder, filename, max_age=IMMUTABLE_MAX_AGE)
+
+    response.headers['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    response.vary.add('Accept-Encoding')
+    return response
+
+@click.command('build-assets')
+def build_assets_command():
+    manifest, original_bytes, built_bytes = build_assets(current_app.static_folder)
+    print(f"Built {len(manifest)} assets into {BUILD_DIR}/ ({original_bytes} -> {built_bytes} bytes before compression)")
+    if brotli is None:
+        print("Warning: brotli is not installed, only .gz siblings were written")
+
+def init_app(app):
+    global _manifest
+    app.cli.add_command(build_assets_command)
+
+    if app.config.get('ASSETS_USE_MANIFEST'):
+        _manifest = load_manifest(app.static_folder)
+        if _manifest:
+            print(f"Serving {len(_manifest)} hashed static assets from {BUILD_DIR}/")
+    app.url_defaults(_resolve_static_filename)
+    app.view_functions['static'] = serve_static
@@ -0,0 +1,273 @@
+import itertools
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import click
+from config import Config
+from database import execute_query, execute_single, transaction
+from ai_evaluator import (IdeaEvaluator, PROMPT_VERSION, EVALUATOR_BACKENDS, evaluation_cache_key,
+                          create_evaluator, evaluator_holder)
+
+PAGE_SIZE = 200
+# Rough size of a completed evaluation, reserved from the token budget
+# before the call since the real usage is only known afterwards
+COMPLETION_TOKEN_ESTIMATE = 800
+
+class TokenBucket:
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount=1):
+        if self.rate <= 0:
+            return 0.0
+        # A single request larger than the bucket would otherwise wait forever
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                delay = (amount - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+def estimate_tokens(evaluator, idea):
+    if isinstance(evaluator, IdeaEvaluator):
+        return len(evaluator._create_evaluation_prompt(idea)) // 4 + COMPLETION_TOKEN_ESTIMATE
+    return 0
+
+# Ideas a run already wrote or recorded as failed; failures are retried
+# from their own table before the catalogue walk
+SETTLED_IN_RUN = '''(EXISTS (SELECT 1 FROM bulk_evaluation_done d WHERE d.run_id = ? AND d.idea_id = i.id)
+    OR EXISTS (SELECT 1 FROM bulk_evaluation_failures s WHERE s.run_id = ? AND s.idea_id = i.id))'''
+
+def iter_ideas(after_id=0, limit=None, failed_in_run=None, unsettled_in_run=None):
+    # Keyset pages keep memory flat however large the catalogue is
+    # failed_in_run restricts the walk to ideas that run recorded as failed;
+    # unsettled_in_run skips ideas that run already wrote or recorded as failed
+    yielded = 0
+    while limit is None or yielded < limit:
+        page_size = PAGE_SIZE if limit is None else min(PAGE_SIZE, limit - yielded)
+        source, condition, params = 'ideas i', '', (after_id,)
+        if failed_in_run is not None:
+            source = 'ideas i JOIN bulk_evaluation_failures f ON f.idea_id = i.id AND f.run_id = ?'
+            params = (failed_in_run, after_id)
+        if unsettled_in_run is not None:
+            condition = f'AND NOT {SETTLED_IN_RUN}'
+            params += (unsettled_in_run, unsettled_in_run)
+        rows = execute_query(f'''
+            SELECT i.id, i.user_id, i.title, i.problem_statement, i.solution_description, i.category,
+                   i.development_stage, i.target_market, i.budget_range, i.timeline, i.tags
+            FROM {source} WHERE i.status = 'active' AND i.id > ? {condition} ORDER BY i.id LIMIT ?
+        ''', params + (page_size,))
+        if not rows:
+            return
+        for row in rows:
+            yield row['id'], row['user_id'], {
+                'title': row['title'] or 'Untitled',
+                'problem_statement': row['problem_statement'] or 'No problem statement provided',
+                'solution_description': row['solution_description'] or 'No solution description provided',
+                'category': row['category'] or 'General',
+                'development_stage': row['development_stage'] or 'Idea',
+                'target_market': row['target_market'] or 'Not specified',
+                'budget_range': row['budget_range'] or 'Not specified',
+                'timeline': row['timeline'] or 'Not specified',
+                'tags': row['tags'] or ''
+            }
+        yielded += len(rows)
+        after_id = rows[-1]['id']
+
+def _start_run(run_name, backend, model, restart, retry_failed):
+    with transaction() as tx:
+        row = tx.single('SELECT id, last_idea_id, evaluated, failed, finished_date FROM bulk_evaluation_runs WHERE run_name = ?',
+                        (run_name,))
+        if row and not restart and (row['finished_date'] is None or retry_failed):
+            return row['id'], row['last_idea_id'], row['evaluated'], row['failed']
+        if row:
+            tx.execute('DELETE FROM bulk_evaluation_failures WHERE run_id = ?', (row['id'],))
+            tx.execute('DELETE FROM bulk_evaluation_done WHERE run_id = ?', (row['id'],))
+            tx.execute('''UPDATE bulk_evaluation_runs SET backend = ?, model = ?, prompt_version = ?, last_idea_id = 0,
+                          evaluated = 0, failed = 0, started_date = CURRENT_TIMESTAMP,
+                          updated_date = CURRENT_TIMESTAMP, finished_date = NULL WHERE id = ?''',
+                       (backend, model, PROMPT_VERSION, row['id']))
+            return row['id'], 0, 0, 0
+        run_id = tx.insert('''INSERT INTO bulk_evaluation_runs (run_name, backend, model, prompt_version)
+                              VALUES (?, ?, ?, ?)''', (run_name, backend, model, PROMPT_VERSION))
+        return run_id, 0, 0, 0
+
+def _flush(run_id, rows, failures, checkpoint, evaluated):
+    # Results, failures and the checkpoint commit together, so a resumed run
+    # never skips an idea whose outcome was lost. Results above the
+    # checkpoint are recorded as done so the resumed run does not write
+    # them twice
+    with transaction() as tx:
+        if rows:
+            tx.executemany('INSERT INTO idea_evaluations (idea_id, user_id, evaluation_data) VALUES (?, ?, ?)', rows)
+            tx.executemany('DELETE FROM bulk_evaluation_failures WHERE run_id = ? AND idea_id = ?',
+                           [(run_id, row[0]) for row in rows])
+            tx.executemany('INSERT OR IGNORE INTO bulk_evaluation_done (run_id, idea_id) VALUES (?, ?)',
+                           [(run_id, row[0]) for row in rows if row[0] > checkpoint])
+        if failures:
+            tx.executemany('''INSERT INTO bulk_evaluation_failures (run_id, idea_id, error) VALUES (?, ?, ?)
+                              ON CONFLICT (run_id, idea_id) DO UPDATE SET attempts = attempts + 1,
+                              error = excluded.error, failed_date = CURRENT_TIMESTAMP''',
+                           [(run_id, idea_id, error) for idea_id, error in failures])
+        tx.execute('DELETE FROM bulk_evaluation_done WHERE run_id = ? AND idea_id <= ?', (run_id, checkpoint))
+        return tx.single('''UPDATE bulk_evaluation_runs SET last_idea_id = ?, evaluated = ?,
+                             failed = (SELECT COUNT(*) FROM bulk_evaluation_failures WHERE run_id = ?),
+                             updated_date = CURRENT_TIMESTAMP WHERE id = ? RETURNING failed''',
+                         (checkpoint, evaluated, run_id, run_id))[0]
+
+def _format_eta(seconds):
+    if seconds is None:
+        return '--'
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours}h{minutes:02d}m' if hours else f'{minutes}m{seconds:02d}s'
+
+def run_bulk_evaluation(evaluator=None, backend=None, run_name=None, workers=4, rpm=None, tpm=None,
+                        batch_size=25, force_refresh=False, restart=False, retry_failed=False, limit=None,
+                        progress_interval=5.0, log=print):
+    if evaluator is None:
+        evaluator = create_evaluator(backend) if backend else evaluator_holder.get()
+        backend = backend or evaluator_holder.backend
+    backend = backend or type(evaluator).__name__
+    model = getattr(evaluator, 'model', backend)
+    run_name = run_name or f'{backend}:{model}:v{PROMPT_VERSION}'
+    requests_bucket = TokenBucket(Config.BULK_EVALUATION_RPM if rpm is None else rpm)
+    tokens_bucket = TokenBucket(Config.BULK_EVALUATION_TPM if tpm is None else tpm)
+
+    run_id, checkpoint, evaluated, failed = _start_run(run_name, backend, model, restart, retry_failed)
+    # Ideas that failed earlier in the run go first; --retry-failed stops there
+    retries = execute_single('''
+        SELECT COUNT(*) FROM bulk_evaluation_failures f JOIN ideas i ON i.id = f.idea_id
+        WHERE f.run_id = ? AND i.status = 'active'
+    ''', (run_id,))[0]
+    remaining = 0
+    if not retry_failed:
+        remaining = execute_single(f"SELECT COUNT(*) FROM ideas i WHERE i.status = 'active' AND i.id > ? "
+                                   f"AND NOT {SETTLED_IN_RUN}", (checkpoint, run_id, run_id))[0]
+        if limit is not None:
+            remaining = min(remaining, limit)
+    log(f"Run '{run_name}' (#{run_id}): {remaining} ideas to evaluate after idea {checkpoint}, "
+        f"{retries} failed ideas to retry" + (f", resuming with {evaluated} done" if checkpoint else ''))
+    remaining += retries
+
+    def evaluate(idea):
+        # Cached results cost no API call, so they skip the rate limits
+        cached = (isinstance(evaluator, IdeaEvaluator) and not force_refresh
+                  and evaluator._get_cached_evaluation(evaluation_cache_key(idea, evaluator.model)))
+        if not cached:
+            requests_bucket.acquire(1)
+            tokens_bucket.acquire(estimate_tokens(evaluator, idea))
+        return evaluator.evaluate_idea(idea, force_refresh=force_refresh, strict=True)
+
+    start = last_report = time.monotonic()
+    done_this_run = 0
+    failed_ids = []
+    buffered = []
+    in_flight = {}
+    failures = []
+    last_submitted = checkpoint
+    ideas = ((idea, True) for idea in iter_ideas(failed_in_run=run_id))
+    if not retry_failed:
+        ideas = itertools.chain(ideas, ((idea, False) for idea in iter_ideas(checkpoint, limit, unsettled_in_run=run_id)))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bulk-evaluation') as executor:
+        while True:
+            # Bounded look-ahead: the stream is read only as fast as work completes
+            while len(in_flight) < workers * 2:
+                item = next(ideas, None)
+                if item is None:
+                    break
+                (idea_id, user_id, idea), retry = item
+                in_flight[executor.submit(evaluate, idea)] = (idea_id, user_id, retry)
+                if not retry:
+                    last_submitted = idea_id
+            if not in_flight:
+                break
+
+            finished, _ = wait(in_flight, timeout=progress_interval, return_when=FIRST_COMPLETED)
+            for future in finished:
+                idea_id, user_id, _ = in_flight.pop(future)
+                try:
+                    buffered.append((idea_id, user_id, json.dumps(future.result())))
+                    evaluated += 1
+                except Exception as e:
+                    failures.append((idea_id, str(e)))
+                    failed_ids.append(idea_id)
+                    log(f"  idea {idea_id} failed: {e}")
+                done_this_run += 1
+
+            if len(buffered) + len(failures) >= batch_size or not in_flight:
+                # Everything below the oldest unfinished catalogue idea is
+                # settled; failures are kept in their own table for a retry
+                pending = [idea_id for idea_id, _, retry in in_flight.values() if not retry]
+                checkpoint = min(pending) - 1 if pending else last_submitted
+                failed = _flush(run_id, buffered, failures, checkpoint, evaluated)
+                buffered = []
+                failures = []
+
+            now = time.monotonic()
+            if now - last_report >= progress_interval:
+                last_report = now
+                rate = done_this_run / (now - start)
+                eta = (remaining - done_this_run) / rate if rate else None
+                log(f"  {done_this_run}/{remaining} ideas  {rate * 60:.1f}/min  "
+                    f"{failed} failed  ETA {_format_eta(eta)}")
+
+    # A run cut short by --limit stays open so the next invocation resumes it
+    with transaction() as tx:
+        exhausted = not tx.single(f"SELECT 1 FROM ideas i WHERE i.status = 'active' AND i.id > ? "
+                                  f"AND NOT {SETTLED_IN_RUN} LIMIT 1", (last_submitted, run_id, run_id))
+        if exhausted and not retry_failed:
+            tx.execute('UPDATE bulk_evaluation_runs SET finished_date = CURRENT_TIMESTAMP WHERE id = ?', (run_id,))
+
+    elapsed = time.monotonic() - start
+    summary = {
+        'run_id': run_id,
+        'run_name': run_name,
+        'evaluated': evaluated,
+        'failed': failed,
+        'failed_ids': failed_ids,
+        'retried': retries,
+        'processed_this_run': done_this_run,
+        'elapsed_seconds': round(elapsed, 1),
+        'ideas_per_minute': round(done_this_run / elapsed * 60, 1) if elapsed else 0.0
+    }
+    log(f"Finished '{run_name}': {done_this_run} ideas in {_format_eta(elapsed)} "
+        f"({summary['ideas_per_minute']}/min), {failed} failed")
+    return summary
+
+@click.command('evaluate-ideas')
+@click.option('--backend', type=click.Choice(EVALUATOR_BACKENDS), default=None,
+              help='Evaluator to use; defaults to the configured backend.')
+@click.option('--run-name', default=None, help='Checkpoint name; defaults to backend:model:prompt version.')
+@click.option('--workers', default=4, show_default=True, help='Concurrent evaluations.')
+@click.option('--rpm', type=int, default=None, help='Requests per minute budget (0 = unlimited).')
+@click.option('--tpm', type=int, default=None, help='Tokens per minute budget (0 = unlimited).')
+@click.option('--batch-size', default=25, show_default=True, help='Evaluations written per transaction.')
+@click.option('--limit', type=int, default=None, help='Stop after this many ideas.')
+@click.option('--force-refresh', is_flag=True, help='Ignore the evaluation cache.')
+@click.option('--restart', is_flag=True, help='Discard the checkpoint and start from the first idea.')
+@click.option('--retry-failed', is_flag=True, help='Only retry the ideas this run recorded as failed.')
+def evaluate_ideas_command(backend, run_name, workers, rpm, tpm, batch_size, limit, force_refresh, restart,
+                           retry_failed):
+    summary = run_bulk_evaluation(backend=backend, run_name=run_name, workers=workers, rpm=rpm, tpm=tpm,
+                                  batch_size=batch_size, force_refresh=force_refresh, restart=restart,
+                                  retry_failed=retry_failed, limit=limit)
+    if summary['failed_ids']:
+        print(f"Failed ideas: {', '.join(map(str, summary['failed_ids']))}")
+        print(f"Retry them with: flask evaluate-ideas --retry-failed --run-name '{summary['run_name']}'")
+
+def init_app(app):
+    app.cli.add_command(evaluate_ideas_command)
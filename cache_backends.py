@@ -0,0 +1,320 @@
+import os
+import socket
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+from database import get_db_connection
+
+class CacheBackend:
+    # Values are opaque bytes; counters hold the namespace versions and must
+    # survive eviction, so they are stored apart from regular entries
+    name = 'base'
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def get_counter(self, key):
+        raise NotImplementedError
+
+    def incr(self, key):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self):
+        return {'backend': self.name}
+
+class MemoryBackend(CacheBackend):
+    name = 'memory'
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self._expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def get_counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': self.name,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'evictions': self._evictions,
+                'expirations': self._expirations
+            }
+
+def default_sqlite_cache_path():
+    # /dev/shm keeps the shared file in RAM where the platform provides it
+    directory = '/dev/shm' if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK) else tempfile.gettempdir()
+    return os.path.join(directory, 'synapsehub-cache.db')
+
+class SQLiteBackend(CacheBackend):
+    name = 'sqlite'
+
+    # Cached data is disposable, so durability is traded for write speed
+    PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'busy_timeout': 2000,
+        'temp_store': 'MEMORY'
+    }
+    PRUNE_EVERY = 64
+
+    def __init__(self, path=None, max_entries=4096):
+        self.path = path or default_sqlite_cache_path()
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._sets = 0
+        self._evictions = 0
+
+    def _connection(self):
+        # One connection per process; a forked worker opens its own
+        if self._conn is None or self._pid != os.getpid():
+            conn = get_db_connection(self.path, pragmas=self.PRAGMAS)
+            conn.isolation_level = None
+            conn.execute('''CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                expires_at REAL NOT NULL
+            ) WITHOUT ROWID''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_entries_expires ON cache_entries (expires_at)')
+            conn.execute('''CREATE TABLE IF NOT EXISTS cache_counters (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            ) WITHOUT ROWID''')
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def get(self, key):
+        with self._lock:
+            row = self._connection().execute(
+                'SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?', (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                'INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)',
+                (key, value, time.time() + ttl)
+            )
+            self._sets += 1
+            if self._sets % self.PRUNE_EVERY == 0:
+                self._prune(conn)
+
+    def _prune(self, conn):
+        # Entries share a TTL, so the soonest to expire are also the oldest
+        conn.execute('DELETE FROM cache_entries WHERE expires_at <= ?', (time.time(),))
+        self._evictions += conn.execute('''
+            DELETE FROM cache_entries WHERE key IN (
+                SELECT key FROM cache_entries ORDER BY expires_at DESC LIMIT -1 OFFSET ?
+            )''', (self.max_entries,)).rowcount
+
+    def get_counter(self, key):
+        with self._lock:
+            row = self._connection().execute('SELECT value FROM cache_counters WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else 0
+
+    def incr(self, key):
+        with self._lock:
+            return self._connection().execute('''
+                INSERT INTO cache_counters (key, value) VALUES (?, 1)
+                ON CONFLICT (key) DO UPDATE SET value = value + 1
+                RETURNING value''', (key,)).fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._connection().execute('DELETE FROM cache_entries')
+
+    def stats(self):
+        with self._lock:
+            entries = self._connection().execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0]
+        return {
+            'backend': self.name,
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'evictions': self._evictions
+        }
+
+class RedisError(Exception):
+    pass
+
+class RedisClient:
+    # Minimal RESP2 client: enough for GET/SET/INCR/SCAN/DEL against Redis or
+    # any server speaking the same protocol, without a client library
+    def __init__(self, url='redis://localhost:6379/0', timeout=1.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.timeout = timeout
+        self._sock = None
+        self._reader = None
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock, self._reader, self._pid = sock, sock.makefile('rb'), os.getpid()
+        if self.password:
+            self._call('AUTH', self.password)
+        if self.db:
+            self._call('SELECT', self.db)
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._reader.close()
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = self._reader = None
+
+    @staticmethod
+    def _encode(args):
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        return b''.join(parts)
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line.endswith(b'\r\n'):
+            raise ConnectionError('Connection closed by server')
+        kind, payload = line[:1], line[1:-2]
+        if kind == b'+':
+            return payload.decode()
+        if kind == b'-':
+            raise RedisError(payload.decode())
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            if len(data) != length + 2:
+                raise ConnectionError('Connection closed by server')
+            return data[:-2]
+        if kind == b'*':
+            length = int(payload)
+            return None if length < 0 else [self._read_reply() for _ in range(length)]
+        raise RedisError(f'Unexpected reply type {kind!r}')
+
+    def _call(self, *args):
+        self._sock.sendall(self._encode(args))
+        return self._read_reply()
+
+    def execute(self, *args):
+        with self._lock:
+            # A reply stream left half-read by an error cannot be reused, so
+            # reconnect once before giving up
+            for attempt in range(2):
+                try:
+                    if self._sock is None or self._pid != os.getpid():
+                        self._connect()
+                    return self._call(*args)
+                except (OSError, ConnectionError):
+                    self.close()
+                    if attempt:
+                        raise
+
+class RedisBackend(CacheBackend):
+    name = 'redis'
+
+    def __init__(self, url='redis://localhost:6379/0', prefix='synapsehub:', timeout=1.0):
+        self.url = url
+        self.prefix = prefix
+        self.client = RedisClient(url, timeout)
+
+    def get(self, key):
+        return self.client.execute('GET', self.prefix + 'entry:' + key)
+
+    def set(self, key, value, ttl):
+        self.client.execute('SET', self.prefix + 'entry:' + key, value, 'PX', max(int(ttl * 1000), 1))
+
+    def get_counter(self, key):
+        value = self.client.execute('GET', self.prefix + 'counter:' + key)
+        return int(value) if value is not None else 0
+
+    def incr(self, key):
+        return self.client.execute('INCR', self.prefix + 'counter:' + key)
+
+    def clear(self):
+        cursor = '0'
+        while True:
+            cursor, keys = self.client.execute('SCAN', cursor, 'MATCH', self.prefix + 'entry:*', 'COUNT', 500)
+            if keys:
+                self.client.execute('DEL', *keys)
+            cursor = cursor.decode() if isinstance(cursor, bytes) else cursor
+            if cursor == '0':
+                break
+
+    def stats(self):
+        # Never the URL itself, which may carry a password
+        return {
+            'backend': self.name,
+            'host': self.client.host,
+            'port': self.client.port,
+            'db': self.client.db,
+            'prefix': self.prefix
+        }
+
+def create_backend(name='memory', max_entries=1024, sqlite_path=None, redis_url=None):
+    if name == 'memory':
+        return MemoryBackend(max_entries)
+    if name == 'sqlite':
+        return SQLiteBackend(sqlite_path, max_entries)
+    if name == 'redis':
+        return RedisBackend(redis_url or 'redis://localhost:6379/0')
+    raise ValueError(f"Unknown cache backend '{name}'")
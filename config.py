@@ -10,11 +10,58 @@ class Config:
     
   
     DATABASE_NAME = os.environ.get('DATABASE_NAME') or 'synapsehub.db'
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))
+    # Comma-separated usernames allowed to read the /api/*_stats endpoints
+    OPERATOR_USERNAMES = {name.strip() for name in os.environ.get('OPERATOR_USERNAMES', '').split(',') if name.strip()}
+    
+    # Applied in order to every new SQLite connection by database.get_db_connection()
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'cache_size': -16000,  # KiB
+        'mmap_size': 67108864,  # 64MB
+        'temp_store': 'MEMORY'
+    }
+    
+   
+    IDEAS_PAGE_SIZE = int(os.environ.get('IDEAS_PAGE_SIZE', 24))
+    IDEAS_COUNT_CACHE_TTL = int(os.environ.get('IDEAS_COUNT_CACHE_TTL', 60))
+    
+    # Cache for idea listing/detail, mentors and the quiz bank: 'memory' is a
+    # per-process LRU, 'sqlite' a file shared by local workers (under /dev/shm
+    # when available), 'redis' any server speaking the Redis protocol
+    RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory')
+    RESPONSE_CACHE_SQLITE_PATH = os.environ.get('RESPONSE_CACHE_SQLITE_PATH')
+    RESPONSE_CACHE_REDIS_URL = os.environ.get('RESPONSE_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 1024))
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 30))
+    
+    # Resolve url_for('static', ...) to the hashed files from `flask build-assets`
+    ASSETS_USE_MANIFEST = os.environ.get('ASSETS_USE_MANIFEST', 'True').lower() == 'true'
+    
+    # Buffer /api/increment_view hits in memory and flush them in batches
+    VIEW_BUFFER_ENABLED = os.environ.get('VIEW_BUFFER_ENABLED', 'True').lower() == 'true'
+    VIEW_FLUSH_INTERVAL = float(os.environ.get('VIEW_FLUSH_INTERVAL', 5))
+    VIEW_FLUSH_MAX_EVENTS = int(os.environ.get('VIEW_FLUSH_MAX_EVENTS', 500))
+    VIEW_BUFFER_MAX_PENDING_IDEAS = int(os.environ.get('VIEW_BUFFER_MAX_PENDING_IDEAS', 10000))
+    
+    # Seconds between checks of quiz_bank_version by the in-memory quiz bank
+    QUIZ_BANK_CHECK_INTERVAL = float(os.environ.get('QUIZ_BANK_CHECK_INTERVAL', 1.0))
     
    
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER') or 'static/uploads'
     MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 16777216))  # 16MB
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+    # Background threads that resize uploads into 48/128/512px variants
+    IMAGE_VARIANT_WORKERS = int(os.environ.get('IMAGE_VARIANT_WORKERS', 2))
+    # Uploads are stored by SHA-256; unreferenced blobs older than the grace
+    # period are deleted by a background sweep
+    UPLOAD_STORE = os.environ.get('UPLOAD_STORE', 'filesystem')
+    UPLOAD_GC_ENABLED = os.environ.get('UPLOAD_GC_ENABLED', 'True').lower() == 'true'
+    UPLOAD_GC_INTERVAL = float(os.environ.get('UPLOAD_GC_INTERVAL', 3600))
+    UPLOAD_GC_GRACE = float(os.environ.get('UPLOAD_GC_GRACE', 3600))
     
    
     MAIL_SERVER = os.environ.get('MAIL_SERVER') or 'smtp.gmail.com'
@@ -28,6 +75,28 @@ class Config:
     GROQ_API_URL = os.environ.get('GROQ_API_URL') or 'https://api.groq.com/openai/v1/chat/completions'
     GROQ_MODEL = os.environ.get('GROQ_MODEL') or 'llama-3.3-70b-versatile'
     USE_MOCK_EVALUATOR = os.environ.get('USE_MOCK_EVALUATOR', 'True').lower() == 'true'  
+    # mock, groq or stub; unset falls back to USE_MOCK_EVALUATOR. Overridden
+    # at runtime by `flask set-evaluator`
+    EVALUATOR_BACKEND = os.environ.get('EVALUATOR_BACKEND')
+    EVALUATOR_CHECK_INTERVAL = float(os.environ.get('EVALUATOR_CHECK_INTERVAL', 5))
+    LLM_STUB_URL = os.environ.get('LLM_STUB_URL') or 'http://127.0.0.1:8089/v1/chat/completions'
+    # Default budgets for `flask evaluate-ideas`; 0 disables a limit
+    BULK_EVALUATION_RPM = int(os.environ.get('BULK_EVALUATION_RPM', 30))
+    BULK_EVALUATION_TPM = int(os.environ.get('BULK_EVALUATION_TPM', 12000))
+    # HTTP client for the LLM API: pooled keep-alive connections, and retries
+    # on 429/5xx with jittered exponential backoff (Retry-After wins when sent)
+    LLM_POOL_SIZE = int(os.environ.get('LLM_POOL_SIZE', 10))
+    LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', 3))
+    LLM_BACKOFF_BASE = float(os.environ.get('LLM_BACKOFF_BASE', 0.5))
+    LLM_BACKOFF_MAX = float(os.environ.get('LLM_BACKOFF_MAX', 20))
+    LLM_CONNECT_TIMEOUT = float(os.environ.get('LLM_CONNECT_TIMEOUT', 5))
+    LLM_READ_TIMEOUT = float(os.environ.get('LLM_READ_TIMEOUT', 30))
+    # Seconds an evaluation of unchanged idea fields is reused; 0 disables it
+    EVALUATION_CACHE_TTL = int(os.environ.get('EVALUATION_CACHE_TTL', 604800))
+    # Background threads per process that run queued evaluation jobs
+    EVALUATION_WORKERS = int(os.environ.get('EVALUATION_WORKERS', 2))
+    EVALUATION_POLL_INTERVAL = float(os.environ.get('EVALUATION_POLL_INTERVAL', 2))
+    EVALUATION_JOB_LEASE = float(os.environ.get('EVALUATION_JOB_LEASE', 300))
     
     @staticmethod
     def init_app(app):
@@ -35,15 +104,26 @@ class Config:
 
 class DevelopmentConfig(Config):
     DEBUG = True
+    ASSETS_USE_MANIFEST = False
     USE_MOCK_EVALUATOR = True  
+    SQLITE_PRAGMAS = dict(Config.SQLITE_PRAGMAS, cache_size=-8000, mmap_size=0)
 
 class ProductionConfig(Config):
     DEBUG = False
     USE_MOCK_EVALUATOR = False 
+    SQLITE_PRAGMAS = dict(Config.SQLITE_PRAGMAS, cache_size=-64000, mmap_size=268435456)
 
 class TestingConfig(Config):
     TESTING = True
     DATABASE_NAME = ':memory:' 
+    DB_POOL_SIZE = 1
+    VIEW_BUFFER_ENABLED = False
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'MEMORY',
+        'synchronous': 'OFF',
+        'busy_timeout': 1000,
+        'temp_store': 'MEMORY'
+    }
     USE_MOCK_EVALUATOR = True  
 
 config = {
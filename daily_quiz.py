@@ -0,0 +1,110 @@
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from database import transaction
+from quiz_bank import quiz_bank, QUIZ_SIZE
+from response_cache import response_cache
+
+CACHE_NAMESPACE = 'daily_quiz'
+# A stored set never changes and its date is part of the cache key, so the
+# TTL only bounds how long entries for past days linger in the cache
+DAILY_SET_TTL = 3600
+POINTS_PER_CORRECT = 10
+PASS_ACCURACY = 70
+ALL_DIFFICULTIES = 0
+
+def quiz_today():
+    # UTC, to agree with DATE('now') used for quiz_analytics.quiz_date
+    return datetime.now(timezone.utc).date().isoformat()
+
+def accepted_quiz_date(value):
+    # A set fetched just before UTC midnight may be submitted just after it,
+    # so yesterday's set is still graded; anything older is rejected
+    today = datetime.now(timezone.utc).date()
+    if not value:
+        return today.isoformat()
+    if value in (today.isoformat(), (today - timedelta(days=1)).isoformat()):
+        return value
+    return None
+
+def available_difficulties():
+    return sorted({q['difficulty_level'] for q in quiz_bank.questions() if q['difficulty_level'] is not None})
+
+def select_daily_questions(questions, quiz_date, difficulty=ALL_DIFFICULTIES):
+    pool = [q for q in questions if difficulty == ALL_DIFFICULTIES or q['difficulty_level'] == difficulty]
+    # Seeded by the day, so workers racing to create the same set pick the
+    # same questions and whichever insert wins is the one everybody else reads
+    rng = random.Random(f'{quiz_date}:{difficulty}')
+    return [pool[i]['id'] for i in rng.sample(range(len(pool)), min(QUIZ_SIZE, len(pool)))]
+
+def _load_daily_set(quiz_date, difficulty):
+    # Read before the transaction: a bank refresh queries through the
+    # request's connection and would commit the BEGIN IMMEDIATE early
+    questions = quiz_bank.questions()
+    with transaction() as tx:
+        row = tx.single('SELECT question_ids FROM daily_quizzes WHERE quiz_date = ? AND difficulty_level = ?',
+                        (quiz_date, difficulty))
+        if row:
+            return json.loads(row[0])
+
+        question_ids = select_daily_questions(questions, quiz_date, difficulty)
+        if not question_ids:
+            # Never store an empty set, or it would be served all day
+            return []
+        tx.execute('''INSERT OR IGNORE INTO daily_quizzes (quiz_date, difficulty_level, question_ids)
+                      VALUES (?, ?, ?)''', (quiz_date, difficulty, json.dumps(question_ids)))
+        row = tx.single('SELECT question_ids FROM daily_quizzes WHERE quiz_date = ? AND difficulty_level = ?',
+                        (quiz_date, difficulty))
+        return json.loads(row[0])
+
+def get_daily_question_ids(difficulty=ALL_DIFFICULTIES, quiz_date=None):
+    quiz_date = quiz_date or quiz_today()
+    if not quiz_bank.questions():
+        # Not cached either, so the set is built as soon as questions exist
+        return []
+    return response_cache.get_or_load(CACHE_NAMESPACE, (quiz_date, difficulty),
+                                      lambda: _load_daily_set(quiz_date, difficulty), ttl=DAILY_SET_TTL)
+
+def public_question(question):
+    # Answers stay on the server until the quiz is submitted and graded
+    return {
+        'id': question['id'],
+        'question': question['question'],
+        'options': question['options'],
+        'category': question['category'],
+        'difficulty_level': question['difficulty_level']
+    }
+
+def get_daily_questions(difficulty=ALL_DIFFICULTIES, quiz_date=None):
+    questions = (quiz_bank.get(question_id) for question_id in get_daily_question_ids(difficulty, quiz_date))
+    return [public_question(q) for q in questions if q is not None]
+
+def grade_daily_quiz(question_ids, answers):
+    selected = {}
+    for answer in answers:
+        if isinstance(answer, dict) and answer.get('questionId') in question_ids:
+            selected.setdefault(answer['questionId'], answer.get('selectedAnswer'))
+
+    results = []
+    for question_id in question_ids:
+        question = quiz_bank.get(question_id)
+        if question is None:
+            continue
+        correct = selected.get(question_id) == question['correct_answer']
+        # The set stays open to everyone else until the day is over, so a
+        # wrong answer is not told what the right one was
+        results.append({
+            'questionId': question_id,
+            'selectedAnswer': selected.get(question_id),
+            'correct': correct,
+            'explanation': question['explanation'] if correct else None
+        })
+
+    correct = sum(1 for result in results if result['correct'])
+    return {
+        'questions_answered': len(results),
+        'correct_answers': correct,
+        'accuracy': round(correct / len(results) * 100) if results else 0,
+        'points_earned': correct * POINTS_PER_CORRECT,
+        'results': results
+    }
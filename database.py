@@ -1,196 +1,227 @@
 import sqlite3
 import json
+import click
+import os
+import threading
+import time
+from contextlib import contextmanager
+from flask import g, has_app_context
 from werkzeug.security import generate_password_hash
 from datetime import datetime
 
-def get_db_connection():
+def get_db_connection(database=None, pragmas=None):
     from config import Config
-    conn = sqlite3.connect(Config.DATABASE_NAME)
+    conn = sqlite3.connect(database or Config.DATABASE_NAME, check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    apply_pragmas(conn, Config.SQLITE_PRAGMAS if pragmas is None else pragmas)
     return conn
 
-def init_db():
-    conn = sqlite3.connect('synapsehub.db')
-    c = conn.cursor()
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        username TEXT UNIQUE NOT NULL,
-        email TEXT UNIQUE NOT NULL,
-        password_hash TEXT NOT NULL,
-        age INTEGER,
-        skills TEXT,
-        interests TEXT,
-        bio TEXT,
-        profile_image TEXT DEFAULT 'default-avatar.png',
-        join_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        quiz_streak INTEGER DEFAULT 0,
-        total_points INTEGER DEFAULT 0,
-        last_quiz_date DATE
-    )''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS ideas (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER,
-        title TEXT NOT NULL,
-        problem_statement TEXT NOT NULL,
-        solution_description TEXT NOT NULL,
-        category TEXT,
-        status TEXT DEFAULT 'active',
-        created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        view_count INTEGER DEFAULT 0,
-        like_count INTEGER DEFAULT 0,
-        development_stage TEXT DEFAULT "Idea",
-        target_market TEXT DEFAULT "",
-        budget_range TEXT DEFAULT "",
-        timeline TEXT DEFAULT "",
-        tags TEXT DEFAULT "",
-        team_needs TEXT DEFAULT "",
-        inspiration TEXT DEFAULT "",
-        open_collaboration INTEGER DEFAULT 0,
-        comment_count INTEGER DEFAULT 0,
-        FOREIGN KEY (user_id) REFERENCES users (id)
-    )''')
+def apply_pragmas(conn, pragmas):
+    for name, value in pragmas.items():
+        if not name.isidentifier():
+            raise ValueError(f'Invalid PRAGMA name: {name}')
+        conn.execute(f'PRAGMA {name} = {value}')
 
-    c.execute('''CREATE TABLE IF NOT EXISTS comments (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        idea_id INTEGER,
-        user_id INTEGER,
-        comment_text TEXT NOT NULL,
-        created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (idea_id) REFERENCES ideas (id),
-        FOREIGN KEY (user_id) REFERENCES users (id)
-    )''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS session_bookings (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER,
-        mentor_id INTEGER,
-        student_name TEXT NOT NULL,
-        student_email TEXT NOT NULL,
-        session_date DATE NOT NULL,
-        session_time TEXT NOT NULL,
-        session_topic TEXT,
-        meeting_link TEXT,
-        status TEXT DEFAULT 'confirmed',
-        created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (user_id) REFERENCES users (id),
-        FOREIGN KEY (mentor_id) REFERENCES mentors (id)
-    )''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS teams (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        team_id INTEGER,
-        idea_id INTEGER,
-        member_username TEXT,
-        is_founder INTEGER DEFAULT 0,
-        status TEXT DEFAULT 'active',
-        joined_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (idea_id) REFERENCES ideas (id)
-    )''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS team_applications (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        idea_id INTEGER,
-        applicant_username TEXT,
-        message TEXT,
-        skills TEXT,
-        experience TEXT,
-        availability TEXT,
-        status TEXT DEFAULT 'pending',
-        applied_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (idea_id) REFERENCES ideas (id)
-    )''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS team_messages (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        team_id INTEGER,
-        username TEXT,
-        message TEXT,
-        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS mentors (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        expertise TEXT,
-        bio TEXT,
-        availability TEXT,
-        rating REAL DEFAULT 5.0,
-        verified_status INTEGER DEFAULT 1,
-        profile_image TEXT DEFAULT 'mentor-default.png',
-        created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS quiz_questions (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        question TEXT NOT NULL,
-        options TEXT NOT NULL,
-        correct_answer INTEGER NOT NULL,
-        explanation TEXT,
-        category TEXT,
-        difficulty_level INTEGER DEFAULT 1
-    )''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS user_progress (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER,
-        quiz_answers TEXT,
-        correct_count INTEGER DEFAULT 0,
-        streak_count INTEGER DEFAULT 0,
-        achievement_badges TEXT,
-        last_activity TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (user_id) REFERENCES users (id)
-    )''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS idea_likes (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER,
-        idea_id INTEGER,
-        created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (user_id) REFERENCES users (id),
-        FOREIGN KEY (idea_id) REFERENCES ideas (id),
-        UNIQUE(user_id, idea_id)
-    )''')
+def read_pragmas(conn, names):
+    return {name: conn.execute(f'PRAGMA {name}').fetchone()[0] for name in names if name.isidentifier()}
 
-    c.execute('''CREATE TABLE IF NOT EXISTS quiz_analytics (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER,
-        quiz_date DATE DEFAULT CURRENT_DATE,
-        total_questions INTEGER,
-        correct_answers INTEGER,
-        accuracy REAL,
-        time_taken INTEGER,
-        questions_data TEXT,
-        FOREIGN KEY (user_id) REFERENCES users (id)
-    )''')
-    
-    c.execute('''CREATE TABLE IF NOT EXISTS profile_updates (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER,
-        field_updated TEXT,
-        old_value TEXT,
-        new_value TEXT,
-        updated_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (user_id) REFERENCES users (id)
-    )''')
+def check_pragmas(pragmas=None):
+    from config import Config
+    expected = Config.SQLITE_PRAGMAS if pragmas is None else pragmas
+    with borrow_connection() as conn:
+        active = read_pragmas(conn, expected)
+    # PRAGMA reads return numeric codes for some enum settings
+    enum_codes = {
+        'synchronous': {'OFF': 0, 'NORMAL': 1, 'FULL': 2, 'EXTRA': 3},
+        'temp_store': {'DEFAULT': 0, 'FILE': 1, 'MEMORY': 2}
+    }
+    for name, value in expected.items():
+        wanted = enum_codes.get(name, {}).get(str(value).upper(), value)
+        actual = active.get(name)
+        if str(actual).lower() == str(wanted).lower():
+            print(f"SQLite PRAGMA {name} = {actual}")
+        else:
+            print(f"Warning: SQLite PRAGMA {name} = {actual} (expected {value})")
+    return active
 
-    c.execute('''CREATE TABLE IF NOT EXISTS idea_evaluations (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        idea_id INTEGER,
-        user_id INTEGER,
-        evaluation_data TEXT,
-        created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (idea_id) REFERENCES ideas (id),
-        FOREIGN KEY (user_id) REFERENCES users (id)
-    )''')
-    
-    conn.commit()
-    conn.close()
+class ConnectionPool:
+    def __init__(self, database=None, max_size=10, timeout=10.0, pragmas=None):
+        self.database = database
+        self.pragmas = pragmas
+        self.max_size = max_size
+        self.timeout = timeout
+        self.pid = os.getpid()
+        self._idle = []
+        self._size = 0
+        self._cond = threading.Condition()
+        self._checkouts = 0
+        self._created = 0
+        self._reused = 0
+        self._timeouts = 0
+        self._discarded = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def acquire(self):
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        conn = None
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn = self._idle.pop()
+                    self._reused += 1
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise sqlite3.OperationalError(
+                        f'Connection pool exhausted ({self.max_size} connections in use)')
+                self._cond.wait(remaining)
+
+        created = conn is None
+        if created:
+            try:
+                conn = get_db_connection(self.database, self.pragmas)
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+
+        waited = time.perf_counter() - start
+        with self._cond:
+            if created:
+                self._created += 1
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return conn
+
+    def release(self, conn, discard=False):
+        if not discard:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            except sqlite3.Error:
+                discard = True
+
+        with self._cond:
+            if discard:
+                self._size -= 1
+                self._discarded += 1
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+        if discard:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def close_all(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for conn in idle:
+            conn.close()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'max_size': self.max_size,
+                'timeout': self.timeout,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'checkouts': self._checkouts,
+                'created': self._created,
+                'reused': self._reused,
+                'reuse_ratio': round(self._reused / self._checkouts, 3) if self._checkouts else 0,
+                'timeouts': self._timeouts,
+                'discarded': self._discarded,
+                'avg_wait_ms': round(self._wait_total / self._checkouts * 1000, 3) if self._checkouts else 0,
+                'max_wait_ms': round(self._wait_max * 1000, 3)
+            }
+
+_pool = None
+_pool_settings = {}
+_pool_lock = threading.Lock()
+
+def configure_pool(database=None, max_size=None, timeout=None, pragmas=None):
+    global _pool
+    from config import Config
+    with _pool_lock:
+        _pool_settings.update({
+            'database': database or Config.DATABASE_NAME,
+            'max_size': max_size or Config.DB_POOL_SIZE,
+            'timeout': timeout if timeout is not None else Config.DB_POOL_TIMEOUT,
+            'pragmas': pragmas if pragmas is not None else Config.SQLITE_PRAGMAS
+        })
+        old_pool, _pool = _pool, None
+    if old_pool is not None and old_pool.pid == os.getpid():
+        old_pool.close_all()
+
+def get_pool():
+    global _pool
+    pool = _pool
+    # A forked worker must not share the parent's sqlite handles.
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            if not _pool_settings:
+                from config import Config
+                _pool_settings.update({
+                    'database': Config.DATABASE_NAME,
+                    'max_size': Config.DB_POOL_SIZE,
+                    'timeout': Config.DB_POOL_TIMEOUT,
+                    'pragmas': Config.SQLITE_PRAGMAS
+                })
+            _pool = ConnectionPool(**_pool_settings)
+        return _pool
+
+def get_pool_stats():
+    return get_pool().stats()
+
+def get_db():
+    if 'db' not in g:
+        g.db = get_pool().acquire()
+    return g.db
+
+def close_db(exception=None):
+    conn = g.pop('db', None)
+    if conn is not None:
+        get_pool().release(conn)
+
+def init_app(app):
+    configure_pool(
+        app.config.get('DATABASE_NAME'),
+        app.config.get('DB_POOL_SIZE'),
+        app.config.get('DB_POOL_TIMEOUT'),
+        app.config.get('SQLITE_PRAGMAS')
+    )
+    app.teardown_appcontext(close_db)
+    app.cli.add_command(reconcile_counters_command)
+
+@contextmanager
+def borrow_connection():
+    if has_app_context():
+        yield get_db()
+        return
+    pool = get_pool()
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
 
 def populate_sample_data():
-    conn = sqlite3.connect('synapsehub.db')
+    conn = get_db_connection()
     c = conn.cursor()
     
     c.execute('SELECT COUNT(*) FROM ideas')
@@ -264,99 +295,105 @@ def populate_sample_data():
     for question in sample_questions:
         c.execute('INSERT INTO quiz_questions (question, options, correct_answer, explanation, category, difficulty_level) VALUES (?, ?, ?, ?, ?, ?)', question)
     
+    # Sample rows bypass the write paths that keep user_stats current
+    from user_stats import rebuild_user_stats
+    rebuild_user_stats(conn)
+    
     conn.commit()
     conn.close()
 
-def update_database_schema():
-    conn = sqlite3.connect('synapsehub.db')
-    c = conn.cursor()
+class Transaction:
+    def __init__(self, conn):
+        self.conn = conn
     
-    def column_exists(table_name, column_name):
-        c.execute(f"PRAGMA table_info({table_name})")
-        columns = [column[1] for column in c.fetchall()]
-        return column_name in columns
+    def execute(self, query, params=None):
+        return self.conn.execute(query, params) if params else self.conn.execute(query)
     
-    ideas_columns = [
-        ('development_stage', 'TEXT DEFAULT "Idea"'),
-        ('target_market', 'TEXT DEFAULT ""'),
-        ('budget_range', 'TEXT DEFAULT ""'),
-        ('timeline', 'TEXT DEFAULT ""'),
-        ('tags', 'TEXT DEFAULT ""'),
-        ('team_needs', 'TEXT DEFAULT ""'),
-        ('inspiration', 'TEXT DEFAULT ""'),
-        ('open_collaboration', 'INTEGER DEFAULT 0'),
-        ('comment_count', 'INTEGER DEFAULT 0'),
-        ('view_count', 'INTEGER DEFAULT 0'),
-        ('like_count', 'INTEGER DEFAULT 0')
-    ]
+    def executemany(self, query, seq_of_params):
+        return self.conn.executemany(query, seq_of_params)
     
-    for column_name, column_type in ideas_columns:
-        if not column_exists('ideas', column_name):
-            try:
-                c.execute(f'ALTER TABLE ideas ADD COLUMN {column_name} {column_type}')
-                print(f"Added column {column_name} to ideas table")
-            except sqlite3.OperationalError as e:
-                print(f"Could not add column {column_name}: {e}")
+    def query(self, query, params=None):
+        return self.execute(query, params).fetchall()
     
-    c.execute('''UPDATE ideas SET 
-                 view_count = COALESCE(view_count, 0),
-                 like_count = COALESCE(like_count, 0),
-                 comment_count = COALESCE(comment_count, 0),
-                 development_stage = COALESCE(development_stage, "Idea"),
-                 target_market = COALESCE(target_market, ""),
-                 budget_range = COALESCE(budget_range, ""),
-                 timeline = COALESCE(timeline, ""),
-                 tags = COALESCE(tags, ""),
-                 team_needs = COALESCE(team_needs, ""),
-                 inspiration = COALESCE(inspiration, ""),
-                 open_collaboration = COALESCE(open_collaboration, 0)
-                 WHERE view_count IS NULL OR like_count IS NULL OR comment_count IS NULL
-                 OR development_stage IS NULL OR open_collaboration IS NULL''')
+    def single(self, query, params=None):
+        return self.execute(query, params).fetchone()
+    
+    def insert(self, query, params=None):
+        return self.execute(query, params).lastrowid
 
-    conn.commit()
-    conn.close()
+@contextmanager
+def transaction(immediate=True):
+    with borrow_connection() as conn:
+        # Nested blocks join the outer transaction, which owns the commit
+        if conn.in_transaction:
+            yield Transaction(conn)
+            return
+        
+        # IMMEDIATE takes the write lock up front so read-modify-write
+        # sequences cannot be interleaved with another writer
+        conn.execute('BEGIN IMMEDIATE' if immediate else 'BEGIN')
+        try:
+            yield Transaction(conn)
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
 
 def execute_query(query, params=None):
-    conn = get_db_connection()
-    try:
-        if params:
-            result = conn.execute(query, params)
-        else:
-            result = conn.execute(query)
-        data = result.fetchall()
-        conn.commit()
-        return data
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
+    with borrow_connection() as conn:
+        try:
+            if params:
+                result = conn.execute(query, params)
+            else:
+                result = conn.execute(query)
+            data = result.fetchall()
+            conn.commit()
+            return data
+        except Exception as e:
+            conn.rollback()
+            raise e
 
 def execute_single(query, params=None):
-    conn = get_db_connection()
-    try:
-        if params:
-            result = conn.execute(query, params)
-        else:
-            result = conn.execute(query)
-        data = result.fetchone()
-        conn.commit()
-        return data
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
+    with borrow_connection() as conn:
+        try:
+            if params:
+                result = conn.execute(query, params)
+            else:
+                result = conn.execute(query)
+            data = result.fetchone()
+            conn.commit()
+            return data
+        except Exception as e:
+            conn.rollback()
+            raise e
 
 def execute_insert(query, params=None):
-    conn = get_db_connection()
-    try:
-        cursor = conn.execute(query, params) if params else conn.execute(query)
-        last_id = cursor.lastrowid
-        conn.commit()
-        return last_id
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
\ No newline at end of file
+    with borrow_connection() as conn:
+        try:
+            cursor = conn.execute(query, params) if params else conn.execute(query)
+            last_id = cursor.lastrowid
+            conn.commit()
+            return last_id
+        except Exception as e:
+            conn.rollback()
+            raise e
+
+def reconcile_idea_counters():
+    # like_count and comment_count are kept current by triggers; this rebuilds
+    # them from the source tables after imports or manual edits.
+    with transaction() as tx:
+        cursor = tx.execute('''
+            UPDATE ideas SET
+                like_count = (SELECT COUNT(*) FROM idea_likes l WHERE l.idea_id = ideas.id),
+                comment_count = (SELECT COUNT(*) FROM comments c WHERE c.idea_id = ideas.id)
+            WHERE like_count != (SELECT COUNT(*) FROM idea_likes l WHERE l.idea_id = ideas.id)
+               OR comment_count != (SELECT COUNT(*) FROM comments c WHERE c.idea_id = ideas.id)
+        ''')
+        return cursor.rowcount
+
+@click.command('reconcile-counters')
+def reconcile_counters_command():
+    start = time.perf_counter()
+    updated = reconcile_idea_counters()
+    print(f"Reconciled like/comment counters: {updated} ideas corrected in {(time.perf_counter() - start) * 1000:.1f}ms")
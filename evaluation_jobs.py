@@ -0,0 +1,201 @@
+import json
+import os
+import threading
+import time
+from database import execute_single, transaction
+from ai_evaluator import get_evaluator
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+def load_idea_for_evaluation(idea_id):
+    row = execute_single('''
+        SELECT title, problem_statement, solution_description, category,
+               development_stage, target_market, budget_range, timeline, tags
+        FROM ideas WHERE id = ?
+    ''', (idea_id,))
+    if not row:
+        return None
+
+    return {
+        'title': row[0] or 'Untitled',
+        'problem_statement': row[1] or 'No problem statement provided',
+        'solution_description': row[2] or 'No solution description provided',
+        'category': row[3] or 'General',
+        'development_stage': row[4] or 'Idea',
+        'target_market': row[5] or 'Not specified',
+        'budget_range': row[6] or 'Not specified',
+        'timeline': row[7] or 'Not specified',
+        'tags': row[8] or ''
+    }
+
+def enqueue_evaluation(idea_id, user_id, force_refresh=False):
+    with transaction() as tx:
+        # Pressing Evaluate again while a job is pending joins that job
+        existing = tx.single('''SELECT id, status FROM evaluation_jobs
+                                WHERE idea_id = ? AND status IN (?, ?) ORDER BY id DESC LIMIT 1''',
+                             (idea_id, QUEUED, RUNNING))
+        if existing and force_refresh and existing[1] == QUEUED:
+            tx.execute('UPDATE evaluation_jobs SET force_refresh = 1 WHERE id = ?', (existing[0],))
+        # A running job has already read its flag, so a refresh request
+        # queues a fresh job behind it rather than being lost
+        if existing and not (force_refresh and existing[1] == RUNNING):
+            return existing[0], existing[1]
+        job_id = tx.insert('''INSERT INTO evaluation_jobs (idea_id, user_id, status, force_refresh)
+                              VALUES (?, ?, ?, ?)''', (idea_id, user_id, QUEUED, int(bool(force_refresh))))
+    evaluation_workers.notify()
+    return job_id, QUEUED
+
+def get_job(job_id):
+    row = execute_single('''
+        SELECT j.id, j.idea_id, j.user_id, j.status, j.error, j.attempts, j.created_date, j.finished_at,
+               e.evaluation_data
+        FROM evaluation_jobs j LEFT JOIN idea_evaluations e ON e.id = j.evaluation_id
+        WHERE j.id = ?
+    ''', (job_id,))
+    if not row:
+        return None
+
+    return {
+        'job_id': row['id'],
+        'idea_id': row['idea_id'],
+        'user_id': row['user_id'],
+        'status': row['status'],
+        'error': row['error'],
+        'attempts': row['attempts'],
+        'created_date': row['created_date'],
+        'finished_at': row['finished_at'],
+        'evaluation': json.loads(row['evaluation_data']) if row['evaluation_data'] else None
+    }
+
+class EvaluationWorkerPool:
+    # Jobs live in evaluation_jobs, so they survive a restart. A claimed job
+    # carries a lease; if its process dies the lease runs out and any worker
+    # may claim it again, up to max_attempts
+    def __init__(self, workers=2, poll_interval=2.0, lease_seconds=300.0, max_attempts=3):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.evaluator_factory = None
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._threads = []
+        self._pid = None
+        self._completed = 0
+        self._failed = 0
+
+    def start(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._threads = [
+                threading.Thread(target=self._run, name=f'evaluation-worker-{n}', daemon=True)
+                for n in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def notify(self):
+        with self._wake:
+            self._wake.notify()
+
+    def claim(self):
+        now = time.time()
+        with transaction() as tx:
+            tx.execute('''UPDATE evaluation_jobs SET status = ?, error = 'Gave up after repeated failures',
+                          finished_at = CURRENT_TIMESTAMP
+                          WHERE status = ? AND lease_expires < ? AND attempts >= ?''',
+                       (FAILED, RUNNING, now, self.max_attempts))
+            return tx.single('''
+                UPDATE evaluation_jobs SET status = ?, attempts = attempts + 1, lease_expires = ?,
+                       started_at = CURRENT_TIMESTAMP
+                WHERE id = (SELECT id FROM evaluation_jobs
+                            WHERE status = ? OR (status = ? AND lease_expires < ?)
+                            ORDER BY id LIMIT 1)
+                RETURNING id, idea_id, user_id, force_refresh, lease_expires
+            ''', (RUNNING, now + self.lease_seconds, QUEUED, RUNNING, now))
+
+    def _finish(self, tx, job_id, lease_expires, status, error=None):
+        # Only the holder of the current lease may finish the job; if it ran
+        # past its lease another worker owns it now
+        return tx.single('''UPDATE evaluation_jobs SET status = ?, error = ?, finished_at = CURRENT_TIMESTAMP
+                            WHERE id = ? AND status = ? AND lease_expires = ? RETURNING id''',
+                         (status, error, job_id, RUNNING, lease_expires)) is not None
+
+    def run_job(self, job):
+        job_id, idea_id, user_id, force_refresh, lease_expires = job
+        try:
+            idea = load_idea_for_evaluation(idea_id)
+            if idea is None:
+                raise LookupError('Idea not found')
+            # strict, so an API failure fails the job instead of storing the
+            # placeholder evaluation as if it were a real result
+            evaluation = self.evaluator_factory().evaluate_idea(idea, force_refresh=bool(force_refresh), strict=True)
+            with transaction() as tx:
+                if not self._finish(tx, job_id, lease_expires, DONE):
+                    print(f"Evaluation job {job_id} lost its lease; discarding the result")
+                    return
+                evaluation_id = tx.insert('''INSERT INTO idea_evaluations (idea_id, user_id, evaluation_data)
+                                             VALUES (?, ?, ?)''', (idea_id, user_id, json.dumps(evaluation)))
+                tx.execute('UPDATE evaluation_jobs SET evaluation_id = ? WHERE id = ?', (evaluation_id, job_id))
+            with self._lock:
+                self._completed += 1
+        except Exception as e:
+            print(f"Error running evaluation job {job_id}: {e}")
+            with transaction() as tx:
+                if not self._finish(tx, job_id, lease_expires, FAILED, str(e)):
+                    return
+            with self._lock:
+                self._failed += 1
+
+    def _run(self):
+        while True:
+            try:
+                job = self.claim()
+            except Exception as e:
+                print(f"Error claiming evaluation job: {e}")
+                job = None
+            if job is None:
+                # Other processes enqueue too, so idle workers also poll
+                with self._wake:
+                    self._wake.wait(self.poll_interval)
+                continue
+            try:
+                self.run_job(job)
+            except Exception as e:
+                print(f"Error recording evaluation job {job[0]}: {e}")
+
+    def stats(self):
+        counts = dict.fromkeys((QUEUED, RUNNING, DONE, FAILED), 0)
+        with transaction(immediate=False) as tx:
+            for status, count in tx.query('SELECT status, COUNT(*) FROM evaluation_jobs GROUP BY status'):
+                counts[status] = count
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'alive': sum(1 for thread in self._threads if thread.is_alive()) if self._pid == os.getpid() else 0,
+                'completed': self._completed,
+                'failed': self._failed,
+                'jobs': counts
+            }
+
+evaluation_workers = EvaluationWorkerPool()
+
+def init_app(app):
+    evaluation_workers.workers = app.config.get('EVALUATION_WORKERS', evaluation_workers.workers)
+    evaluation_workers.poll_interval = app.config.get('EVALUATION_POLL_INTERVAL', evaluation_workers.poll_interval)
+    evaluation_workers.lease_seconds = app.config.get('EVALUATION_JOB_LEASE', evaluation_workers.lease_seconds)
+    evaluation_workers.evaluator_factory = get_evaluator
+
+    if evaluation_workers.workers > 0:
+        # Started by the first request rather than here, so CLI commands that
+        # build the app never claim jobs they would abandon on exit
+        @app.before_request
+        def _start_evaluation_workers():
+            evaluation_workers.start()
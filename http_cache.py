@@ -0,0 +1,43 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from flask import current_app, jsonify, request
+from werkzeug.http import is_resource_modified
+
+# Clients may keep a copy but must revalidate it on every use; per-user data
+# must never land in a shared proxy cache
+CACHE_CONTROL = 'private, no-cache'
+
+def parse_timestamp(value):
+    # SQLite CURRENT_TIMESTAMP values are UTC; naive datetimes are read as such
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.replace(microsecond=0)
+
+def make_etag(*parts):
+    return hashlib.sha1(json.dumps(parts, default=str, separators=(',', ':')).encode()).hexdigest()
+
+def _apply_validators(response, etag, last_modified):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
+
+def not_modified(etag, last_modified=None):
+    # Lets a route answer from cheap validators (counts, max ids) before it
+    # builds the full response body
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    return _apply_validators(current_app.response_class(status=304), etag, last_modified)
+
+def conditional_json(payload, etag=None, last_modified=None):
+    response = jsonify(payload)
+    _apply_validators(response, etag or hashlib.sha1(response.get_data()).hexdigest(), last_modified)
+    return response.make_conditional(request)
@@ -0,0 +1,179 @@
+import base64
+import json
+from database import execute_query, execute_single
+from idea_search import build_match_query
+from response_cache import response_cache
+from view_counter import view_counter
+
+# Every sort walks one of the idx_ideas_active_* partial indexes; i.id is the
+# final tie-breaker so each row has a unique position for keyset cursors.
+SORT_COLUMNS = {
+    'newest': ['i.created_date'],
+    'popular': ['i.like_count', 'i.view_count', 'i.created_date'],
+    'views': ['i.view_count', 'i.created_date'],
+    'comments': ['i.comment_count', 'i.created_date']
+}
+
+LISTING_COLUMNS = '''
+    i.id,
+    i.title,
+    i.problem_statement,
+    i.solution_description,
+    i.category,
+    DATE(i.created_date) as created_date,
+    i.view_count,
+    i.like_count,
+    COALESCE(u.username, 'Unknown') as username,
+    i.development_stage,
+    i.target_market,
+    i.budget_range,
+    i.timeline,
+    i.tags,
+    i.comment_count,
+    i.team_needs,
+    i.inspiration,
+    i.open_collaboration,
+    i.created_date as sort_date'''
+
+class InvalidCursor(ValueError):
+    pass
+
+def encode_cursor(sort_by, values):
+    raw = json.dumps([sort_by, values], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor, sort_by):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        cursor_sort, values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise InvalidCursor('Malformed cursor')
+    if cursor_sort != sort_by or not isinstance(values, list) or len(values) != len(SORT_COLUMNS[sort_by]) + 1:
+        raise InvalidCursor('Cursor does not match the requested sort order')
+    if not all(value is None or isinstance(value, (str, int, float)) for value in values):
+        raise InvalidCursor('Malformed cursor')
+    return values
+
+def _filters(search, category):
+    clauses = ["i.status = 'active'"]
+    params = []
+    
+    if search:
+        match_query = build_match_query(search)
+        if match_query:
+            clauses.append('i.id IN (SELECT rowid FROM ideas_fts WHERE ideas_fts MATCH ?)')
+            params.append(match_query)
+        else:
+            clauses.append('0')
+    
+    if category:
+        clauses.append('i.category = ?')
+        params.append(category)
+    
+    return clauses, params
+
+def _cursor_values(row, sort_by):
+    names = [column.split('.')[1] for column in SORT_COLUMNS[sort_by]]
+    return [row['sort_date'] if name == 'created_date' else row[name] for name in names] + [row['id']]
+
+def fetch_ideas_page(search='', category='', sort_by='newest', cursor=None, limit=24):
+    if sort_by not in SORT_COLUMNS:
+        sort_by = 'newest'
+    
+    clauses, params = _filters(search, category)
+    key_columns = SORT_COLUMNS[sort_by] + ['i.id']
+    
+    if cursor:
+        clauses.append(f"({', '.join(key_columns)}) < ({', '.join('?' * len(key_columns))})")
+        params.extend(decode_cursor(cursor, sort_by))
+    
+    query = f'''SELECT {LISTING_COLUMNS}
+               FROM ideas i 
+               LEFT JOIN users u ON i.user_id = u.id 
+               WHERE {' AND '.join(clauses)}
+               ORDER BY {', '.join(column + ' DESC' for column in key_columns)}
+               LIMIT ?'''
+    params.append(limit + 1)
+    
+    rows = execute_query(query, params)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort_by, _cursor_values(rows[-1], sort_by))
+    
+    return rows, next_cursor
+
+# Cache namespace for listing pages, counts and category facets; bumped by
+# every write that changes what the listing shows
+CACHE_NAMESPACE = 'ideas'
+
+def get_ideas_page(search='', category='', sort_by='newest', cursor=None, limit=24):
+    def load():
+        rows, next_cursor = fetch_ideas_page(search, category, sort_by, cursor, limit)
+        return [list(row) for row in rows], next_cursor
+    
+    rows, next_cursor = response_cache.get_or_load(
+        CACHE_NAMESPACE, ('page', search, category, sort_by, cursor, limit), load
+    )
+    return rows, next_cursor
+
+def count_ideas(search='', category='', ttl=60):
+    def load():
+        clauses, params = _filters(search, category)
+        return execute_single(f"SELECT COUNT(*) FROM ideas i WHERE {' AND '.join(clauses)}", params)[0]
+    
+    return response_cache.get_or_load(CACHE_NAMESPACE, ('count', search, category), load, ttl)
+
+def list_categories():
+    def load():
+        rows = execute_query(
+            'SELECT DISTINCT category FROM ideas WHERE category IS NOT NULL AND category != "" AND category != "null" ORDER BY category'
+        )
+        return [row[0] for row in rows if row[0]]
+    
+    return response_cache.get_or_load(CACHE_NAMESPACE, ('categories',), load)
+
+def invalidate_idea_listing():
+    response_cache.bump(CACHE_NAMESPACE)
+
+IDEA_FIELDS = (
+    'id', 'title', 'problem_statement', 'solution_description', 'category', 'created_date',
+    'view_count', 'like_count', 'username', 'development_stage', 'target_market', 'budget_range',
+    'timeline', 'tags', 'comment_count', 'team_needs', 'inspiration', 'open_collaboration'
+)
+
+def idea_to_dict(row):
+    # Rows come from LISTING_COLUMNS either as sqlite3.Row or, once cached,
+    # as plain lists, so map them by position
+    return dict(zip(IDEA_FIELDS, row))
+
+def fetch_idea(idea_id):
+    row = execute_single('''SELECT 
+                    i.id,
+                    i.title,
+                    i.problem_statement,
+                    i.solution_description,
+                    i.category,
+                    i.created_date,
+                    i.view_count,
+                    i.like_count,
+                    COALESCE(u.username, 'Unknown') as username,
+                    i.development_stage,
+                    i.target_market,
+                    i.budget_range,
+                    i.timeline,
+                    i.tags,
+                    i.comment_count,
+                    i.team_needs,
+                    i.inspiration,
+                    i.open_collaboration
+               FROM ideas i 
+               LEFT JOIN users u ON i.user_id = u.id 
+               WHERE i.id = ? AND i.status = 'active' ''', (idea_id,))
+    return idea_to_dict(row) if row else None
+
+def get_idea_detail(idea_id):
+    idea = response_cache.get_or_load(CACHE_NAMESPACE, ('detail', idea_id), lambda: fetch_idea(idea_id))
+    # Views this worker has buffered but not flushed yet still count
+    pending = view_counter.pending(idea_id)
+    return dict(idea, view_count=idea['view_count'] + pending) if idea and pending else idea
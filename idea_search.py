@@ -0,0 +1,164 @@
+import html
+import itertools
+import os
+import random
+import re
+import statistics
+import tempfile
+import time
+import click
+from database import execute_query, get_db_connection
+
+# bm25 column weights, in ideas_fts column order
+SEARCH_WEIGHTS = {
+    'title': 10.0,
+    'problem_statement': 3.0,
+    'solution_description': 3.0,
+    'tags': 5.0
+}
+MAX_SEARCH_TERMS = 10
+
+# Control characters never appear in user text, so they are safe markers to
+# swap for <mark> tags after the rest of the snippet has been HTML-escaped
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+def build_match_query(search):
+    # Each word becomes a quoted prefix term, so FTS5 operators typed by the
+    # user are matched literally instead of being parsed
+    tokens = _TOKEN_RE.findall(search.lower())[:MAX_SEARCH_TERMS]
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+def render_highlight(text):
+    return html.escape(text or '').replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+def search_ideas(search, category='', limit=20):
+    match_query = build_match_query(search)
+    if not match_query:
+        return []
+    
+    weights = ', '.join(str(weight) for weight in SEARCH_WEIGHTS.values())
+    query = f'''SELECT 
+                    i.id,
+                    i.title,
+                    i.category,
+                    DATE(i.created_date) as created_date,
+                    i.view_count,
+                    i.like_count,
+                    i.comment_count,
+                    COALESCE(u.username, 'Unknown') as username,
+                    bm25(ideas_fts, {weights}) as score,
+                    highlight(ideas_fts, 0, ?, ?) as title_highlight,
+                    snippet(ideas_fts, -1, ?, ?, '…', 16) as snippet
+               FROM ideas_fts
+               JOIN ideas i ON i.id = ideas_fts.rowid
+               LEFT JOIN users u ON i.user_id = u.id
+               WHERE ideas_fts MATCH ? AND i.status = 'active' '''
+    params = [_MARK_START, _MARK_END, _MARK_START, _MARK_END, match_query]
+    
+    if category:
+        query += ' AND i.category = ?'
+        params.append(category)
+    
+    query += ' ORDER BY score LIMIT ?'
+    params.append(limit)
+    
+    return [
+        {
+            'id': row['id'],
+            'title': row['title'],
+            'title_html': render_highlight(row['title_highlight']),
+            'snippet_html': render_highlight(row['snippet']),
+            'category': row['category'],
+            'created_date': row['created_date'],
+            'username': row['username'],
+            'view_count': row['view_count'],
+            'like_count': row['like_count'],
+            'comment_count': row['comment_count'],
+            'score': round(-row['score'], 4)
+        }
+        for row in execute_query(query, params)
+    ]
+
+_BENCH_VOCABULARY = 5000
+
+def _bench_vocabulary(rng):
+    # Pseudo-words with Zipf-like frequencies, so the benchmark terms range from
+    # near-universal to rare the way real idea text does
+    syllables = ['ba', 'ko', 'ri', 'te', 'mu', 'sa', 'lo', 'ne', 'vi', 'da', 'pu', 'gre', 'sol', 'tan', 'mer']
+    words = set()
+    while len(words) < _BENCH_VOCABULARY:
+        words.add(''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    words = sorted(words)
+    rng.shuffle(words)
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(words) + 1)))
+    return words, cum_weights
+
+def _bench_text(rng, vocabulary, count):
+    words, cum_weights = vocabulary
+    return ' '.join(rng.choices(words, cum_weights=cum_weights, k=count))
+
+def _median_ms(conn, query, params, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        conn.execute(query, params).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+@click.command('bench-search')
+@click.option('--rows', default=100000, show_default=True, help='Number of synthetic ideas to generate.')
+@click.option('--runs', default=5, show_default=True, help='Timed runs per query; the median is reported.')
+@click.option('--seed', default=42, show_default=True)
+def bench_search_command(rows, runs, seed):
+    from migrations import run_migrations
+    
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database = os.path.join(tmp_dir, 'bench.db')
+        run_migrations(database)
+        vocabulary = _bench_vocabulary(rng)
+        
+        conn = get_db_connection(database)
+        start = time.perf_counter()
+        with conn:
+            conn.executemany(
+                '''INSERT INTO ideas (user_id, title, problem_statement, solution_description, category, tags)
+                   VALUES (?, ?, ?, ?, ?, ?)''',
+                ((rng.randint(1, 1000), _bench_text(rng, vocabulary, 5), _bench_text(rng, vocabulary, 30),
+                  _bench_text(rng, vocabulary, 40),
+                  rng.choice(['Education', 'Environment', 'Health & Wellness', 'Social Impact']),
+                  ','.join(_bench_text(rng, vocabulary, 4).split()))
+                 for _ in range(rows))
+            )
+        print(f"Generated {rows} ideas (with FTS sync) in {time.perf_counter() - start:.1f}s")
+        
+        like_filter = '''status = 'active' AND (title LIKE ? OR problem_statement LIKE ?
+                         OR solution_description LIKE ? OR tags LIKE ?)'''
+        fts_filter = "status = 'active' AND id IN (SELECT rowid FROM ideas_fts WHERE ideas_fts MATCH ?)"
+        page = 'SELECT id FROM ideas WHERE {} ORDER BY created_date DESC, id DESC LIMIT 24'
+        count = 'SELECT COUNT(*) FROM ideas WHERE {}'
+        ranked_query = '''SELECT rowid, snippet(ideas_fts, -1, '[', ']', '…', 16)
+                          FROM ideas_fts WHERE ideas_fts MATCH ? ORDER BY rank LIMIT 24'''
+        
+        words = vocabulary[0]
+        terms = [(f'rank {rank}', words[rank - 1]) for rank in (1, 20, 200, 2000)]
+        terms += [('two terms', f'{words[9]} {words[99]}'), ('prefix', words[299][:4]), ('miss', 'zzzz')]
+        
+        print(f"{'term':<28}{'LIKE page':>11}{'FTS page':>10}{'LIKE count':>12}{'FTS count':>11}{'ranked':>9}  (median ms)")
+        for label, term in terms:
+            like_params = [f'%{term}%'] * 4
+            match_params = [build_match_query(term)]
+            print(f"{label + ' ' + repr(term):<28}"
+                  f"{_median_ms(conn, page.format(like_filter), like_params, runs):>11.2f}"
+                  f"{_median_ms(conn, page.format(fts_filter), match_params, runs):>10.2f}"
+                  f"{_median_ms(conn, count.format(like_filter), like_params, runs):>12.2f}"
+                  f"{_median_ms(conn, count.format(fts_filter), match_params, runs):>11.2f}"
+                  f"{_median_ms(conn, ranked_query, match_params, runs):>9.2f}")
+        conn.close()
+
+def init_app(app):
+    app.cli.add_command(bench_search_command)
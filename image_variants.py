@@ -0,0 +1,169 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import click
+from flask import current_app, url_for
+from markupsafe import Markup, escape
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+VARIANT_WIDTHS = (48, 128, 512)
+VARIANT_DIR = 'variants'
+SOURCE_DIRS = ('images', 'uploads')
+SOURCE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp')
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+_known_variants = {}
+
+def _variant_name(filename, width, fmt):
+    root = os.path.splitext(filename)[0]
+    return f'{VARIANT_DIR}/{root}-{width}.{fmt}'
+
+def _fallback_format(image):
+    # JPEG has no alpha channel, so transparent sources keep a PNG fallback
+    return 'png' if image.mode == 'RGBA' and image.getextrema()[3][0] < 255 else 'jpeg'
+
+def generate_variants(static_folder, filename):
+    if Image is None:
+        return []
+
+    source_path = os.path.join(static_folder, filename)
+    with Image.open(source_path) as source:
+        # Bake the EXIF orientation into the pixels; nothing else from EXIF
+        # is carried over because no exif= argument is passed to save()
+        image = ImageOps.exif_transpose(source)
+        image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+    fallback = _fallback_format(image)
+
+    widths = [width for width in VARIANT_WIDTHS if width <= image.width] or [image.width]
+    written = []
+    for width in widths:
+        height = max(round(image.height * width / image.width), 1)
+        resized = image.resize((width, height), Image.LANCZOS)
+        for fmt in ('webp', fallback):
+            output = resized.convert('RGB') if fmt == 'jpeg' else resized
+            name = _variant_name(filename, width, fmt)
+            path = os.path.join(static_folder, *name.split('/'))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file first so a request never sees a partial image
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            if fmt == 'webp':
+                output.save(tmp_path, 'WEBP', quality=WEBP_QUALITY, method=6)
+            elif fmt == 'jpeg':
+                output.save(tmp_path, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+            else:
+                output.save(tmp_path, 'PNG', optimize=True)
+            os.replace(tmp_path, path)
+            written.append(name)
+
+    _known_variants.pop(filename, None)
+    return written
+
+def remove_variants(static_folder, filename):
+    for width in VARIANT_WIDTHS:
+        for fmt in ('webp', 'jpeg', 'png'):
+            path = os.path.join(static_folder, *_variant_name(filename, width, fmt).split('/'))
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    _known_variants.pop(filename, None)
+
+def _get_executor(max_workers):
+    global _executor, _executor_pid
+    with _executor_lock:
+        # A forked worker cannot use the parent's threads
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='image-variants')
+            _executor_pid = os.getpid()
+        return _executor
+
+def _generate_logged(static_folder, filename):
+    try:
+        generate_variants(static_folder, filename)
+    except Exception as e:
+        print(f"Error generating image variants for {filename}: {e}")
+
+def schedule_variants(filename):
+    # Resizing takes far longer than the upload request should, so it runs
+    # on a small background pool; templates fall back to the original until
+    # the variants exist
+    if Image is None:
+        return None
+    return _get_executor(current_app.config.get('IMAGE_VARIANT_WORKERS', 2)).submit(
+        _generate_logged, current_app.static_folder, filename
+    )
+
+def find_variants(static_folder, filename):
+    cached = _known_variants.get(filename)
+    if cached is not None:
+        return cached
+
+    found = {}
+    for fmt in ('webp', 'jpeg', 'png'):
+        widths = [
+            width for width in VARIANT_WIDTHS
+            if os.path.exists(os.path.join(static_folder, *_variant_name(filename, width, fmt).split('/')))
+        ]
+        if widths:
+            found[fmt] = widths
+    # Remembered once any WebP variant exists; generate_variants() drops the
+    # entry when it finishes, so a set caught mid-write is looked up again
+    if 'webp' in found:
+        _known_variants[filename] = found
+    return found
+
+def _srcset(filename, fmt, widths):
+    return ', '.join(
+        f"{url_for('static', filename=_variant_name(filename, width, fmt))} {width}w" for width in widths
+    )
+
+def responsive_image(filename, alt='', sizes='100vw', **attrs):
+    src = url_for('static', filename=filename)
+    attributes = ''.join(
+        f' {escape(name.rstrip("_").replace("_", "-"))}="{escape(value)}"' for name, value in attrs.items()
+    )
+    variants = find_variants(current_app.static_folder, filename)
+    if not variants:
+        return Markup(f'<img src="{escape(src)}" alt="{escape(alt)}"{attributes}>')
+
+    fallback = next((fmt for fmt in ('jpeg', 'png') if fmt in variants), None)
+    sources = ''.join(
+        f'<source type="image/{fmt}" srcset="{escape(_srcset(filename, fmt, variants[fmt]))}" sizes="{escape(sizes)}">'
+        for fmt in ('webp',) if fmt in variants
+    )
+    img_srcset = f' srcset="{escape(_srcset(filename, fallback, variants[fallback]))}" sizes="{escape(sizes)}"' if fallback else ''
+    return Markup(f'<picture>{sources}<img src="{escape(src)}"{img_srcset} alt="{escape(alt)}"{attributes}></picture>')
+
+@click.command('build-image-variants')
+def build_image_variants_command():
+    if Image is None:
+        print("Pillow is not installed; no image variants were generated")
+        return
+
+    static_folder = current_app.static_folder
+    count = 0
+    for source_dir in SOURCE_DIRS:
+        for dirpath, _, filenames in os.walk(os.path.join(static_folder, source_dir)):
+            for name in sorted(filenames):
+                if not name.lower().endswith(SOURCE_EXTENSIONS):
+                    continue
+                filename = os.path.relpath(os.path.join(dirpath, name), static_folder).replace(os.sep, '/')
+                try:
+                    count += len(generate_variants(static_folder, filename))
+                except Exception as e:
+                    print(f"Error generating image variants for {filename}: {e}")
+    print(f"Wrote {count} image variants to {VARIANT_DIR}/")
+
+def init_app(app):
+    app.cli.add_command(build_image_variants_command)
+    app.jinja_env.globals['responsive_image'] = responsive_image
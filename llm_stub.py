@@ -0,0 +1,208 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import click
+
+ANALYSIS_CATEGORIES = ('market_analysis', 'feasibility', 'creativity', 'impact', 'business_potential')
+
+def stub_evaluation(prompt):
+    # Derived from the prompt so the same idea always gets the same scores
+    rng = random.Random(hashlib.sha256(prompt.encode('utf-8')).digest())
+    scores = {category: rng.randint(4, 9) for category in ANALYSIS_CATEGORIES}
+    return {
+        'overall_rating': round(sum(scores.values()) / len(scores)),
+        'overall_feedback': 'Stub evaluation generated by the local LLM stub server.',
+        'detailed_analysis': {
+            category: {'score': score, 'feedback': f'Stub {category.replace("_", " ")} feedback.'}
+            for category, score in scores.items()
+        },
+        'improvements': ['Stub improvement 1', 'Stub improvement 2', 'Stub improvement 3'],
+        'strengths': ['Stub strength 1', 'Stub strength 2'],
+        'challenges': ['Stub challenge 1', 'Stub challenge 2'],
+        'next_steps': ['Stub next step 1', 'Stub next step 2']
+    }
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Speaks just enough of the OpenAI chat completions API for IdeaEvaluator
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without this, keep-alive
+    # clients see delayed-ACK stalls of ~40ms per response
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return self._send_json(400, {'error': {'message': 'Invalid JSON body'}})
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            return self._send_json(404, {'error': {'message': f'Unknown path {self.path}'}})
+
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            scripted = server.script.popleft() if server.script else None
+        if server.latency:
+            time.sleep(server.latency)
+        if scripted:
+            # (status, Retry-After) queued by a test; None sends no header
+            status, retry_after = scripted
+            return self._send_json(status, {'error': {'message': 'Scripted failure'}},
+                                   {'Retry-After': str(retry_after)} if retry_after is not None else None)
+        if server.error_rate and random.random() < server.error_rate:
+            status = random.choice((429, 503))
+            return self._send_json(status, {'error': {'message': 'Stub failure'}},
+                                   {'Retry-After': str(server.retry_after)} if status == 429 else None)
+
+        messages = request.get('messages') or []
+        prompt = '\n'.join(message.get('content', '') for message in messages)
+        content = json.dumps(stub_evaluation(prompt))
+        prompt_tokens, completion_tokens = len(prompt) // 4, len(content) // 4
+        self._send_json(200, {
+            'id': f'stub-{server.requests}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', 'stub'),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens
+            }
+        })
+
+def create_stub_server(host='127.0.0.1', port=8089, latency=0.0, error_rate=0.0, retry_after=1, verbose=False):
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.error_rate = error_rate
+    server.retry_after = retry_after
+    server.verbose = verbose
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.connections = 0
+    server.script = deque()
+    return server
+
+@click.command('serve-llm-stub')
+@click.option('--host', default='127.0.0.1', show_default=True)
+@click.option('--port', default=8089, show_default=True)
+@click.option('--latency', default=0.0, show_default=True, help='Seconds to wait before each response.')
+@click.option('--error-rate', default=0.0, show_default=True, help='Fraction of requests answered with 429/503.')
+@click.option('--retry-after', default=1, show_default=True, help='Retry-After seconds sent with 429 responses.')
+@click.option('--verbose', is_flag=True)
+def serve_llm_stub_command(host, port, latency, error_rate, retry_after, verbose):
+    server = create_stub_server(host, port, latency, error_rate, retry_after, verbose)
+    print(f"LLM stub listening on http://{host}:{port}/v1/chat/completions")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def _check(name, ok, detail):
+    print(f"{'PASS' if ok else 'FAIL'}  {name}: {detail}")
+    return ok
+
+@click.command('check-llm-client')
+def check_llm_client_command():
+    # Runs IdeaEvaluator's HTTP client against a scripted stub and checks
+    # retries, Retry-After, giving up and the metrics it records
+    from ai_evaluator import IdeaEvaluator
+
+    server = create_stub_server(port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/v1/chat/completions'
+
+    def run(script, max_retries=3, backoff_max=2.0):
+        server.script.extend(script)
+        evaluator = IdeaEvaluator(api_url=url, api_key='stub', model='stub')
+        evaluator.max_retries = max_retries
+        evaluator.backoff_base = 0.01
+        evaluator.backoff_max = backoff_max
+        start = time.monotonic()
+        try:
+            content = evaluator._call_llama_api('Check prompt')
+        finally:
+            evaluator.close()
+        return content, evaluator.metrics.stats(), time.monotonic() - start
+
+    results = []
+    connections = server.connections
+    content, stats, _ = run([(503, None), (502, None)])
+    results.append(_check('retries 5xx', content is not None and stats['statuses'] == {'503': 1, '502': 1, '200': 1},
+                          f"statuses {stats['statuses']}"))
+    results.append(_check('metrics', (stats['attempts'], stats['retries'], stats['failures']) == (3, 2, 0)
+                          and stats['prompt_tokens'] > 0, f"{stats['attempts']} attempts, {stats['retries']} retries, "
+                          f"{stats['failures']} failures, {stats['prompt_tokens']} prompt tokens"))
+    results.append(_check('keep-alive', server.connections - connections == 1,
+                          f"{server.connections - connections} connection(s) for 3 requests"))
+
+    content, stats, elapsed = run([(429, 1)])
+    results.append(_check('honours Retry-After', content is not None and elapsed >= 1.0,
+                          f"succeeded after {elapsed:.2f}s with Retry-After: 1"))
+
+    content, stats, elapsed = run([(429, 30)])
+    results.append(_check('gives up past backoff_max', content is None and stats['attempts'] == 1
+                          and stats['failures'] == 1 and elapsed < 1.0,
+                          f"{stats['attempts']} attempt(s) in {elapsed:.2f}s with Retry-After: 30"))
+
+    content, stats, _ = run([(503, None)] * 3, max_retries=2)
+    results.append(_check('gives up after max_retries', content is None and stats['attempts'] == 3
+                          and stats['failures'] == 1, f"{stats['attempts']} attempts with max_retries=2"))
+
+    content, stats, _ = run([(400, None)])
+    results.append(_check('no retry on 4xx', content is None and stats['attempts'] == 1,
+                          f"{stats['attempts']} attempt(s) on 400"))
+
+    # Same random 429/503 mix as serve-llm-stub --error-rate 0.3 --retry-after 0
+    server.error_rate, server.retry_after = 0.3, 0
+    evaluator = IdeaEvaluator(api_url=url, api_key='stub', model='stub')
+    evaluator.max_retries = 10
+    evaluator.backoff_base = 0.01
+    evaluator.backoff_max = 0.5
+    requests_before = server.requests
+    try:
+        succeeded = sum(evaluator._call_llama_api('Check prompt') is not None for _ in range(20))
+    finally:
+        evaluator.close()
+    server.error_rate = 0.0
+    stats = evaluator.metrics.stats()
+    errors = stats['attempts'] - stats['statuses'].get('200', 0)
+    results.append(_check('error rate', succeeded == 20 and stats['retries'] == errors
+                          and stats['attempts'] == server.requests - requests_before,
+                          f"{succeeded}/20 calls succeeded, {errors} errors retried, statuses {stats['statuses']}"))
+
+    server.shutdown()
+    server.server_close()
+    if not all(results):
+        raise click.ClickException(f'{results.count(False)} LLM client checks failed')
+    print(f"All {len(results)} LLM client checks passed.")
+
+def init_app(app):
+    app.cli.add_command(serve_llm_stub_command)
+    app.cli.add_command(check_llm_client_command)
@@ -0,0 +1,735 @@
+import hashlib
+import os
+import re
+import tempfile
+import time
+import click
+from config import Config
+from database import get_db_connection
+
+APP_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+def _initial_schema(c):
+    c.execute('''CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        age INTEGER,
+        skills TEXT,
+        interests TEXT,
+        bio TEXT,
+        profile_image TEXT DEFAULT 'default-avatar.png',
+        join_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        quiz_streak INTEGER DEFAULT 0,
+        total_points INTEGER DEFAULT 0,
+        last_quiz_date DATE
+    )''')
+    
+    c.execute('''CREATE TABLE IF NOT EXISTS ideas (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        title TEXT NOT NULL,
+        problem_statement TEXT NOT NULL,
+        solution_description TEXT NOT NULL,
+        category TEXT,
+        status TEXT DEFAULT 'active',
+        created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        view_count INTEGER DEFAULT 0,
+        like_count INTEGER DEFAULT 0,
+        development_stage TEXT DEFAULT "Idea",
+        target_market TEXT DEFAULT "",
+        budget_range TEXT DEFAULT "",
+        timeline TEXT DEFAULT "",
+        tags TEXT DEFAULT "",
+        team_needs TEXT DEFAULT "",
+        inspiration TEXT DEFAULT "",
+        open_collaboration INTEGER DEFAULT 0,
+        comment_count INTEGER DEFAULT 0,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )''')
+
+    c.execute('''CREATE TABLE IF NOT EXISTS comments (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        idea_id INTEGER,
+        user_id INTEGER,
+        comment_text TEXT NOT NULL,
+        created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (idea_id) REFERENCES ideas (id),
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )''')
+    
+    c.execute('''CREATE TABLE IF NOT EXISTS session_bookings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        mentor_id INTEGER,
+        student_name TEXT NOT NULL,
+        student_email TEXT NOT NULL,
+        session_date DATE NOT NULL,
+        session_time TEXT NOT NULL,
+        session_topic TEXT,
+        meeting_link TEXT,
+        status TEXT DEFAULT 'confirmed',
+        created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users (id),
+        FOREIGN KEY (mentor_id) REFERENCES mentors (id)
+    )''')
+    
+    c.execute('''CREATE TABLE IF NOT EXISTS teams (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        team_id INTEGER,
+        idea_id INTEGER,
+        member_username TEXT,
+        is_founder INTEGER DEFAULT 0,
+        status TEXT DEFAULT 'active',
+        joined_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (idea_id) REFERENCES ideas (id)
+    )''')
+    
+    c.execute('''CREATE TABLE IF NOT EXISTS team_applications (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        idea_id INTEGER,
+        applicant_username TEXT,
+        message TEXT,
+        skills TEXT,
+        experience TEXT,
+        availability TEXT,
+        status TEXT DEFAULT 'pending',
+        applied_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (idea_id) REFERENCES ideas (id)
+    )''')
+    
+    c.execute('''CREATE TABLE IF NOT EXISTS team_messages (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        team_id INTEGER,
+        username TEXT,
+        message TEXT,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''')
+    
+    c.execute('''CREATE TABLE IF NOT EXISTS mentors (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        expertise TEXT,
+        bio TEXT,
+        availability TEXT,
+        rating REAL DEFAULT 5.0,
+        verified_status INTEGER DEFAULT 1,
+        profile_image TEXT DEFAULT 'mentor-default.png',
+        created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''')
+    
+    c.execute('''CREATE TABLE IF NOT EXISTS quiz_questions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        question TEXT NOT NULL,
+        options TEXT NOT NULL,
+        correct_answer INTEGER NOT NULL,
+        explanation TEXT,
+        category TEXT,
+        difficulty_level INTEGER DEFAULT 1
+    )''')
+    
+    c.execute('''CREATE TABLE IF NOT EXISTS user_progress (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        quiz_answers TEXT,
+        correct_count INTEGER DEFAULT 0,
+        streak_count INTEGER DEFAULT 0,
+        achievement_badges TEXT,
+        last_activity TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )''')
+    
+    c.execute('''CREATE TABLE IF NOT EXISTS idea_likes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        idea_id INTEGER,
+        created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users (id),
+        FOREIGN KEY (idea_id) REFERENCES ideas (id),
+        UNIQUE(user_id, idea_id)
+    )''')
+
+    c.execute('''CREATE TABLE IF NOT EXISTS quiz_analytics (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        quiz_date DATE DEFAULT CURRENT_DATE,
+        total_questions INTEGER,
+        correct_answers INTEGER,
+        accuracy REAL,
+        time_taken INTEGER,
+        questions_data TEXT,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )''')
+    
+    c.execute('''CREATE TABLE IF NOT EXISTS profile_updates (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        field_updated TEXT,
+        old_value TEXT,
+        new_value TEXT,
+        updated_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )''')
+
+    c.execute('''CREATE TABLE IF NOT EXISTS idea_evaluations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        idea_id INTEGER,
+        user_id INTEGER,
+        evaluation_data TEXT,
+        created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (idea_id) REFERENCES ideas (id),
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )''')
+
+def _ideas_detail_columns(c):
+    c.execute("PRAGMA table_info(ideas)")
+    existing_columns = {column[1] for column in c.fetchall()}
+    
+    ideas_columns = [
+        ('development_stage', 'TEXT DEFAULT "Idea"'),
+        ('target_market', 'TEXT DEFAULT ""'),
+        ('budget_range', 'TEXT DEFAULT ""'),
+        ('timeline', 'TEXT DEFAULT ""'),
+        ('tags', 'TEXT DEFAULT ""'),
+        ('team_needs', 'TEXT DEFAULT ""'),
+        ('inspiration', 'TEXT DEFAULT ""'),
+        ('open_collaboration', 'INTEGER DEFAULT 0'),
+        ('comment_count', 'INTEGER DEFAULT 0'),
+        ('view_count', 'INTEGER DEFAULT 0'),
+        ('like_count', 'INTEGER DEFAULT 0')
+    ]
+    
+    for column_name, column_type in ideas_columns:
+        if column_name not in existing_columns:
+            c.execute(f'ALTER TABLE ideas ADD COLUMN {column_name} {column_type}')
+            print(f"Added column {column_name} to ideas table")
+    
+    c.execute('''UPDATE ideas SET 
+                 view_count = COALESCE(view_count, 0),
+                 like_count = COALESCE(like_count, 0),
+                 comment_count = COALESCE(comment_count, 0),
+                 development_stage = COALESCE(development_stage, "Idea"),
+                 target_market = COALESCE(target_market, ""),
+                 budget_range = COALESCE(budget_range, ""),
+                 timeline = COALESCE(timeline, ""),
+                 tags = COALESCE(tags, ""),
+                 team_needs = COALESCE(team_needs, ""),
+                 inspiration = COALESCE(inspiration, ""),
+                 open_collaboration = COALESCE(open_collaboration, 0)
+                 WHERE view_count IS NULL OR like_count IS NULL OR comment_count IS NULL
+                 OR development_stage IS NULL OR open_collaboration IS NULL''')
+
+def _hot_path_indexes(c):
+    c.execute('CREATE INDEX IF NOT EXISTS idx_ideas_user_created ON ideas (user_id, created_date)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_comments_idea_created ON comments (idea_id, created_date)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_comments_user ON comments (user_id)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_teams_member_status ON teams (member_username, status, team_id)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_teams_team_status ON teams (team_id, status, member_username, is_founder)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_teams_idea_founder ON teams (idea_id, is_founder)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_team_messages_team_time ON team_messages (team_id, timestamp)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_team_applications_applicant ON team_applications (applicant_username, applied_date)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_team_applications_idea ON team_applications (idea_id, applicant_username)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_quiz_analytics_user_date ON quiz_analytics (user_id, quiz_date, accuracy)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_idea_likes_idea ON idea_likes (idea_id)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_idea_evaluations_idea ON idea_evaluations (idea_id)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_session_bookings_user_date ON session_bookings (user_id, session_date, session_time)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_profile_updates_user_date ON profile_updates (user_id, updated_date)')
+
+def _ideas_not_null(c):
+    # SQLite cannot add NOT NULL to an existing column, so rebuild the table
+    c.execute('''CREATE TABLE ideas_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        title TEXT NOT NULL DEFAULT '',
+        problem_statement TEXT NOT NULL DEFAULT '',
+        solution_description TEXT NOT NULL DEFAULT '',
+        category TEXT NOT NULL DEFAULT 'General',
+        status TEXT NOT NULL DEFAULT 'active',
+        created_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        updated_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        view_count INTEGER NOT NULL DEFAULT 0,
+        like_count INTEGER NOT NULL DEFAULT 0,
+        development_stage TEXT NOT NULL DEFAULT 'Idea',
+        target_market TEXT NOT NULL DEFAULT '',
+        budget_range TEXT NOT NULL DEFAULT '',
+        timeline TEXT NOT NULL DEFAULT '',
+        tags TEXT NOT NULL DEFAULT '',
+        team_needs TEXT NOT NULL DEFAULT '',
+        inspiration TEXT NOT NULL DEFAULT '',
+        open_collaboration INTEGER NOT NULL DEFAULT 0,
+        comment_count INTEGER NOT NULL DEFAULT 0,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )''')
+    
+    c.execute('''INSERT INTO ideas_new (
+                    id, user_id, title, problem_statement, solution_description, category, status,
+                    created_date, updated_date, view_count, like_count, development_stage,
+                    target_market, budget_range, timeline, tags, team_needs, inspiration,
+                    open_collaboration, comment_count)
+                 SELECT
+                    id, user_id,
+                    COALESCE(title, ''),
+                    COALESCE(problem_statement, ''),
+                    COALESCE(solution_description, ''),
+                    COALESCE(NULLIF(category, ''), 'General'),
+                    COALESCE(status, 'active'),
+                    COALESCE(created_date, CURRENT_TIMESTAMP),
+                    COALESCE(updated_date, created_date, CURRENT_TIMESTAMP),
+                    COALESCE(view_count, 0),
+                    COALESCE(like_count, 0),
+                    COALESCE(development_stage, 'Idea'),
+                    COALESCE(target_market, ''),
+                    COALESCE(budget_range, ''),
+                    COALESCE(timeline, ''),
+                    COALESCE(tags, ''),
+                    COALESCE(team_needs, ''),
+                    COALESCE(inspiration, ''),
+                    COALESCE(open_collaboration, 0),
+                    COALESCE(comment_count, 0)
+                 FROM ideas''')
+    
+    c.execute('DROP TABLE ideas')
+    c.execute('ALTER TABLE ideas_new RENAME TO ideas')
+    
+    c.execute('CREATE INDEX IF NOT EXISTS idx_ideas_user_created ON ideas (user_id, created_date)')
+    c.execute("""CREATE INDEX IF NOT EXISTS idx_ideas_active_newest
+                 ON ideas (created_date DESC) WHERE status = 'active'""")
+    c.execute("""CREATE INDEX IF NOT EXISTS idx_ideas_active_popular
+                 ON ideas (like_count DESC, view_count DESC, created_date DESC) WHERE status = 'active'""")
+    c.execute("""CREATE INDEX IF NOT EXISTS idx_ideas_active_views
+                 ON ideas (view_count DESC, created_date DESC) WHERE status = 'active'""")
+    c.execute("""CREATE INDEX IF NOT EXISTS idx_ideas_active_comments
+                 ON ideas (comment_count DESC, created_date DESC) WHERE status = 'active'""")
+    c.execute("""CREATE INDEX IF NOT EXISTS idx_ideas_active_category
+                 ON ideas (category, created_date DESC) WHERE status = 'active'""")
+    c.execute('CREATE INDEX IF NOT EXISTS idx_ideas_open_collaboration ON ideas (open_collaboration, created_date)')
+
+def _idea_counter_triggers(c):
+    c.execute('''CREATE TRIGGER IF NOT EXISTS trg_idea_likes_insert AFTER INSERT ON idea_likes
+                 BEGIN
+                     UPDATE ideas SET like_count = like_count + 1 WHERE id = NEW.idea_id;
+                 END''')
+    c.execute('''CREATE TRIGGER IF NOT EXISTS trg_idea_likes_delete AFTER DELETE ON idea_likes
+                 BEGIN
+                     UPDATE ideas SET like_count = MAX(like_count - 1, 0) WHERE id = OLD.idea_id;
+                 END''')
+    c.execute('''CREATE TRIGGER IF NOT EXISTS trg_comments_insert AFTER INSERT ON comments
+                 BEGIN
+                     UPDATE ideas SET comment_count = comment_count + 1 WHERE id = NEW.idea_id;
+                 END''')
+    c.execute('''CREATE TRIGGER IF NOT EXISTS trg_comments_delete AFTER DELETE ON comments
+                 BEGIN
+                     UPDATE ideas SET comment_count = MAX(comment_count - 1, 0) WHERE id = OLD.idea_id;
+                 END''')
+
+def _ideas_keyset_indexes(c):
+    # Rebuild the listing indexes with an explicit id DESC tie-breaker so the
+    # keyset cursor (sort columns..., id) is served entirely by the index
+    for name in ('newest', 'popular', 'views', 'comments', 'category'):
+        c.execute(f'DROP INDEX IF EXISTS idx_ideas_active_{name}')
+    c.execute("""CREATE INDEX idx_ideas_active_newest
+                 ON ideas (created_date DESC, id DESC) WHERE status = 'active'""")
+    c.execute("""CREATE INDEX idx_ideas_active_popular
+                 ON ideas (like_count DESC, view_count DESC, created_date DESC, id DESC) WHERE status = 'active'""")
+    c.execute("""CREATE INDEX idx_ideas_active_views
+                 ON ideas (view_count DESC, created_date DESC, id DESC) WHERE status = 'active'""")
+    c.execute("""CREATE INDEX idx_ideas_active_comments
+                 ON ideas (comment_count DESC, created_date DESC, id DESC) WHERE status = 'active'""")
+    c.execute("""CREATE INDEX idx_ideas_active_category
+                 ON ideas (category, created_date DESC, id DESC) WHERE status = 'active'""")
+
+def _ideas_fts(c):
+    c.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS ideas_fts USING fts5(
+        title, problem_statement, solution_description, tags,
+        content='ideas', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )''')
+    c.execute('''CREATE TRIGGER IF NOT EXISTS trg_ideas_fts_insert AFTER INSERT ON ideas
+                 BEGIN
+                     INSERT INTO ideas_fts (rowid, title, problem_statement, solution_description, tags)
+                     VALUES (NEW.id, NEW.title, NEW.problem_statement, NEW.solution_description, NEW.tags);
+                 END''')
+    c.execute('''CREATE TRIGGER IF NOT EXISTS trg_ideas_fts_delete AFTER DELETE ON ideas
+                 BEGIN
+                     INSERT INTO ideas_fts (ideas_fts, rowid, title, problem_statement, solution_description, tags)
+                     VALUES ('delete', OLD.id, OLD.title, OLD.problem_statement, OLD.solution_description, OLD.tags);
+                 END''')
+    # Only the indexed columns, so counter updates never touch the FTS index
+    c.execute('''CREATE TRIGGER IF NOT EXISTS trg_ideas_fts_update
+                 AFTER UPDATE OF title, problem_statement, solution_description, tags ON ideas
+                 BEGIN
+                     INSERT INTO ideas_fts (ideas_fts, rowid, title, problem_statement, solution_description, tags)
+                     VALUES ('delete', OLD.id, OLD.title, OLD.problem_statement, OLD.solution_description, OLD.tags);
+                     INSERT INTO ideas_fts (rowid, title, problem_statement, solution_description, tags)
+                     VALUES (NEW.id, NEW.title, NEW.problem_statement, NEW.solution_description, NEW.tags);
+                 END''')
+    c.execute("INSERT INTO ideas_fts (ideas_fts) VALUES ('rebuild')")
+
+def _user_stats(c):
+    c.execute('''CREATE TABLE IF NOT EXISTS user_stats (
+        user_id INTEGER PRIMARY KEY,
+        ideas_count INTEGER NOT NULL DEFAULT 0,
+        likes_received INTEGER NOT NULL DEFAULT 0,
+        views_received INTEGER NOT NULL DEFAULT 0,
+        total_quizzes INTEGER NOT NULL DEFAULT 0,
+        accuracy_sum REAL NOT NULL DEFAULT 0,
+        recent_scores TEXT NOT NULL DEFAULT '[]',
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )''')
+    # Backfill as the rollup was defined when this migration was written;
+    # later changes to user_stats.rebuild_user_stats must not alter it
+    c.execute('''
+        INSERT OR REPLACE INTO user_stats 
+        (user_id, ideas_count, likes_received, views_received, total_quizzes, accuracy_sum, recent_scores, updated_at)
+        SELECT 
+            u.id,
+            (SELECT COUNT(*) FROM ideas WHERE user_id = u.id),
+            (SELECT COALESCE(SUM(like_count), 0) FROM ideas WHERE user_id = u.id),
+            (SELECT COALESCE(SUM(view_count), 0) FROM ideas WHERE user_id = u.id),
+            (SELECT COUNT(*) FROM quiz_analytics WHERE user_id = u.id),
+            (SELECT COALESCE(SUM(accuracy), 0) FROM quiz_analytics WHERE user_id = u.id),
+            (SELECT json_group_array(accuracy) FROM (
+                SELECT accuracy FROM quiz_analytics WHERE user_id = u.id 
+                ORDER BY quiz_date DESC, id DESC LIMIT 10
+            )),
+            CURRENT_TIMESTAMP
+        FROM users u
+    ''')
+
+def _quiz_answers(c):
+    c.execute('''CREATE TABLE IF NOT EXISTS quiz_answers (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        quiz_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        question_id INTEGER,
+        category TEXT NOT NULL DEFAULT 'General',
+        selected_answer INTEGER,
+        is_correct INTEGER NOT NULL DEFAULT 0,
+        answered_date DATE DEFAULT CURRENT_DATE,
+        FOREIGN KEY (quiz_id) REFERENCES quiz_analytics (id),
+        FOREIGN KEY (user_id) REFERENCES users (id),
+        FOREIGN KEY (question_id) REFERENCES quiz_questions (id)
+    )''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_quiz_answers_quiz ON quiz_answers (quiz_id)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_quiz_answers_user_category ON quiz_answers (user_id, category)')
+    
+    c.execute('''CREATE TABLE IF NOT EXISTS quiz_category_stats (
+        user_id INTEGER NOT NULL,
+        category TEXT NOT NULL,
+        answered INTEGER NOT NULL DEFAULT 0,
+        correct INTEGER NOT NULL DEFAULT 0,
+        accuracy REAL GENERATED ALWAYS AS (CAST(correct AS REAL) / MAX(answered, 1)) STORED,
+        PRIMARY KEY (user_id, category)
+    )''')
+    # Lets best_category be read off the front of the index
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_quiz_category_stats_best 
+                 ON quiz_category_stats (user_id, accuracy DESC, answered DESC)''')
+    
+    c.execute('''CREATE TRIGGER IF NOT EXISTS trg_quiz_answers_insert AFTER INSERT ON quiz_answers
+                 BEGIN
+                     INSERT INTO quiz_category_stats (user_id, category, answered, correct)
+                     VALUES (NEW.user_id, NEW.category, 1, NEW.is_correct)
+                     ON CONFLICT (user_id, category) DO UPDATE SET 
+                     answered = answered + 1, 
+                     correct = correct + excluded.correct;
+                 END''')
+    
+    # Backfill from the answers previously kept only as JSON on quiz_analytics
+    c.execute('''INSERT INTO quiz_answers 
+                 (quiz_id, user_id, question_id, category, selected_answer, is_correct, answered_date)
+                 SELECT qa.id, qa.user_id, qq.id, COALESCE(qq.category, 'General'),
+                        json_extract(a.value, '$.selectedAnswer'),
+                        qq.correct_answer IS json_extract(a.value, '$.selectedAnswer'),
+                        qa.quiz_date
+                 FROM quiz_analytics qa
+                 JOIN json_each(CASE WHEN json_valid(qa.questions_data) THEN qa.questions_data ELSE '[]' END) a
+                 JOIN quiz_questions qq ON qq.id = json_extract(a.value, '$.questionId')
+                 WHERE qa.user_id IS NOT NULL AND a.type = 'object'
+                 ORDER BY qa.id, a.key''')
+
+# Append new migrations to the end; never renumber or edit one that has shipped.
+def _content_addressed_uploads(c):
+    # Copy flat legacy uploads into the content-addressed layout; the
+    # originals become unreferenced and the upload collector removes them.
+    # The layout is spelled out here rather than taken from upload_store so
+    # later changes there cannot alter what this migration did
+    upload_folder = os.path.join(APP_ROOT, Config.UPLOAD_FOLDER)
+    content_key = re.compile(r'^[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(\.[a-z0-9]+)?$')
+    rows = c.execute('SELECT id, profile_image FROM users WHERE profile_image IS NOT NULL').fetchall()
+    copied, missing = 0, []
+    for user_id, filename in rows:
+        # default-avatar.png is the column default, not an upload
+        if filename == 'default-avatar.png' or content_key.match(filename):
+            continue
+        path = os.path.join(upload_folder, filename)
+        if not os.path.isfile(path):
+            missing.append(filename)
+            continue
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        key = f'{digest[:2]}/{digest[2:4]}/{digest}{os.path.splitext(filename)[1].lower()}'
+        target = os.path.join(upload_folder, *key.split('/'))
+        if not os.path.isfile(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target + '.tmp', 'wb') as f:
+                f.write(data)
+            os.replace(target + '.tmp', target)
+        c.execute('UPDATE users SET profile_image = ? WHERE id = ?', (key, user_id))
+        copied += 1
+    print(f"Copied {copied} legacy uploads into {upload_folder}")
+    if missing:
+        print(f"Skipped {len(missing)} legacy uploads not found in {upload_folder}: {', '.join(missing)}")
+
+def _quiz_bank_version(c):
+    # Bumped by any write to quiz_questions so the in-memory bank in every
+    # worker can tell when to reload
+    c.execute('''CREATE TABLE IF NOT EXISTS quiz_bank_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL
+    )''')
+    c.execute('INSERT OR IGNORE INTO quiz_bank_version (id, version) VALUES (1, 1)')
+    for event in ('INSERT', 'UPDATE', 'DELETE'):
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_quiz_questions_{event.lower()}
+            AFTER {event} ON quiz_questions
+            BEGIN
+                UPDATE quiz_bank_version SET version = version + 1 WHERE id = 1;
+            END''')
+
+def _daily_quizzes(c):
+    # One stored question set per day and difficulty tier (0 = all tiers)
+    c.execute('''CREATE TABLE IF NOT EXISTS daily_quizzes (
+        quiz_date DATE NOT NULL,
+        difficulty_level INTEGER NOT NULL DEFAULT 0,
+        question_ids TEXT NOT NULL,
+        created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (quiz_date, difficulty_level)
+    )''')
+    c.execute('ALTER TABLE quiz_analytics ADD COLUMN difficulty_level INTEGER DEFAULT 0')
+
+def _evaluation_cache(c):
+    # Keyed by a hash of the prompt fields, model and prompt version
+    c.execute('''CREATE TABLE IF NOT EXISTS evaluation_cache (
+        cache_key TEXT PRIMARY KEY,
+        model TEXT NOT NULL,
+        prompt_version TEXT NOT NULL,
+        evaluation_data TEXT NOT NULL,
+        created_at REAL NOT NULL
+    ) WITHOUT ROWID''')
+
+def _evaluation_jobs(c):
+    c.execute('''CREATE TABLE IF NOT EXISTS evaluation_jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        idea_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        status TEXT NOT NULL DEFAULT 'queued',
+        force_refresh INTEGER NOT NULL DEFAULT 0,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        lease_expires REAL,
+        evaluation_id INTEGER,
+        error TEXT,
+        created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        started_at TIMESTAMP,
+        finished_at TIMESTAMP,
+        FOREIGN KEY (idea_id) REFERENCES ideas (id),
+        FOREIGN KEY (user_id) REFERENCES users (id),
+        FOREIGN KEY (evaluation_id) REFERENCES idea_evaluations (id)
+    )''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_evaluation_jobs_status ON evaluation_jobs (status, id)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_evaluation_jobs_idea ON evaluation_jobs (idea_id, status)')
+
+def _app_settings(c):
+    # Runtime overrides shared by every worker process
+    c.execute('''CREATE TABLE IF NOT EXISTS app_settings (
+        key TEXT PRIMARY KEY,
+        value TEXT,
+        updated_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''')
+
+def _bulk_evaluation_runs(c):
+    # last_idea_id is the checkpoint: every active idea up to it has been
+    # evaluated (or failed) and written by the run
+    c.execute('''CREATE TABLE IF NOT EXISTS bulk_evaluation_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_name TEXT UNIQUE NOT NULL,
+        backend TEXT,
+        model TEXT,
+        prompt_version TEXT,
+        last_idea_id INTEGER NOT NULL DEFAULT 0,
+        evaluated INTEGER NOT NULL DEFAULT 0,
+        failed INTEGER NOT NULL DEFAULT 0,
+        started_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        finished_date TIMESTAMP
+    )''')
+
+def _bulk_evaluation_failures(c):
+    # Ideas a run gave up on; resuming the run retries them before moving on
+    c.execute('''CREATE TABLE IF NOT EXISTS bulk_evaluation_failures (
+        run_id INTEGER NOT NULL,
+        idea_id INTEGER NOT NULL,
+        error TEXT,
+        attempts INTEGER NOT NULL DEFAULT 1,
+        failed_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (run_id, idea_id),
+        FOREIGN KEY (run_id) REFERENCES bulk_evaluation_runs (id) ON DELETE CASCADE
+    )''')
+
+def _bulk_evaluation_done(c):
+    # Ideas above the checkpoint that a run has already written; the
+    # checkpoint cannot pass an idea still in flight, so these would
+    # otherwise be evaluated again on resume
+    c.execute('''CREATE TABLE IF NOT EXISTS bulk_evaluation_done (
+        run_id INTEGER NOT NULL,
+        idea_id INTEGER NOT NULL,
+        PRIMARY KEY (run_id, idea_id),
+        FOREIGN KEY (run_id) REFERENCES bulk_evaluation_runs (id) ON DELETE CASCADE
+    )''')
+
+MIGRATIONS = [
+    (1, 'initial_schema', _initial_schema),
+    (2, 'ideas_detail_columns', _ideas_detail_columns),
+    (3, 'hot_path_indexes', _hot_path_indexes),
+    (4, 'ideas_not_null', _ideas_not_null),
+    (5, 'idea_counter_triggers', _idea_counter_triggers),
+    (6, 'ideas_keyset_indexes', _ideas_keyset_indexes),
+    (7, 'ideas_fts', _ideas_fts),
+    (8, 'user_stats', _user_stats),
+    (9, 'quiz_answers', _quiz_answers),
+    (10, 'content_addressed_uploads', _content_addressed_uploads),
+    (11, 'quiz_bank_version', _quiz_bank_version),
+    (12, 'daily_quizzes', _daily_quizzes),
+    (13, 'evaluation_cache', _evaluation_cache),
+    (14, 'evaluation_jobs', _evaluation_jobs),
+    (15, 'app_settings', _app_settings),
+    (16, 'bulk_evaluation_runs', _bulk_evaluation_runs),
+    (17, 'bulk_evaluation_failures', _bulk_evaluation_failures),
+    (18, 'bulk_evaluation_done', _bulk_evaluation_done)
+]
+
+def _ensure_version_table(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        duration_ms REAL
+    )''')
+
+def get_schema_version(conn):
+    return conn.execute('SELECT COALESCE(MAX(version), 0) FROM schema_version').fetchone()[0]
+
+def run_migrations(database=None, migrations=None):
+    migrations = sorted(migrations or MIGRATIONS, key=lambda m: m[0])
+    conn = get_db_connection(database)
+    conn.isolation_level = None
+    applied = []
+    
+    try:
+        _ensure_version_table(conn)
+        current_version = get_schema_version(conn)
+        pending = [m for m in migrations if m[0] > current_version]
+        
+        if not pending:
+            print(f"Database schema is up to date (version {current_version}).")
+            return applied
+        
+        for version, name, migrate in pending:
+            start = time.perf_counter()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                # Another worker may have applied it while we waited for the write lock
+                if get_schema_version(conn) >= version:
+                    conn.execute('ROLLBACK')
+                    continue
+                
+                migrate(conn.cursor())
+                duration_ms = (time.perf_counter() - start) * 1000
+                conn.execute(
+                    'INSERT INTO schema_version (version, name, duration_ms) VALUES (?, ?, ?)',
+                    (version, name, duration_ms)
+                )
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                print(f"Migration {version} ({name}) failed; rolled back.")
+                raise
+            
+            applied.append((version, name, duration_ms))
+            print(f"Applied migration {version} ({name}) in {duration_ms:.1f}ms")
+        
+        return applied
+    finally:
+        conn.close()
+
+# Hot-path queries covered by the indexes in _hot_path_indexes; each must be
+# answered by an index search rather than a full scan of a table
+HOT_PATH_QUERIES = [
+    ('idea comments', '''SELECT c.comment_text, c.created_date, u.username FROM comments c
+                         JOIN users u ON c.user_id = u.id WHERE c.idea_id = ? ORDER BY c.created_date DESC'''),
+    ('idea comment count', 'SELECT COUNT(*), MAX(id), MAX(created_date) FROM comments WHERE idea_id = ?'),
+    ('user ideas', 'SELECT * FROM ideas WHERE user_id = ? ORDER BY created_date DESC'),
+    ('user teams', '''SELECT i.title, t.team_id, COUNT(*) FROM teams t JOIN ideas i ON t.idea_id = i.id
+                      WHERE t.member_username = ? AND t.status = 'active' GROUP BY t.team_id'''),
+    ('team members', "SELECT member_username, is_founder FROM teams WHERE team_id = ? AND status = 'active'"),
+    ('team membership', 'SELECT 1 FROM teams WHERE team_id = ? AND member_username = ?'),
+    ('idea founder team', 'SELECT team_id FROM teams WHERE idea_id = ? AND is_founder = 1'),
+    ('team messages', 'SELECT username, message, timestamp FROM team_messages WHERE team_id = ? ORDER BY timestamp ASC'),
+    ('my applications', '''SELECT ta.idea_id, i.title, u.username, ta.message, ta.status, ta.applied_date
+                           FROM team_applications ta JOIN ideas i ON ta.idea_id = i.id JOIN users u ON i.user_id = u.id
+                           WHERE ta.applicant_username = ? ORDER BY ta.applied_date DESC'''),
+    ('existing application', 'SELECT id FROM team_applications WHERE idea_id = ? AND applicant_username = ?'),
+    ('quiz taken today', "SELECT id FROM quiz_analytics WHERE user_id = ? AND quiz_date = DATE('now')"),
+    ('idea likes', 'SELECT COUNT(*) FROM idea_likes WHERE idea_id = ?'),
+    ('idea evaluations', 'SELECT evaluation_data FROM idea_evaluations WHERE idea_id = ?'),
+    ('user bookings', '''SELECT sb.id, m.name, sb.session_date, sb.session_time FROM session_bookings sb
+                         JOIN mentors m ON sb.mentor_id = m.id WHERE sb.user_id = ?
+                         ORDER BY sb.session_date DESC, sb.session_time DESC'''),
+    ('profile history', '''SELECT field_updated, old_value, new_value, updated_date FROM profile_updates
+                           WHERE user_id = ? ORDER BY updated_date DESC LIMIT 50''')
+]
+
+TABLE_REFERENCE = re.compile(r'\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', re.IGNORECASE)
+SQL_KEYWORDS = {'where', 'join', 'left', 'inner', 'cross', 'on', 'group', 'order', 'limit', 'using'}
+
+def find_table_scans(conn, queries=None):
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    scans = []
+    for name, sql in queries or HOT_PATH_QUERIES:
+        # EXPLAIN QUERY PLAN names a table by its alias when it has one; a
+        # SCAN through an index still visits every row, so it counts too
+        scanned = set(tables)
+        for table, alias in TABLE_REFERENCE.findall(sql):
+            if table in tables and alias and alias.lower() not in SQL_KEYWORDS:
+                scanned.add(alias)
+        params = (None,) * sql.count('?')
+        for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params):
+            detail = row[3]
+            words = detail.split()
+            if words[0] == 'SCAN' and words[1] in scanned:
+                scans.append((name, detail))
+    return scans
+
+@click.command('check-query-plans')
+@click.option('--database', default=None, help='Database to check; defaults to a freshly migrated temporary one.')
+def check_query_plans_command(database):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if database is None:
+            database = os.path.join(tmp_dir, 'plans.db')
+            run_migrations(database)
+        conn = get_db_connection(database)
+        try:
+            scans = find_table_scans(conn)
+        finally:
+            conn.close()
+    for name, detail in scans:
+        print(f"{name}: {detail}")
+    if scans:
+        raise click.ClickException(f'{len(scans)} hot-path queries scan a whole table')
+    print(f"All {len(HOT_PATH_QUERIES)} hot-path queries use an index.")
+
+def init_app(app):
+    app.cli.add_command(check_query_plans_command)
@@ -0,0 +1,159 @@
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+import click
+from database import execute_query, execute_single, get_db_connection
+
+QUIZ_SIZE = 15
+
+QUESTIONS_QUERY = '''
+    SELECT id, question, options, correct_answer, explanation, category, difficulty_level
+    FROM quiz_questions ORDER BY id
+'''
+VERSION_QUERY = 'SELECT version FROM quiz_bank_version WHERE id = 1'
+
+def _question_to_dict(row):
+    return {
+        'id': row['id'],
+        'question': row['question'],
+        'options': json.loads(row['options']),
+        'correct_answer': row['correct_answer'],
+        'explanation': row['explanation'] if row['explanation'] else 'Great job!',
+        'category': row['category'] if row['category'] else 'General',
+        'difficulty_level': row['difficulty_level']
+    }
+
+def load_quiz_questions(conn=None):
+    rows = conn.execute(QUESTIONS_QUERY).fetchall() if conn else execute_query(QUESTIONS_QUERY)
+    return [_question_to_dict(row) for row in rows]
+
+def read_bank_version(conn=None):
+    row = conn.execute(VERSION_QUERY).fetchone() if conn else execute_single(VERSION_QUERY)
+    return row[0] if row else 0
+
+class QuizBank:
+    # Questions are parsed once into a tuple and sampled by index. Triggers
+    # bump quiz_bank_version on any change to quiz_questions, so every worker
+    # notices edits with one single-row read per check_interval
+    def __init__(self, loader=load_quiz_questions, version_reader=read_bank_version, check_interval=1.0):
+        self.loader = loader
+        self.version_reader = version_reader
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._questions = ()
+        self._by_id = {}
+        self._version = None
+        self._checked_at = None
+        self._loads = 0
+        self._last_load_ms = 0.0
+
+    def _refresh(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._checked_at is not None and now - self._checked_at < self.check_interval:
+                return
+            version = self.version_reader()
+            if version != self._version:
+                start = time.perf_counter()
+                questions = tuple(self.loader())
+                self._by_id = {question['id']: question for question in questions}
+                self._questions = questions
+                self._version = version
+                self._loads += 1
+                self._last_load_ms = (time.perf_counter() - start) * 1000
+            self._checked_at = now
+
+    def questions(self):
+        checked_at = self._checked_at
+        if checked_at is None or time.monotonic() - checked_at >= self.check_interval:
+            self._refresh()
+        return self._questions
+
+    def get(self, question_id):
+        self.questions()
+        return self._by_id.get(question_id)
+
+    def sample(self, k=QUIZ_SIZE, rng=random):
+        # Drawing k indices costs O(k) whatever the bank size, unlike
+        # ORDER BY RANDOM() which sorts every row
+        questions = self.questions()
+        return [questions[i] for i in rng.sample(range(len(questions)), min(k, len(questions)))]
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
+            self._checked_at = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'questions': len(self._questions),
+                'version': self._version,
+                'loads': self._loads,
+                'last_load_ms': round(self._last_load_ms, 3),
+                'check_interval': self.check_interval
+            }
+
+quiz_bank = QuizBank()
+
+def get_quiz_bank():
+    return quiz_bank.questions()
+
+def invalidate_quiz_bank():
+    quiz_bank.invalidate()
+
+def _median_ms(fn, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+@click.command('bench-quiz')
+@click.option('--sizes', default='1000,10000,100000', show_default=True, help='Comma-separated bank sizes to measure.')
+@click.option('--runs', default=200, show_default=True, help='Timed samples per size; the median is reported.')
+@click.option('--seed', default=42, show_default=True)
+def bench_quiz_command(sizes, runs, seed):
+    from migrations import run_migrations
+
+    rng = random.Random(seed)
+    categories = ['Innovation', 'Business', 'Technology', 'Leadership', 'Design Thinking']
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database = os.path.join(tmp_dir, 'bench.db')
+        run_migrations(database)
+        conn = get_db_connection(database)
+        bank = QuizBank(lambda: load_quiz_questions(conn), lambda: read_bank_version(conn), check_interval=0)
+
+        print(f"{'questions':>10}{'ORDER BY RANDOM()':>19}{'bank sample':>13}{'bank load':>11}  (median ms, load once)")
+        total = 0
+        for size in sorted(int(size) for size in sizes.split(',')):
+            with conn:
+                conn.executemany(
+                    '''INSERT INTO quiz_questions (question, options, correct_answer, explanation, category, difficulty_level)
+                       VALUES (?, ?, ?, ?, ?, ?)''',
+                    ((f'Question {n}?', json.dumps([f'Option {n}.{i}' for i in range(4)]), rng.randrange(4),
+                      f'Explanation {n}', rng.choice(categories), rng.randint(1, 3))
+                     for n in range(total, size))
+                )
+            total = max(total, size)
+
+            def order_by_random():
+                rows = conn.execute('SELECT * FROM quiz_questions ORDER BY RANDOM() LIMIT ?', (QUIZ_SIZE,)).fetchall()
+                return [json.loads(row['options']) for row in rows]
+
+            bank.questions()
+            load_ms = bank.stats()['last_load_ms']
+            bank.check_interval = 3600
+            sample_ms = _median_ms(lambda: bank.sample(QUIZ_SIZE, rng), runs)
+            bank.check_interval = 0
+            print(f"{total:>10}{_median_ms(order_by_random, max(runs // 20, 3)):>19.3f}{sample_ms:>13.4f}{load_ms:>11.1f}")
+        conn.close()
+
+def init_app(app):
+    quiz_bank.check_interval = app.config.get('QUIZ_BANK_CHECK_INTERVAL', quiz_bank.check_interval)
+    app.cli.add_command(bench_quiz_command)
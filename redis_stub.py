@@ -0,0 +1,161 @@
+import fnmatch
+import threading
+import time
+from socketserver import StreamRequestHandler, ThreadingTCPServer
+import click
+
+class CommandError(Exception):
+    pass
+
+class RedisStubHandler(StreamRequestHandler):
+    # Speaks just enough RESP2 for RedisBackend: PING, AUTH, SELECT, GET,
+    # SET with EX/PX, INCR, DEL, SCAN with MATCH/COUNT, DBSIZE and FLUSHDB
+    disable_nagle_algorithm = True
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            # Inline commands, as typed into telnet or nc
+            return line.split()
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _encode(self, value):
+        if value is None:
+            return b'$-1\r\n'
+        if isinstance(value, CommandError):
+            return b'-ERR %s\r\n' % str(value).encode()
+        if isinstance(value, int):
+            return b':%d\r\n' % value
+        if isinstance(value, str):
+            return b'+%s\r\n' % value.encode()
+        if isinstance(value, list):
+            return b'*%d\r\n' % len(value) + b''.join(self._encode(item) for item in value)
+        return b'$%d\r\n%s\r\n' % (len(value), value)
+
+    def handle(self):
+        while True:
+            try:
+                args = self._read_command()
+            except (OSError, ValueError):
+                return
+            if args is None:
+                return
+            if not args:
+                continue
+            if self.server.verbose:
+                print(' '.join(arg.decode(errors='replace') for arg in args)[:200])
+            try:
+                reply = self.server.execute(args[0].decode().upper(), args[1:])
+            except CommandError as e:
+                reply = e
+            except (ValueError, IndexError):
+                reply = CommandError('syntax error')
+            self.wfile.write(self._encode(reply))
+
+class RedisStubServer(ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, verbose=False):
+        super().__init__(address, RedisStubHandler)
+        self.verbose = verbose
+        self.lock = threading.Lock()
+        self.data = {}
+        self.commands = 0
+        self.scan_positions = {}
+        self.next_cursor = 0
+
+    def _get(self, key):
+        entry = self.data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            del self.data[key]
+            return None
+        return entry
+
+    def execute(self, command, args):
+        with self.lock:
+            self.commands += 1
+            if command == 'PING':
+                return args[0] if args else 'PONG'
+            if command in ('AUTH', 'SELECT'):
+                return 'OK'
+            if command == 'GET':
+                entry = self._get(args[0])
+                return entry[0] if entry else None
+            if command == 'SET':
+                expires_at = None
+                options = [arg.decode().upper() for arg in args[2::2]]
+                for option, value in zip(options, args[3::2]):
+                    if option not in ('EX', 'PX'):
+                        raise CommandError('syntax error')
+                    expires_at = time.monotonic() + int(value) / (1 if option == 'EX' else 1000)
+                self.data[args[0]] = (args[1], expires_at)
+                return 'OK'
+            if command == 'INCR':
+                entry = self._get(args[0])
+                try:
+                    value = int(entry[0]) + 1 if entry else 1
+                except ValueError:
+                    raise CommandError('value is not an integer or out of range')
+                self.data[args[0]] = (str(value).encode(), entry[1] if entry else None)
+                return value
+            if command == 'DEL':
+                deleted = 0
+                for key in args:
+                    if self._get(key) is not None:
+                        del self.data[key]
+                        deleted += 1
+                return deleted
+            if command == 'SCAN':
+                # A cursor remembers the last key it returned, so keys deleted
+                # between pages (as RedisBackend.clear does) never cause a skip
+                cursor, pattern, count = int(args[0]), '*', 10
+                for option, value in zip(args[1::2], args[2::2]):
+                    option = option.decode().upper()
+                    if option == 'MATCH':
+                        pattern = value.decode()
+                    elif option == 'COUNT':
+                        count = int(value)
+                after = self.scan_positions.pop(cursor, None) if cursor else None
+                keys = sorted(key for key in list(self.data)
+                              if (after is None or key > after) and self._get(key) is not None)
+                page = keys[:count]
+                next_cursor = 0
+                if len(keys) > count:
+                    self.next_cursor += 1
+                    next_cursor = self.next_cursor
+                    self.scan_positions[next_cursor] = page[-1]
+                return [str(next_cursor).encode(),
+                        [key for key in page if fnmatch.fnmatchcase(key.decode(errors='replace'), pattern)]]
+            if command == 'DBSIZE':
+                return sum(1 for key in list(self.data) if self._get(key) is not None)
+            if command == 'FLUSHDB':
+                self.data.clear()
+                return 'OK'
+            raise CommandError(f"unknown command '{command}'")
+
+def create_stub_server(host='127.0.0.1', port=6379, verbose=False):
+    return RedisStubServer((host, port), verbose)
+
+@click.command('serve-redis-stub')
+@click.option('--host', default='127.0.0.1', show_default=True)
+@click.option('--port', default=6379, show_default=True)
+@click.option('--verbose', is_flag=True, help='Print every command received.')
+def serve_redis_stub_command(host, port, verbose):
+    server = create_stub_server(host, port, verbose)
+    print(f"Redis stub listening on redis://{host}:{port}/0 (in-memory, not persisted)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def init_app(app):
+    app.cli.add_command(serve_redis_stub_command)
@@ -0,0 +1,99 @@
+import json
+import threading
+import time
+from cache_backends import MemoryBackend, create_backend
+
+class ResponseCache:
+    # Keys carry the namespace's version, so a bump makes every older entry
+    # unreachable at once; the stale entries age out through LRU and TTL.
+    # Values are stored as JSON so every backend sees the same bytes.
+    ERROR_LOG_INTERVAL = 60
+
+    def __init__(self, backend=None, ttl=60):
+        self.backend = backend or MemoryBackend()
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._errors = 0
+        self._last_error_log = 0.0
+
+    def configure(self, backend=None, ttl=None):
+        if backend is not None:
+            self.backend = backend
+        if ttl is not None:
+            self.ttl = ttl
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _backend_failed(self, action, error):
+        # The cache must never take a page down with it, so failures fall
+        # through to the loader and are logged at most once a minute
+        self._count('_errors')
+        now = time.monotonic()
+        if now - self._last_error_log >= self.ERROR_LOG_INTERVAL:
+            self._last_error_log = now
+            print(f"Cache backend {self.backend.name} {action} failed: {error}")
+
+    def version(self, namespace):
+        return self.backend.get_counter(f'version:{namespace}')
+
+    def bump(self, namespace):
+        try:
+            return self.backend.incr(f'version:{namespace}')
+        except Exception as e:
+            self._backend_failed('bump', e)
+
+    def get_or_load(self, namespace, key, loader, ttl=None):
+        try:
+            cache_key = f'{namespace}:{self.version(namespace)}:{json.dumps(key)}'
+            cached = self.backend.get(cache_key)
+        except Exception as e:
+            self._backend_failed('get', e)
+            return loader()
+        
+        if cached is not None:
+            self._count('_hits')
+            return json.loads(cached)
+        
+        self._count('_misses')
+        value = loader()
+        try:
+            self.backend.set(cache_key, json.dumps(value, separators=(',', ':')).encode(), self.ttl if ttl is None else ttl)
+        except Exception as e:
+            self._backend_failed('set', e)
+        return value
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            stats = {
+                'ttl': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': round(self._hits / lookups, 3) if lookups else 0.0,
+                'errors': self._errors
+            }
+        try:
+            stats.update(self.backend.stats())
+        except Exception as e:
+            stats['backend_error'] = str(e)
+        return stats
+
+response_cache = ResponseCache()
+
+def init_app(app):
+    response_cache.configure(
+        backend=create_backend(
+            app.config.get('RESPONSE_CACHE_BACKEND', 'memory'),
+            max_entries=app.config.get('RESPONSE_CACHE_MAX_ENTRIES', 1024),
+            sqlite_path=app.config.get('RESPONSE_CACHE_SQLITE_PATH'),
+            redis_url=app.config.get('RESPONSE_CACHE_REDIS_URL')
+        ),
+        ttl=app.config.get('RESPONSE_CACHE_TTL')
+    )
@@ -1,6 +1,15 @@
-from flask import Blueprint, request, jsonify, session
-from routes.auth import login_required
-from database import execute_query, execute_single, execute_insert
+from flask import Blueprint, request, jsonify, session, current_app
+from routes.auth import login_required, operator_required
+from database import execute_query, execute_single, execute_insert, get_pool_stats, transaction
+from view_counter import view_counter
+from idea_listing import get_ideas_page, get_idea_detail, count_ideas, invalidate_idea_listing, idea_to_dict, InvalidCursor
+from response_cache import response_cache
+from evaluation_jobs import enqueue_evaluation, get_job, evaluation_workers
+from ai_evaluator import evaluator_holder
+from daily_quiz import get_daily_questions, get_daily_question_ids, grade_daily_quiz, available_difficulties, accepted_quiz_date, quiz_today, ALL_DIFFICULTIES, PASS_ACCURACY
+from http_cache import conditional_json, not_modified, make_etag, parse_timestamp
+from idea_search import search_ideas
+from user_stats import get_user_stats, adjust_user_stats, adjust_idea_owner_stats, record_quiz_result, record_quiz_answers
 from datetime import datetime
 import json
 import sys
@@ -9,56 +18,57 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 api_bp = Blueprint('api', __name__)
 
+@api_bp.route('/api/ideas')
+@login_required
+def list_ideas():
+    search = request.args.get('search', '')
+    category = request.args.get('category', '')
+    sort_by = request.args.get('sort', 'newest')
+    cursor = request.args.get('cursor')
+    limit = min(request.args.get('limit', current_app.config['IDEAS_PAGE_SIZE'], type=int), 100)
+    
+    try:
+        ideas_page, next_cursor = get_ideas_page(search, category, sort_by, cursor, max(limit, 1))
+        
+        return jsonify({
+            'ideas': [idea_to_dict(row) for row in ideas_page],
+            'next_cursor': next_cursor,
+            'total': count_ideas(search, category, current_app.config['IDEAS_COUNT_CACHE_TTL'])
+        })
+        
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error listing ideas: {e}")
+        return jsonify({'error': 'Failed to load ideas'}), 500
+
+@api_bp.route('/api/search')
+@login_required
+def search():
+    query = request.args.get('q', '').strip()
+    category = request.args.get('category', '')
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 50)
+    
+    if not query:
+        return jsonify({'query': query, 'results': []})
+    
+    try:
+        return jsonify({'query': query, 'results': search_ideas(query, category, limit)})
+        
+    except Exception as e:
+        print(f"Error searching ideas: {e}")
+        return jsonify({'error': 'Search failed'}), 500
+
 @api_bp.route('/api/idea/<int:idea_id>')
 @login_required
 def get_idea(idea_id):
     try:
-        idea_data = execute_single('''SELECT 
-                        i.id,
-                        COALESCE(i.title, '') as title,
-                        COALESCE(i.problem_statement, '') as problem_statement,
-                        COALESCE(i.solution_description, '') as solution_description,
-                        COALESCE(i.category, 'General') as category,
-                        COALESCE(i.created_date, datetime('now')) as created_date,
-                        COALESCE(i.view_count, 0) as view_count,
-                        COALESCE(i.like_count, 0) as like_count,
-                        COALESCE(u.username, 'Unknown') as username,
-                        COALESCE(i.development_stage, 'Idea') as development_stage,
-                        COALESCE(i.target_market, '') as target_market,
-                        COALESCE(i.budget_range, '') as budget_range,
-                        COALESCE(i.timeline, '') as timeline,
-                        COALESCE(i.tags, '') as tags,
-                        COALESCE(i.comment_count, 0) as comment_count,
-                        COALESCE(i.team_needs, '') as team_needs,
-                        COALESCE(i.inspiration, '') as inspiration,
-                        COALESCE(i.open_collaboration, 0) as open_collaboration
-                   FROM ideas i 
-                   LEFT JOIN users u ON i.user_id = u.id 
-                   WHERE i.id = ? AND COALESCE(i.status, 'active') = 'active' ''', (idea_id,))
-        
-        if not idea_data:
+        idea = get_idea_detail(idea_id)
+        
+        if not idea:
             return jsonify({'error': 'Idea not found'}), 404
             
-        return jsonify({
-            'id': idea_data[0],
-            'title': idea_data[1],
-            'problem_statement': idea_data[2],
-            'solution_description': idea_data[3],
-            'category': idea_data[4],
-            'created_date': idea_data[5],
-            'view_count': idea_data[6],
-            'like_count': idea_data[7],
-            'username': idea_data[8],
-            'development_stage': idea_data[9],
-            'target_market': idea_data[10],
-            'budget_range': idea_data[11],
-            'timeline': idea_data[12],
-            'tags': idea_data[13],
-            'comment_count': idea_data[14],
-            'team_needs': idea_data[15],
-            'inspiration': idea_data[16],
-            'open_collaboration': idea_data[17]
-        })
+        return conditional_json(idea)
         
     except Exception as e:
         print(f"Error fetching idea: {e}")
@@ -72,6 +82,18 @@ def get_comments(idea_id):
         return jsonify({'error': 'Idea not found'}), 404
     
     try:
+        # Comments are append-only with AUTOINCREMENT ids, so count and max id
+        # change whenever the list does
+        count, last_id, last_created = execute_single(
+            'SELECT COUNT(*), MAX(id), MAX(created_date) FROM comments WHERE idea_id = ?', 
+            (idea_id,)
+        )
+        etag = make_etag('comments', idea_id, count, last_id)
+        last_modified = parse_timestamp(last_created)
+        cached = not_modified(etag, last_modified)
+        if cached:
+            return cached
+        
         comments_data = execute_query('''
             SELECT c.comment_text, c.created_date, u.username 
             FROM comments c 
@@ -88,7 +110,7 @@ def get_comments(idea_id):
                 'author': row[2]
             })
         
-        return jsonify(comments)
+        return conditional_json(comments, etag, last_modified)
         
     except Exception as e:
         print(f"Error getting comments: {e}")
@@ -104,23 +126,20 @@ def post_comment():
     if not comment_text:
         return jsonify({'error': 'Comment text is required'}), 400
     
-    idea_data = execute_single('SELECT id, comment_count FROM ideas WHERE id = ?', (idea_id,))
-    if not idea_data:
-        return jsonify({'error': 'Idea not found'}), 404
-    
-    current_comment_count = idea_data[1] or 0
-    
     try:
-        execute_insert('''
-            INSERT INTO comments (idea_id, user_id, comment_text) 
-            VALUES (?, ?, ?)
-        ''', (idea_id, session['user_id'], comment_text))
-        
-        new_count = current_comment_count + 1
-        execute_query('UPDATE ideas SET comment_count = ? WHERE id = ?', (new_count, idea_id))
-        
-        username = execute_single('SELECT username FROM users WHERE id = ?', (session['user_id'],))[0]
+        with transaction() as tx:
+            if not tx.single('SELECT id FROM ideas WHERE id = ?', (idea_id,)):
+                return jsonify({'error': 'Idea not found'}), 404
+            
+            # comment_count is maintained by the trg_comments_insert trigger
+            tx.insert('''
+                INSERT INTO comments (idea_id, user_id, comment_text) 
+                VALUES (?, ?, ?)
+            ''', (idea_id, session['user_id'], comment_text))
+            
+            username = tx.single('SELECT username FROM users WHERE id = ?', (session['user_id'],))[0]
         
+        invalidate_idea_listing()
         return jsonify({
             'text': comment_text,
             'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
@@ -134,35 +153,28 @@ def post_comment():
 @api_bp.route('/like_idea/<int:idea_id>', methods=['POST'])
 @login_required
 def like_idea(idea_id):
-    idea_data = execute_single('SELECT id, like_count FROM ideas WHERE id = ?', (idea_id,))
-    if not idea_data:
-        return jsonify({'error': 'Idea not found'}), 404
-    
-    current_like_count = idea_data[1] or 0
-    
     try:
-        existing_like = execute_single(
-            'SELECT id FROM idea_likes WHERE user_id = ? AND idea_id = ?', 
-            (session['user_id'], idea_id)
-        )
-        
-        if existing_like:
-            execute_query(
+        with transaction() as tx:
+            if not tx.single('SELECT id FROM ideas WHERE id = ?', (idea_id,)):
+                return jsonify({'error': 'Idea not found'}), 404
+            
+            # like_count is maintained by the trg_idea_likes_* triggers
+            removed = tx.execute(
                 'DELETE FROM idea_likes WHERE user_id = ? AND idea_id = ?', 
                 (session['user_id'], idea_id)
-            )
-            new_count = max(0, current_like_count - 1)
-            execute_query('UPDATE ideas SET like_count = ? WHERE id = ?', (new_count, idea_id))
-            liked = False
-        else:
-            execute_insert(
-                'INSERT INTO idea_likes (user_id, idea_id) VALUES (?, ?)', 
-                (session['user_id'], idea_id)
-            )
-            new_count = current_like_count + 1
-            execute_query('UPDATE ideas SET like_count = ? WHERE id = ?', (new_count, idea_id))
-            liked = True
+            ).rowcount
+            
+            if not removed:
+                tx.insert(
+                    'INSERT INTO idea_likes (user_id, idea_id) VALUES (?, ?)', 
+                    (session['user_id'], idea_id)
+                )
+            liked = not removed
+            adjust_idea_owner_stats(tx, idea_id, likes_received=1 if liked else -1)
+            
+            new_count = tx.single('SELECT like_count FROM ideas WHERE id = ?', (idea_id,))[0]
 
+        invalidate_idea_listing()
         return jsonify({'liked': liked, 'like_count': new_count})
         
     except Exception as e:
@@ -173,13 +185,23 @@ def like_idea(idea_id):
 @login_required
 def get_user_likes():
     try:
+        count, last_id, last_liked = execute_single(
+            'SELECT COUNT(*), MAX(id), MAX(created_date) FROM idea_likes WHERE user_id = ?', 
+            (session['user_id'],)
+        )
+        etag = make_etag('user_likes', session['user_id'], count, last_id)
+        last_modified = parse_timestamp(last_liked)
+        cached = not_modified(etag, last_modified)
+        if cached:
+            return cached
+        
         liked_ideas_data = execute_query(
             'SELECT idea_id FROM idea_likes WHERE user_id = ?', 
             (session['user_id'],)
         )
         liked_ideas = [row[0] for row in liked_ideas_data]
         
-        return jsonify(liked_ideas)
+        return conditional_json(liked_ideas, etag, last_modified)
         
     except Exception as e:
         print(f"Error getting user likes: {e}")
@@ -188,21 +210,36 @@ def get_user_likes():
 @api_bp.route('/api/increment_view/<int:idea_id>', methods=['POST'])
 @login_required
 def increment_view(idea_id):
+    if current_app.config.get('VIEW_BUFFER_ENABLED'):
+        view_counter.record(idea_id)
+        return jsonify({'success': True, 'queued': True})
+    
     try:
-        result = execute_single('SELECT view_count FROM ideas WHERE id = ?', (idea_id,))
-        
-        if result:
-            current_views = result[0] or 0
-            new_views = current_views + 1
-            execute_query('UPDATE ideas SET view_count = ? WHERE id = ?', (new_views, idea_id))
-            return jsonify({'success': True, 'views': new_views})
+        with transaction() as tx:
+            result = tx.single(
+                'UPDATE ideas SET view_count = view_count + 1 WHERE id = ? RETURNING view_count, user_id', 
+                (idea_id,)
+            )
+            
+            if not result:
+                return jsonify({'error': 'Idea not found'}), 404
+            
+            if result[1] is not None:
+                adjust_user_stats(tx, result[1], views_received=1)
         
-        return jsonify({'error': 'Idea not found'}), 404
+        return jsonify({'success': True, 'views': result[0]})
         
     except Exception as e:
         print(f"Error incrementing view: {e}")
         return jsonify({'error': 'Failed to update view count'}), 500
 
+def _quiz_difficulty(value):
+    try:
+        difficulty = int(value)
+    except (TypeError, ValueError):
+        return ALL_DIFFICULTIES
+    return difficulty if difficulty in available_difficulties() else ALL_DIFFICULTIES
+
 @api_bp.route('/get_daily_quiz')
 @login_required
 def get_daily_quiz():
@@ -215,20 +252,11 @@ def get_daily_quiz():
         return jsonify({'questions': []})
     
     try:
-        questions_data = execute_query('SELECT * FROM quiz_questions ORDER BY RANDOM() LIMIT 15')
-        
-        quiz_questions = []
-        for q in questions_data:
-            quiz_questions.append({
-                'id': q[0],
-                'question': q[1],
-                'options': json.loads(q[2]),
-                'correct_answer': q[3],
-                'explanation': q[4] if q[4] else 'Great job!',
-                'category': q[5] if q[5] else 'General'
-            })
+        difficulty = _quiz_difficulty(request.args.get('difficulty'))
+        quiz_date = quiz_today()
+        quiz_questions = get_daily_questions(difficulty, quiz_date)
         
-        return jsonify({'questions': quiz_questions})
+        return jsonify({'questions': quiz_questions, 'difficulty': difficulty, 'quiz_date': quiz_date})
         
     except Exception as e:
         print(f"Error getting quiz questions: {e}")
@@ -243,38 +271,60 @@ def submit_quiz_answer():
 @login_required
 def update_quiz_stats():
     data = request.get_json()
-    questions_answered = data.get('questions_answered', 0)
-    correct_answers = data.get('correct_answers', 0)
-    accuracy = data.get('accuracy', 0)
-    points_earned = data.get('points_earned', 0)
+    difficulty = _quiz_difficulty(data.get('difficulty'))
     time_taken = data.get('time_taken', 0)
-    quiz_data = json.dumps(data.get('quiz_data', {}))
+    answers = data.get('quiz_data') or []
+    quiz_date = accepted_quiz_date(data.get('quiz_date'))
+    if quiz_date is None:
+        return jsonify({'error': 'This quiz has expired. Please start today\'s quiz.'}), 400
     
     try:
-        if accuracy >= 70:  
-            execute_query('''
-                UPDATE users SET 
-                total_points = total_points + ?,
-                quiz_streak = quiz_streak + 1,
-                last_quiz_date = DATE('now')
-                WHERE id = ?
-            ''', (points_earned, session['user_id']))
-        else:
-            execute_query('''
-                UPDATE users SET 
-                total_points = total_points + ?,
-                quiz_streak = 0,
-                last_quiz_date = DATE('now')
-                WHERE id = ?
-            ''', (points_earned, session['user_id']))
-        
-        execute_insert('''
-            INSERT INTO quiz_analytics 
-            (user_id, total_questions, correct_answers, accuracy, time_taken, questions_data)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (session['user_id'], questions_answered, correct_answers, accuracy, time_taken, quiz_data))
+        # Graded against the stored daily set the client was served;
+        # client-reported scores are ignored
+        grade = grade_daily_quiz(get_daily_question_ids(difficulty, quiz_date),
+                                 answers if isinstance(answers, list) else [])
+        accuracy = grade['accuracy']
+        points_earned = grade['points_earned']
+        quiz_data = json.dumps([
+            {'questionId': r['questionId'], 'selectedAnswer': r['selectedAnswer'], 'correct': r['correct']}
+            for r in grade['results']
+        ])
+        
+        with transaction() as tx:
+            # Keyed by the day the set was served, so yesterday's set cannot
+            # be submitted again after midnight
+            if tx.single('''SELECT id FROM quiz_analytics 
+                            WHERE user_id = ? AND quiz_date = ?''', (session['user_id'], quiz_date)):
+                return jsonify({'error': 'Quiz already completed for this day'}), 400
+            
+            if accuracy >= PASS_ACCURACY:  
+                tx.execute('''
+                    UPDATE users SET 
+                    total_points = total_points + ?,
+                    quiz_streak = quiz_streak + 1,
+                    last_quiz_date = DATE('now')
+                    WHERE id = ?
+                ''', (points_earned, session['user_id']))
+            else:
+                tx.execute('''
+                    UPDATE users SET 
+                    total_points = total_points + ?,
+                    quiz_streak = 0,
+                    last_quiz_date = DATE('now')
+                    WHERE id = ?
+                ''', (points_earned, session['user_id']))
+            
+            quiz_id = tx.insert('''
+                INSERT INTO quiz_analytics 
+                (user_id, quiz_date, total_questions, correct_answers, accuracy, time_taken, questions_data, difficulty_level)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (session['user_id'], quiz_date, grade['questions_answered'], grade['correct_answers'], accuracy, 
+                  time_taken, quiz_data, difficulty))
+            
+            record_quiz_answers(tx, quiz_id, session['user_id'], grade['results'])
+            record_quiz_result(tx, session['user_id'], accuracy)
         
-        return jsonify({'status': 'success'})
+        return jsonify(dict(grade, status='success'))
         
     except Exception as e:
         print(f"Error updating quiz stats: {e}")
@@ -284,39 +334,17 @@ def update_quiz_stats():
 @login_required
 def get_quiz_analytics():
     try:
-        total_quizzes = execute_single(
-            'SELECT COUNT(*) FROM quiz_analytics WHERE user_id = ?', 
-            (session['user_id'],)
-        )[0]
-        
-        avg_accuracy_result = execute_single(
-            'SELECT AVG(accuracy) FROM quiz_analytics WHERE user_id = ?', 
-            (session['user_id'],)
-        )
-        avg_accuracy = round(avg_accuracy_result[0] or 0, 1)
-        
-        recent_scores_data = execute_query('''
-            SELECT accuracy FROM quiz_analytics WHERE user_id = ? 
-            ORDER BY quiz_date DESC LIMIT 10
-        ''', (session['user_id'],))
-        recent_scores = [round(row[0]) for row in recent_scores_data]
-        recent_scores.reverse()  
-     
-        improvement_rate = 0
-        if len(recent_scores) >= 6:
-            first_three = sum(recent_scores[:3]) / 3
-            last_three = sum(recent_scores[-3:]) / 3
-            improvement_rate = round(((last_three - first_three) / first_three) * 100, 1)
-        
-        best_category = 'Business Basics'  
-        
-        return jsonify({
-            'total_quizzes': total_quizzes,
-            'avg_accuracy': avg_accuracy,
-            'recent_scores': recent_scores,
-            'improvement_rate': max(0, improvement_rate),
-            'best_category': best_category
-        })
+        stats = get_user_stats(session['user_id'])
+        if not stats:
+            return jsonify({'error': 'User not found'}), 404
+        
+        return conditional_json({
+            'total_quizzes': stats['total_quizzes'],
+            'avg_accuracy': stats['avg_accuracy'],
+            'recent_scores': list(reversed(stats['recent_scores'])),
+            'improvement_rate': stats['improvement_rate'],
+            'best_category': stats['best_category']
+        }, last_modified=parse_timestamp(stats['updated_at']))
         
     except Exception as e:
         print(f"Error getting quiz analytics: {e}")
@@ -325,27 +353,32 @@ def get_quiz_analytics():
             'avg_accuracy': 0,
             'recent_scores': [],
             'improvement_rate': 0,
-            'best_category': 'Business Basics'
+            'best_category': None
         }), 500
 
 @api_bp.route('/delete_idea/<int:idea_id>', methods=['DELETE'])
 @login_required
 def delete_idea(idea_id):
-    result = execute_single('SELECT user_id FROM ideas WHERE id = ?', (idea_id,))
-    
-    if not result:
-        return jsonify({'error': 'Idea not found'}), 404
-    
-    if result[0] != session['user_id']:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     try:
-        execute_query('DELETE FROM idea_likes WHERE idea_id = ?', (idea_id,))
-        execute_query('DELETE FROM comments WHERE idea_id = ?', (idea_id,))
-        execute_query('DELETE FROM team_applications WHERE idea_id = ?', (idea_id,))
-        execute_query('DELETE FROM teams WHERE idea_id = ?', (idea_id,))
-        execute_query('DELETE FROM ideas WHERE id = ?', (idea_id,))
+        with transaction() as tx:
+            result = tx.single('SELECT user_id, like_count, view_count FROM ideas WHERE id = ?', (idea_id,))
+            
+            if not result:
+                return jsonify({'error': 'Idea not found'}), 404
+            
+            if result[0] != session['user_id']:
+                return jsonify({'error': 'Unauthorized'}), 403
+            
+            tx.execute('DELETE FROM idea_likes WHERE idea_id = ?', (idea_id,))
+            tx.execute('DELETE FROM comments WHERE idea_id = ?', (idea_id,))
+            tx.execute('DELETE FROM team_applications WHERE idea_id = ?', (idea_id,))
+            tx.execute('DELETE FROM teams WHERE idea_id = ?', (idea_id,))
+            tx.execute('DELETE FROM ideas WHERE id = ?', (idea_id,))
+            
+            adjust_user_stats(tx, session['user_id'], ideas_count=-1, 
+                              likes_received=-result[1], views_received=-result[2])
         
+        invalidate_idea_listing()
         return jsonify({'success': True})
         
     except Exception as e:
@@ -358,88 +391,54 @@ def delete_idea(idea_id):
 @api_bp.route('/evaluate_idea/<int:idea_id>', methods=['POST'])
 @login_required
 def evaluate_idea(idea_id):
-    print(f"Starting evaluation for idea ID: {idea_id}")
-    
     result = execute_single('SELECT user_id FROM ideas WHERE id = ?', (idea_id,))
     
     if not result:
-        print(f"Idea {idea_id} not found")
         return jsonify({'error': 'Idea not found'}), 404
     
-
     if result[0] != session['user_id']:
-        print(f"User {session['user_id']} unauthorized to evaluate idea {idea_id}")
         return jsonify({'error': 'Unauthorized - You can only evaluate your own ideas'}), 403
     
     try:
-        idea_data = execute_single('''
-            SELECT title, problem_statement, solution_description, category, 
-                   development_stage, target_market, budget_range, timeline, tags
-            FROM ideas WHERE id = ?
-        ''', (idea_id,))
-        
-        if not idea_data:
-            print(f"Idea data not found for ID: {idea_id}")
-            return jsonify({'error': 'Idea data not found'}), 404
+        data = request.get_json(silent=True) or {}
+        force_refresh = bool(data.get('force_refresh')) or request.args.get('refresh') == '1'
+        job_id, status = enqueue_evaluation(idea_id, session['user_id'], force_refresh)
         
-        print(f"Retrieved idea data: {idea_data[0]}")  
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status': status,
+            'status_url': f'/evaluation_jobs/{job_id}'
+        }), 202
         
-
-        idea_dict = {
-            'title': idea_data[0] or 'Untitled',
-            'problem_statement': idea_data[1] or 'No problem statement provided',
-            'solution_description': idea_data[2] or 'No solution description provided',
-            'category': idea_data[3] or 'General',
-            'development_stage': idea_data[4] or 'Idea',
-            'target_market': idea_data[5] or 'Not specified',
-            'budget_range': idea_data[6] or 'Not specified',
-            'timeline': idea_data[7] or 'Not specified',
-            'tags': idea_data[8] or ''
-        }
-        
-        print(f"Prepared idea dict for evaluation: {idea_dict['title']}")
-        
-        try:
-            from ai_evaluator import get_evaluator
-            evaluator = get_evaluator()  
-            print(f"Got evaluator: {type(evaluator).__name__}")
-            
-            evaluation = evaluator.evaluate_idea(idea_dict)
-            print(f"Evaluation completed with rating: {evaluation.get('overall_rating', 'Unknown')}")
-            
-            try:
-                evaluation_json = json.dumps(evaluation)
-                execute_insert('''
-                    INSERT OR REPLACE INTO idea_evaluations 
-                    (idea_id, user_id, evaluation_data, created_date) 
-                    VALUES (?, ?, ?, ?)
-                ''', (idea_id, session['user_id'], evaluation_json, datetime.now().isoformat()))
-                print(f"Saved evaluation to database for idea {idea_id}")
-            except Exception as save_error:
-                print(f"Warning: Failed to save evaluation to database: {save_error}")
-            
-            return jsonify({
-                'success': True,
-                'evaluation': evaluation,
-                'message': 'Evaluation completed successfully'
-            })
-            
-        except ImportError as import_error:
-            print(f"Failed to import evaluator: {import_error}")
-            return jsonify({
-                'error': 'Evaluation service not available',
-                'message': 'AI evaluator module could not be loaded'
-            }), 500
-            
     except Exception as e:
-        print(f"Error evaluating idea {idea_id}: {e}")
-        import traceback
-        traceback.print_exc()
+        print(f"Error queueing evaluation for idea {idea_id}: {e}")
         return jsonify({
             'error': 'Failed to evaluate idea', 
             'message': str(e)
         }), 500
 
+@api_bp.route('/evaluation_jobs/<int:job_id>')
+@login_required
+def evaluation_job_status(job_id):
+    try:
+        job = get_job(job_id)
+        if not job or job['user_id'] != session['user_id']:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        return jsonify({
+            'success': True,
+            'job_id': job['job_id'],
+            'idea_id': job['idea_id'],
+            'status': job['status'],
+            'evaluation': job['evaluation'],
+            'error': job['error']
+        })
+        
+    except Exception as e:
+        print(f"Error getting evaluation job {job_id}: {e}")
+        return jsonify({'error': 'Failed to load job status'}), 500
+
 @api_bp.route('/save_evaluation', methods=['POST'])
 @login_required
 def save_evaluation():
@@ -460,4 +459,19 @@ def save_evaluation():
         
     except Exception as e:
         print(f"Error saving evaluation: {e}")
-        return jsonify({'error': 'Failed to save evaluation'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Failed to save evaluation'}), 500
+
+@api_bp.route('/api/db_pool_stats')
+@operator_required
+def db_pool_stats():
+    return jsonify(get_pool_stats())
+
+@api_bp.route('/api/evaluation_stats')
+@operator_required
+def evaluation_stats():
+    return jsonify(dict(evaluation_workers.stats(), evaluator=evaluator_holder.stats()))
+
+@api_bp.route('/api/cache_stats')
+@operator_required
+def cache_stats():
+    return jsonify(response_cache.stats())
\ No newline at end of file
@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, current_app
 from werkzeug.security import generate_password_hash, check_password_hash
 from database import execute_single, execute_insert
 
@@ -97,4 +97,16 @@ def login_required(f):
             flash('Please log in to access this page')
             return redirect(url_for('auth.landing'))
         return f(*args, **kwargs)
+    return decorated_function
+
+def operator_required(f):
+    from functools import wraps
+    
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'user_id' not in session:
+            return jsonify({'error': 'Authentication required'}), 401
+        if session.get('username') not in current_app.config.get('OPERATOR_USERNAMES', set()):
+            return jsonify({'error': 'Unauthorized'}), 403
+        return f(*args, **kwargs)
     return decorated_function
\ No newline at end of file
@@ -1,6 +1,9 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session, abort
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, abort, current_app
 from routes.auth import login_required
-from database import execute_query, execute_single, execute_insert
+from database import execute_query, execute_single, execute_insert, transaction
+from idea_listing import get_ideas_page, get_idea_detail, count_ideas, list_categories, invalidate_idea_listing, InvalidCursor
+from response_cache import response_cache
+from user_stats import get_user_stats, adjust_user_stats
 import random
 
 
@@ -9,10 +12,7 @@ main_bp = Blueprint('main', __name__)
 @main_bp.route('/dashboard')
 @login_required
 def dashboard():
-    user_ideas_count = execute_single(
-        'SELECT COUNT(*) FROM ideas WHERE user_id = ?', 
-        (session['user_id'],)
-    )[0]
+    stats = get_user_stats(session['user_id'])
     
     recent_ideas = execute_query('''
         SELECT i.title, i.created_date, u.username 
@@ -20,21 +20,10 @@ def dashboard():
         ORDER BY i.created_date DESC LIMIT 5
     ''')
     
-    user_stats = execute_single(
-        'SELECT quiz_streak, total_points FROM users WHERE id = ?', 
-        (session['user_id'],)
-    )
-    
-    avg_accuracy_result = execute_single(
-        'SELECT AVG(accuracy) FROM quiz_analytics WHERE user_id = ?', 
-        (session['user_id'],)
-    )
-    avg_accuracy = avg_accuracy_result[0] if avg_accuracy_result[0] else 0
-    
-    enhanced_stats = list(user_stats) + [round(avg_accuracy, 1)] if user_stats else [0, 0, 0]
+    enhanced_stats = [stats['quiz_streak'], stats['total_points'], stats['avg_accuracy']] if stats else [0, 0, 0]
     
     return render_template('dashboard.html', 
-                         user_ideas_count=user_ideas_count,
+                         user_ideas_count=stats['ideas_count'] if stats else 0,
                          recent_ideas=recent_ideas,
                          user_stats=enhanced_stats)
 
@@ -44,90 +33,32 @@ def ideas():
     search = request.args.get('search', '')
     category = request.args.get('category', '')
     sort_by = request.args.get('sort', 'newest')
-    
-    query = '''SELECT 
-                    i.id,
-                    COALESCE(i.title, '') as title,
-                    COALESCE(i.problem_statement, '') as problem_statement,
-                    COALESCE(i.solution_description, '') as solution_description,
-                    COALESCE(i.category, 'General') as category,
-                    COALESCE(DATE(i.created_date), DATE('now')) as created_date,
-                    COALESCE(i.view_count, 0) as view_count,
-                    COALESCE(i.like_count, 0) as like_count,
-                    COALESCE(u.username, 'Unknown') as username,
-                    COALESCE(i.development_stage, 'Idea') as development_stage,
-                    COALESCE(i.target_market, '') as target_market,
-                    COALESCE(i.budget_range, '') as budget_range,
-                    COALESCE(i.timeline, '') as timeline,
-                    COALESCE(i.tags, '') as tags,
-                    COALESCE(i.comment_count, 0) as comment_count,
-                    COALESCE(i.team_needs, '') as team_needs,
-                    COALESCE(i.inspiration, '') as inspiration,
-                    COALESCE(i.open_collaboration, 0) as open_collaboration
-               FROM ideas i 
-               LEFT JOIN users u ON i.user_id = u.id 
-               WHERE COALESCE(i.status, 'active') = 'active' '''
-    params = []
-    
-    if search:
-        query += ''' AND (COALESCE(i.title, '') LIKE ? 
-                     OR COALESCE(i.problem_statement, '') LIKE ? 
-                     OR COALESCE(i.solution_description, '') LIKE ? 
-                     OR COALESCE(i.tags, '') LIKE ?)'''
-        search_param = f'%{search}%'
-        params.extend([search_param, search_param, search_param, search_param])
-    
-    if category:
-        query += ' AND COALESCE(i.category, \'\') = ?'
-        params.append(category)
-    
-    if sort_by == 'popular':
-        query += ' ORDER BY COALESCE(i.like_count, 0) DESC, COALESCE(i.view_count, 0) DESC, i.created_date DESC'
-    elif sort_by == 'views':
-        query += ' ORDER BY COALESCE(i.view_count, 0) DESC, i.created_date DESC'
-    elif sort_by == 'comments':
-        query += ' ORDER BY COALESCE(i.comment_count, 0) DESC, i.created_date DESC'
-    else:
-        query += ' ORDER BY i.created_date DESC'
+    cursor = request.args.get('cursor')
     
     try:
-        all_ideas = execute_query(query, params)
-        print(f"Database query executed successfully. Loaded {len(all_ideas)} ideas")
-        
-        validated_ideas = []
-        for idx, idea in enumerate(all_ideas):
-            if len(idea) >= 18:
-                validated_idea = list(idea)
-                
-                validated_idea[6] = validated_idea[6] if validated_idea[6] is not None else 0  
-                validated_idea[7] = validated_idea[7] if validated_idea[7] is not None else 0
-                validated_idea[14] = validated_idea[14] if validated_idea[14] is not None else 0  
-                validated_idea[17] = validated_idea[17] if validated_idea[17] is not None else 0  
-                
-                validated_ideas.append(tuple(validated_idea))
-            else:
-                print(f"Warning: Idea {idea[0] if idea else 'Unknown'} has only {len(idea)} columns, expected 18. Skipping.")
-                
-        print(f"Validated {len(validated_ideas)} ideas for display")
-                
+        ideas_page, next_cursor = get_ideas_page(
+            search, category, sort_by, cursor, current_app.config['IDEAS_PAGE_SIZE']
+        )
+        total_count = count_ideas(search, category, current_app.config['IDEAS_COUNT_CACHE_TTL'])
+    except InvalidCursor:
+        return redirect(url_for('main.ideas', search=search, category=category, sort=sort_by))
     except Exception as e:
         print(f"Database error in ideas route: {e}")
         import traceback
         traceback.print_exc()
-        validated_ideas = []
+        ideas_page, next_cursor, total_count = [], None, 0
         flash('Error loading ideas. Please try again.', 'error')
     
     try:
-        categories_result = execute_query(
-            'SELECT DISTINCT category FROM ideas WHERE category IS NOT NULL AND category != "" AND category != "null" ORDER BY category'
-        )
-        categories = [row[0] for row in categories_result if row[0]]
+        categories = list_categories()
     except Exception as e:
         print(f"Error fetching categories: {e}")
         categories = []
     
     return render_template('ideas.html', 
-                         ideas=validated_ideas, 
+                         ideas=ideas_page, 
+                         total_count=total_count,
+                         next_cursor=next_cursor,
                          categories=categories,
                          current_search=search, 
                          current_category=category, 
@@ -137,55 +68,11 @@ def ideas():
 @login_required
 def idea_detail(idea_id):
     try:
-        idea_data = execute_single('''
-            SELECT 
-                i.id,
-                COALESCE(i.title, '') as title,
-                COALESCE(i.problem_statement, '') as problem_statement,
-                COALESCE(i.solution_description, '') as solution_description,
-                COALESCE(i.category, 'General') as category,
-                COALESCE(i.created_date, '') as created_date,
-                COALESCE(i.view_count, 0) as view_count,
-                COALESCE(i.like_count, 0) as like_count,
-                COALESCE(u.username, 'Unknown') as username,
-                COALESCE(i.development_stage, 'Idea') as development_stage,
-                COALESCE(i.target_market, '') as target_market,
-                COALESCE(i.budget_range, '') as budget_range,
-                COALESCE(i.timeline, '') as timeline,
-                COALESCE(i.tags, '') as tags,
-                COALESCE(i.comment_count, 0) as comment_count,
-                COALESCE(i.team_needs, '') as team_needs,
-                COALESCE(i.inspiration, '') as inspiration,
-                COALESCE(i.open_collaboration, 0) as open_collaboration
-            FROM ideas i 
-            LEFT JOIN users u ON i.user_id = u.id 
-            WHERE i.id = ? AND COALESCE(i.status, 'active') = 'active'
-        ''', (idea_id,))
+        idea = get_idea_detail(idea_id)
         
-        if not idea_data:
+        if not idea:
             abort(404)
         
-        idea = {
-            'id': idea_data[0],
-            'title': idea_data[1],
-            'problem_statement': idea_data[2],
-            'solution_description': idea_data[3],
-            'category': idea_data[4],
-            'created_date': idea_data[5],
-            'view_count': idea_data[6],
-            'like_count': idea_data[7],
-            'username': idea_data[8],
-            'development_stage': idea_data[9],
-            'target_market': idea_data[10],
-            'budget_range': idea_data[11],
-            'timeline': idea_data[12],
-            'tags': idea_data[13],
-            'comment_count': idea_data[14],
-            'team_needs': idea_data[15],
-            'inspiration': idea_data[16],
-            'open_collaboration': idea_data[17]
-        }
-        
         comments_data = execute_query('''
             SELECT 
                 c.comment_text,
@@ -237,36 +124,38 @@ def submit_idea():
         open_collaboration = 1 if request.form.get('open_collaboration') else 0
         
         try:
-            from database import execute_insert
             from datetime import datetime
             
-            idea_id = execute_insert('''
-                INSERT INTO ideas (
-                    user_id, title, problem_statement, solution_description, 
-                    category, development_stage, target_market, budget_range, 
-                    timeline, tags, team_needs, inspiration, open_collaboration,
-                    view_count, like_count, comment_count, status, created_date
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                session['user_id'], title, problem, solution, category,
-                development_stage, target_market, budget_range, timeline,
-                tags, team_needs, inspiration, open_collaboration,
-                0, 0, 0, 'active', datetime.now().isoformat()
-            ))
-            
-            print(f"Successfully inserted new idea with ID: {idea_id}")
-            
-            if open_collaboration and idea_id:
-                try:
-                    team_id = random.randint(1000, 9999)
-                    execute_insert('''
-                        INSERT INTO teams (team_id, idea_id, member_username, is_founder, status)
-                        VALUES (?, ?, ?, ?, ?)
-                    ''', (team_id, idea_id, session['username'], 1, 'active'))
-                    print(f"Created team {team_id} for idea {idea_id}")
-                except Exception as team_error:
-                    print(f"Warning: Failed to create team for idea {idea_id}: {team_error}")
+            with transaction() as tx:
+                idea_id = tx.insert('''
+                    INSERT INTO ideas (
+                        user_id, title, problem_statement, solution_description, 
+                        category, development_stage, target_market, budget_range, 
+                        timeline, tags, team_needs, inspiration, open_collaboration,
+                        view_count, like_count, comment_count, status, created_date
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    session['user_id'], title, problem, solution, category,
+                    development_stage, target_market, budget_range, timeline,
+                    tags, team_needs, inspiration, open_collaboration,
+                    0, 0, 0, 'active', datetime.now().isoformat()
+                ))
+                
+                print(f"Successfully inserted new idea with ID: {idea_id}")
+                adjust_user_stats(tx, session['user_id'], ideas_count=1)
+                
+                if open_collaboration and idea_id:
+                    try:
+                        team_id = random.randint(1000, 9999)
+                        tx.insert('''
+                            INSERT INTO teams (team_id, idea_id, member_username, is_founder, status)
+                            VALUES (?, ?, ?, ?, ?)
+                        ''', (team_id, idea_id, session['username'], 1, 'active'))
+                        print(f"Created team {team_id} for idea {idea_id}")
+                    except Exception as team_error:
+                        print(f"Warning: Failed to create team for idea {idea_id}: {team_error}")
             
+            invalidate_idea_listing()
             flash('Your idea has been submitted successfully!', 'success')
             return redirect(url_for('main.ideas'))
             
@@ -283,7 +172,10 @@ def submit_idea():
 @login_required
 def mentors():
     try:
-        mentors_data = execute_query('SELECT * FROM mentors ORDER BY rating DESC')
+        mentors_data = response_cache.get_or_load(
+            'mentors', ('list',),
+            lambda: [list(row) for row in execute_query('SELECT * FROM mentors ORDER BY rating DESC')]
+        )
         return render_template('mentors.html', mentors=mentors_data)
     except Exception as e:
         print(f"Error fetching mentors: {e}")
@@ -365,18 +257,8 @@ def teams():
 @login_required
 def quiz():
     try:
-        user_data = execute_single(
-            'SELECT quiz_streak, total_points FROM users WHERE id = ?', 
-            (session['user_id'],)
-        )
-        
-        avg_accuracy_result = execute_single(
-            'SELECT AVG(accuracy) FROM quiz_analytics WHERE user_id = ?', 
-            (session['user_id'],)
-        )
-        avg_accuracy = round(avg_accuracy_result[0] or 0, 1)
-        
-        user_stats = [user_data[0], user_data[1], avg_accuracy] if user_data else [0, 0, 0]
+        stats = get_user_stats(session['user_id'])
+        user_stats = [stats['quiz_streak'], stats['total_points'], stats['avg_accuracy']] if stats else [0, 0, 0]
         
         return render_template('quiz.html', user_stats=user_stats)
         
@@ -407,34 +289,13 @@ def profile():
         user_teams = [{'idea_title': r[0], 'team_id': r[1], 'member_count': r[2], 'role': r[3]} 
                       for r in user_teams_data]
         
-        total_quizzes = execute_single(
-            'SELECT COUNT(*) FROM quiz_analytics WHERE user_id = ?', 
-            (session['user_id'],)
-        )[0]
-        
-        avg_accuracy_result = execute_single(
-            'SELECT AVG(accuracy) FROM quiz_analytics WHERE user_id = ?', 
-            (session['user_id'],)
-        )
-        avg_accuracy = round(avg_accuracy_result[0] or 0, 1)
-        
-        recent_scores_data = execute_query('''
-            SELECT accuracy FROM quiz_analytics WHERE user_id = ? 
-            ORDER BY quiz_date DESC LIMIT 10
-        ''', (session['user_id'],))
-        recent_scores = [round(row[0]) for row in recent_scores_data]
-        
-        improvement_rate = 0
-        if len(recent_scores) >= 6:
-            first_three = sum(recent_scores[-3:]) / 3
-            last_three = sum(recent_scores[:3]) / 3
-            improvement_rate = round(((last_three - first_three) / first_three) * 100, 1) if first_three > 0 else 0
+        stats = get_user_stats(session['user_id'])
         
         quiz_stats = {
-            'total_quizzes': total_quizzes,
-            'avg_accuracy': avg_accuracy,
-            'best_category': 'Business Basics',  
-            'improvement_rate': max(0, improvement_rate)
+            'total_quizzes': stats['total_quizzes'],
+            'avg_accuracy': stats['avg_accuracy'],
+            'best_category': stats['best_category'],
+            'improvement_rate': stats['improvement_rate']
         }
         
         return render_template('profile.html', 
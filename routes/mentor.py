@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify, session
 from routes.auth import login_required
-from database import execute_query, execute_single, execute_insert
+from database import execute_query, execute_single, execute_insert, transaction
 from email_utils import send_booking_confirmation_email, generate_meeting_link
 import uuid
 
@@ -90,24 +90,25 @@ def my_bookings():
 @login_required
 def cancel_booking(booking_id):
     try:
-        booking = execute_single(
-            'SELECT user_id, status FROM session_bookings WHERE id = ?', 
-            (booking_id,)
-        )
-        
-        if not booking:
-            return jsonify({'error': 'Booking not found'}), 404
-        
-        if booking[0] != session['user_id']:
-            return jsonify({'error': 'Unauthorized'}), 403
-        
-        if booking[1] == 'cancelled':
-            return jsonify({'error': 'Booking already cancelled'}), 400
-        
-        execute_query(
-            'UPDATE session_bookings SET status = ? WHERE id = ?', 
-            ('cancelled', booking_id)
-        )
+        with transaction() as tx:
+            booking = tx.single(
+                'SELECT user_id, status FROM session_bookings WHERE id = ?', 
+                (booking_id,)
+            )
+            
+            if not booking:
+                return jsonify({'error': 'Booking not found'}), 404
+            
+            if booking[0] != session['user_id']:
+                return jsonify({'error': 'Unauthorized'}), 403
+            
+            if booking[1] == 'cancelled':
+                return jsonify({'error': 'Booking already cancelled'}), 400
+            
+            tx.execute(
+                'UPDATE session_bookings SET status = ? WHERE id = ?', 
+                ('cancelled', booking_id)
+            )
         
         return jsonify({'success': True, 'message': 'Booking cancelled successfully'})
         
@@ -126,25 +127,26 @@ def reschedule_booking(booking_id):
         return jsonify({'error': 'New date and time are required'}), 400
     
     try:
-        booking = execute_single(
-            'SELECT user_id, status FROM session_bookings WHERE id = ?', 
-            (booking_id,)
-        )
-        
-        if not booking:
-            return jsonify({'error': 'Booking not found'}), 404
-        
-        if booking[0] != session['user_id']:
-            return jsonify({'error': 'Unauthorized'}), 403
-        
-        if booking[1] == 'cancelled':
-            return jsonify({'error': 'Cannot reschedule cancelled booking'}), 400
-        
-        execute_query('''
-            UPDATE session_bookings 
-            SET session_date = ?, session_time = ?, status = 'rescheduled'
-            WHERE id = ?
-        ''', (new_date, new_time, booking_id))
+        with transaction() as tx:
+            booking = tx.single(
+                'SELECT user_id, status FROM session_bookings WHERE id = ?', 
+                (booking_id,)
+            )
+            
+            if not booking:
+                return jsonify({'error': 'Booking not found'}), 404
+            
+            if booking[0] != session['user_id']:
+                return jsonify({'error': 'Unauthorized'}), 403
+            
+            if booking[1] == 'cancelled':
+                return jsonify({'error': 'Cannot reschedule cancelled booking'}), 400
+            
+            tx.execute('''
+                UPDATE session_bookings 
+                SET session_date = ?, session_time = ?, status = 'rescheduled'
+                WHERE id = ?
+            ''', (new_date, new_time, booking_id))
         
         return jsonify({'success': True, 'message': 'Booking rescheduled successfully'})
         
@@ -1,8 +1,12 @@
 from flask import Blueprint, request, jsonify, session, render_template, redirect, url_for
 from werkzeug.utils import secure_filename
 from routes.auth import login_required
-from database import execute_single, execute_query, execute_insert, get_db_connection
+from database import execute_single, execute_query, execute_insert, get_db, transaction
+from idea_listing import invalidate_idea_listing
+from user_stats import get_user_stats, adjust_user_stats
 from config import Config
+from image_variants import schedule_variants
+from upload_store import get_upload_store, upload_collector
 from datetime import datetime
 import os
 import json
@@ -28,32 +32,20 @@ def upload_profile_pic():
         return jsonify({'error': 'Invalid file type. Only PNG, JPG, JPEG, and GIF files are allowed.'}), 400
     
     try:
-        filename = secure_filename(f"profile_{session['user_id']}_{int(datetime.now().timestamp())}_{file.filename}")
-        filepath = os.path.join(Config.UPLOAD_FOLDER, filename)
+        ext = os.path.splitext(secure_filename(file.filename))[1]
+        filename, created = get_upload_store().save(file.stream, ext)
+        if created:
+            schedule_variants(f'uploads/{filename}')
         
-        os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
+        with transaction() as tx:
+            old_image = tx.single('SELECT profile_image FROM users WHERE id = ?', (session['user_id'],))
+            tx.execute('UPDATE users SET profile_image = ? WHERE id = ?', 
+                       (filename, session['user_id']))
         
-        file.save(filepath)
-        
-        conn = get_db_connection()
-        c = conn.cursor()
-        
-        c.execute('SELECT profile_image FROM users WHERE id = ?', (session['user_id'],))
-        old_image = c.fetchone()
-        
-        c.execute('UPDATE users SET profile_image = ? WHERE id = ?', 
-                 (filename, session['user_id']))
-        conn.commit()
-        
-        if old_image and old_image[0] and old_image[0] != 'default-avatar.png':
-            old_filepath = os.path.join(Config.UPLOAD_FOLDER, old_image[0])
-            try:
-                if os.path.exists(old_filepath):
-                    os.remove(old_filepath)
-            except OSError:
-                pass  
-        
-        conn.close()
+        # Identical images share one blob, so the old one may still be in use;
+        # the collector deletes it later only if nothing references it
+        if old_image and old_image[0] and old_image[0] != filename:
+            upload_collector.request()
         
         return jsonify({'success': True, 'filename': filename})
         
@@ -85,46 +77,38 @@ def update_profile():
         return jsonify({'error': 'Age must be between 13 and 25'}), 400
     
     try:
-        conn = get_db_connection()
-        c = conn.cursor()
-        
-        c.execute('''SELECT id FROM users WHERE (username = ? OR email = ?) AND id != ?''', 
-                  (username, email, session['user_id']))
-        if c.fetchone():
-            conn.close()
-            return jsonify({'error': 'Username or email already exists'}), 400
-        
-        c.execute('''SELECT username, email, age, skills, interests, bio 
-                    FROM users WHERE id = ?''', (session['user_id'],))
-        old_data = c.fetchone()
-        
-        c.execute('''UPDATE users SET 
-                     username = ?, email = ?, age = ?, skills = ?, interests = ?, bio = ?
-                     WHERE id = ?''',
-                  (username, email, int(age) if age else None, skills, interests, bio, session['user_id']))
-        
-        updates_to_log = [
-            ('username', old_data[0], username),
-            ('email', old_data[1], email),
-            ('age', old_data[2], age),
-            ('skills', old_data[3], skills),
-            ('interests', old_data[4], interests),
-            ('bio', old_data[5], bio)
-        ]
-        
-        for field, old_val, new_val in updates_to_log:
-            if str(old_val or '') != str(new_val or ''):
-                c.execute('''INSERT INTO profile_updates 
-                            (user_id, field_updated, old_value, new_value)
-                            VALUES (?, ?, ?, ?)''',
-                         (session['user_id'], field, str(old_val or ''), str(new_val or '')))
-        
-        conn.commit()
+        with transaction() as tx:
+            if tx.single('''SELECT id FROM users WHERE (username = ? OR email = ?) AND id != ?''', 
+                         (username, email, session['user_id'])):
+                return jsonify({'error': 'Username or email already exists'}), 400
+            
+            old_data = tx.single('''SELECT username, email, age, skills, interests, bio 
+                                   FROM users WHERE id = ?''', (session['user_id'],))
+            
+            tx.execute('''UPDATE users SET 
+                          username = ?, email = ?, age = ?, skills = ?, interests = ?, bio = ?
+                          WHERE id = ?''',
+                       (username, email, int(age) if age else None, skills, interests, bio, session['user_id']))
+            
+            updates_to_log = [
+                ('username', old_data[0], username),
+                ('email', old_data[1], email),
+                ('age', old_data[2], age),
+                ('skills', old_data[3], skills),
+                ('interests', old_data[4], interests),
+                ('bio', old_data[5], bio)
+            ]
+            
+            tx.executemany('''INSERT INTO profile_updates 
+                              (user_id, field_updated, old_value, new_value)
+                              VALUES (?, ?, ?, ?)''',
+                           [(session['user_id'], field, str(old_val or ''), str(new_val or ''))
+                            for field, old_val, new_val in updates_to_log
+                            if str(old_val or '') != str(new_val or '')])
         
         if old_data[0] != username:
             session['username'] = username
         
-        conn.close()
         return jsonify({'success': True, 'message': 'Profile updated successfully'})
         
     except sqlite3.Error as e:
@@ -135,7 +119,7 @@ def update_profile():
 @profile_bp.route('/profile')
 @login_required
 def profile():
-    conn = get_db_connection()
+    conn = get_db()
     c = conn.cursor()
     
     try:
@@ -143,7 +127,6 @@ def profile():
         user = c.fetchone()
         
         if not user:
-            conn.close()
             return redirect(url_for('auth.login'))
         
         c.execute('''SELECT id, title, problem_statement, category, created_date, 
@@ -174,54 +157,25 @@ def profile():
                 'joined_date': row[5]
             })
         
-        c.execute('SELECT COUNT(*) FROM quiz_analytics WHERE user_id = ?', (session['user_id'],))
-        total_quizzes = c.fetchone()[0]
-        
-        c.execute('SELECT AVG(accuracy) FROM quiz_analytics WHERE user_id = ?', (session['user_id'],))
-        avg_accuracy = round(c.fetchone()[0] or 0, 1)
-        
-        c.execute('''SELECT accuracy FROM quiz_analytics WHERE user_id = ? 
-                     ORDER BY quiz_date DESC LIMIT 10''', (session['user_id'],))
-        recent_scores = [round(row[0]) for row in c.fetchall()]
-        
-        c.execute('''SELECT category, AVG(accuracy) as avg_acc
-                    FROM quiz_analytics qa
-                    JOIN quiz_questions qq ON json_extract(qa.questions_data, '$[0].category') = qq.category
-                    WHERE qa.user_id = ? 
-                    GROUP BY category 
-                    ORDER BY avg_acc DESC LIMIT 1''', (session['user_id'],))
-        best_category_result = c.fetchone()
-        best_category = best_category_result[0] if best_category_result else 'Business Basics'
-        
-        improvement_rate = 0
-        if len(recent_scores) >= 6:
-            first_three = sum(recent_scores[-3:]) / 3 if len(recent_scores) >= 3 else 0
-            last_three = sum(recent_scores[:3]) / 3 if len(recent_scores) >= 3 else 0
-            if first_three > 0:
-                improvement_rate = round(((last_three - first_three) / first_three) * 100, 1)
-        
-        total_likes_received = sum(idea[6] for idea in user_ideas)  
-        total_views_received = sum(idea[5] for idea in user_ideas)  
+        stats = get_user_stats(session['user_id'])
         
         quiz_stats = {
-            'total_quizzes': total_quizzes,
-            'avg_accuracy': avg_accuracy,
-            'best_category': best_category,
-            'improvement_rate': max(0, improvement_rate),
-            'recent_scores': recent_scores
+            'total_quizzes': stats['total_quizzes'],
+            'avg_accuracy': stats['avg_accuracy'],
+            'best_category': stats['best_category'],
+            'improvement_rate': stats['improvement_rate'],
+            'recent_scores': stats['recent_scores']
         }
         
         user_stats = {
-            'total_ideas': len(user_ideas),
+            'total_ideas': stats['ideas_count'],
             'total_teams': len(user_teams),
-            'total_likes': total_likes_received,
-            'total_views': total_views_received,
-            'quiz_streak': user[9] if len(user) > 9 else 0, 
-            'total_points': user[10] if len(user) > 10 else 0  
+            'total_likes': stats['likes_received'],
+            'total_views': stats['views_received'],
+            'quiz_streak': stats['quiz_streak'], 
+            'total_points': stats['total_points']  
         }
         
-        conn.close()
-        
         return render_template('profile.html', 
                              user=user, 
                              user_ideas=user_ideas,
@@ -231,65 +185,56 @@ def profile():
                              user_stats=user_stats)
                              
     except Exception as e:
-        conn.close()
         return f"Error loading profile: {str(e)}", 500
 
 @profile_bp.route('/delete_idea/<int:idea_id>', methods=['DELETE'])
 @login_required
 def delete_idea(idea_id):
-    conn = get_db_connection()
-    c = conn.cursor()
-    
     try:
-        c.execute('SELECT user_id, title FROM ideas WHERE id = ?', (idea_id,))
-        result = c.fetchone()
-        
-        if not result:
-            conn.close()
-            return jsonify({'error': 'Idea not found'}), 404
-        
-        if result[0] != session['user_id']:
-            conn.close()
-            return jsonify({'error': 'Unauthorized - You can only delete your own ideas'}), 403
-        
-        idea_title = result[1]
-        
-        
-        c.execute('''DELETE FROM team_messages WHERE team_id IN 
-                     (SELECT team_id FROM teams WHERE idea_id = ?)''', (idea_id,))
-        
-        c.execute('DELETE FROM teams WHERE idea_id = ?', (idea_id,))
-        
-        c.execute('DELETE FROM team_applications WHERE idea_id = ?', (idea_id,))
-        
-        c.execute('DELETE FROM idea_likes WHERE idea_id = ?', (idea_id,))
-        
-        c.execute('DELETE FROM comments WHERE idea_id = ?', (idea_id,))
-        
-        c.execute('DELETE FROM idea_evaluations WHERE idea_id = ?', (idea_id,))
-        
-        c.execute('DELETE FROM ideas WHERE id = ?', (idea_id,))
-        
-        conn.commit()
-        conn.close()
-        
+        with transaction() as tx:
+            result = tx.single('SELECT user_id, title, like_count, view_count FROM ideas WHERE id = ?', (idea_id,))
+            
+            if not result:
+                return jsonify({'error': 'Idea not found'}), 404
+            
+            if result[0] != session['user_id']:
+                return jsonify({'error': 'Unauthorized - You can only delete your own ideas'}), 403
+            
+            idea_title = result[1]
+            
+            tx.execute('''DELETE FROM team_messages WHERE team_id IN 
+                          (SELECT team_id FROM teams WHERE idea_id = ?)''', (idea_id,))
+            
+            tx.execute('DELETE FROM teams WHERE idea_id = ?', (idea_id,))
+            
+            tx.execute('DELETE FROM team_applications WHERE idea_id = ?', (idea_id,))
+            
+            tx.execute('DELETE FROM idea_likes WHERE idea_id = ?', (idea_id,))
+            
+            tx.execute('DELETE FROM comments WHERE idea_id = ?', (idea_id,))
+            
+            tx.execute('DELETE FROM idea_evaluations WHERE idea_id = ?', (idea_id,))
+            
+            tx.execute('DELETE FROM ideas WHERE id = ?', (idea_id,))
+            
+            adjust_user_stats(tx, session['user_id'], ideas_count=-1, 
+                              likes_received=-result[2], views_received=-result[3])
+        
+        invalidate_idea_listing()
         return jsonify({
             'success': True, 
             'message': f'Idea "{idea_title}" and all related data deleted successfully'
         })
         
     except sqlite3.Error as e:
-        conn.rollback()
-        conn.close()
         return jsonify({'error': f'Database error: {str(e)}'}), 500
     except Exception as e:
-        conn.close()
         return jsonify({'error': f'Deletion failed: {str(e)}'}), 500
 
 @profile_bp.route('/get_profile_data')
 @login_required
 def get_profile_data():
-    conn = get_db_connection()
+    conn = get_db()
     c = conn.cursor()
     
     try:
@@ -299,7 +244,6 @@ def get_profile_data():
         user_data = c.fetchone()
         
         if not user_data:
-            conn.close()
             return jsonify({'error': 'User not found'}), 404
         
         profile_data = {
@@ -315,17 +259,15 @@ def get_profile_data():
             'join_date': user_data[9]
         }
         
-        conn.close()
         return jsonify({'success': True, 'data': profile_data})
         
     except Exception as e:
-        conn.close()
         return jsonify({'error': f'Failed to load profile data: {str(e)}'}), 500
 
 @profile_bp.route('/profile_history')
 @login_required
 def profile_history():
-    conn = get_db_connection()
+    conn = get_db()
     c = conn.cursor()
     
     try:
@@ -343,17 +285,15 @@ def profile_history():
                 'date': row[3]
             })
         
-        conn.close()
         return jsonify({'success': True, 'history': history})
         
     except Exception as e:
-        conn.close()
         return jsonify({'error': f'Failed to load profile history: {str(e)}'}), 500
 
 @profile_bp.route('/export_profile')
 @login_required
 def export_profile():
-    conn = get_db_connection()
+    conn = get_db()
     c = conn.cursor()
     
     try:
@@ -390,9 +330,7 @@ def export_profile():
             'export_date': datetime.now().isoformat()
         }
         
-        conn.close()
         return jsonify({'success': True, 'data': export_data})
         
     except Exception as e:
-        conn.close()
         return jsonify({'error': f'Failed to export profile: {str(e)}'}), 500
\ No newline at end of file
@@ -1,7 +1,8 @@
 from flask import Blueprint, render_template, request, jsonify, session
 from routes.auth import login_required
-from database import execute_query, execute_single, execute_insert
+from database import execute_query, execute_single, execute_insert, transaction
 from email_utils import send_team_application_email
+from http_cache import conditional_json, not_modified, make_etag, parse_timestamp
 import random
 from flask import Blueprint, render_template, request, jsonify, session, flash, redirect, url_for
 
@@ -23,29 +24,30 @@ def apply_to_team():
     if not idea_id or not message:
         return "Idea ID and message are required", 400
     
-    existing_application = execute_single(
-        'SELECT id FROM team_applications WHERE idea_id = ? AND applicant_username = ?', 
-        (idea_id, username)
-    )
-    
-    if existing_application:
-        return "You have already applied to this team", 400
-    
-    idea_data = execute_single('''
-        SELECT i.title, u.username, u.email 
-        FROM ideas i JOIN users u ON i.user_id = u.id 
-        WHERE i.id = ?
-    ''', (idea_id,))
-    
-    if not idea_data:
-        return "Idea not found", 404
-    
     try:
-        execute_insert('''
-            INSERT INTO team_applications 
-            (idea_id, applicant_username, message, skills, experience, availability, status, applied_date)
-            VALUES (?, ?, ?, ?, ?, ?, 'pending', datetime('now'))
-        ''', (idea_id, username, message, skills, experience, availability))
+        with transaction() as tx:
+            existing_application = tx.single(
+                'SELECT id FROM team_applications WHERE idea_id = ? AND applicant_username = ?', 
+                (idea_id, username)
+            )
+            
+            if existing_application:
+                return "You have already applied to this team", 400
+            
+            idea_data = tx.single('''
+                SELECT i.title, u.username, u.email 
+                FROM ideas i JOIN users u ON i.user_id = u.id 
+                WHERE i.id = ?
+            ''', (idea_id,))
+            
+            if not idea_data:
+                return "Idea not found", 404
+            
+            tx.insert('''
+                INSERT INTO team_applications 
+                (idea_id, applicant_username, message, skills, experience, availability, status, applied_date)
+                VALUES (?, ?, ?, ?, ?, ?, 'pending', datetime('now'))
+            ''', (idea_id, username, message, skills, experience, availability))
         
         send_team_application_email(
             idea_data[2], idea_data[1], idea_data[0], username, message, skills
@@ -67,32 +69,33 @@ def approve_application(application_id):
     applicant_name = parts[-1]
     
     try:
-        application = execute_single('''
-            SELECT ta.id, ta.idea_id, i.title, i.user_id
-            FROM team_applications ta
-            JOIN ideas i ON ta.idea_id = i.id
-            WHERE ta.applicant_username = ? AND i.title = ? AND ta.status = 'pending'
-        ''', (applicant_name, idea_title))
-        
-        if not application:
-            return "Application not found or already processed", 404
-        
-        execute_query(
-            'UPDATE team_applications SET status = ? WHERE id = ?', 
-            ('approved', application[0])
-        )
-        
-        team_result = execute_single(
-            'SELECT team_id FROM teams WHERE idea_id = ? AND is_founder = 1', 
-            (application[1],)
-        )
-        
-        if team_result:
-            team_id = team_result[0]
-            execute_insert('''
-                INSERT INTO teams (team_id, idea_id, member_username, is_founder, status)
-                VALUES (?, ?, ?, 0, 'active')
-            ''', (team_id, application[1], applicant_name))
+        with transaction() as tx:
+            application = tx.single('''
+                SELECT ta.id, ta.idea_id, i.title, i.user_id
+                FROM team_applications ta
+                JOIN ideas i ON ta.idea_id = i.id
+                WHERE ta.applicant_username = ? AND i.title = ? AND ta.status = 'pending'
+            ''', (applicant_name, idea_title))
+            
+            if not application:
+                return "Application not found or already processed", 404
+            
+            tx.execute(
+                'UPDATE team_applications SET status = ? WHERE id = ?', 
+                ('approved', application[0])
+            )
+            
+            team_result = tx.single(
+                'SELECT team_id FROM teams WHERE idea_id = ? AND is_founder = 1', 
+                (application[1],)
+            )
+            
+            if team_result:
+                team_id = team_result[0]
+                tx.insert('''
+                    INSERT INTO teams (team_id, idea_id, member_username, is_founder, status)
+                    VALUES (?, ?, ?, 0, 'active')
+                ''', (team_id, application[1], applicant_name))
         
         return f"Application approved! {applicant_name} has been added to the team for '{idea_title}'"
         
@@ -112,6 +115,18 @@ def get_team_messages(team_id):
         return jsonify([]), 403
     
     try:
+        # Polled while a chat is open; answer from count and max id first so
+        # an unchanged conversation costs one index range scan and a 304
+        count, last_id, last_sent = execute_single(
+            'SELECT COUNT(*), MAX(id), MAX(timestamp) FROM team_messages WHERE team_id = ?', 
+            (team_id,)
+        )
+        etag = make_etag('team_messages', team_id, count, last_id)
+        last_modified = parse_timestamp(last_sent)
+        cached = not_modified(etag, last_modified)
+        if cached:
+            return cached
+        
         messages_data = execute_query('''
             SELECT username, message, timestamp 
             FROM team_messages 
@@ -124,7 +139,7 @@ def get_team_messages(team_id):
             for r in messages_data
         ]
         
-        return jsonify(messages)
+        return conditional_json(messages, etag, last_modified)
         
     except Exception as e:
         print(f"Error getting team messages: {e}")
@@ -0,0 +1,42 @@
+// GET a JSON endpoint with If-None-Match, reusing the copy kept in
+// sessionStorage when the server answers 304 Not Modified.
+const CONDITIONAL_CACHE_PREFIX = 'etag-cache:';
+
+function readConditionalCache(url) {
+    try {
+        const entry = sessionStorage.getItem(CONDITIONAL_CACHE_PREFIX + url);
+        return entry ? JSON.parse(entry) : null;
+    } catch (error) {
+        return null;
+    }
+}
+
+function writeConditionalCache(url, etag, data) {
+    try {
+        sessionStorage.setItem(CONDITIONAL_CACHE_PREFIX + url, JSON.stringify({ etag, data }));
+    } catch (error) {
+        // Storage full or disabled: the next request simply is not conditional
+    }
+}
+
+async function conditionalFetch(url) {
+    const cached = readConditionalCache(url);
+    const headers = cached ? { 'If-None-Match': cached.etag } : {};
+
+    // no-store keeps the browser from revalidating a second copy of its own
+    const response = await fetch(url, { headers, cache: 'no-store' });
+
+    if (response.status === 304 && cached) {
+        return { ok: true, changed: false, status: 304, data: cached.data };
+    }
+    if (!response.ok) {
+        return { ok: false, changed: false, status: response.status, data: null };
+    }
+
+    const data = await response.json();
+    const etag = response.headers.get('ETag');
+    if (etag) {
+        writeConditionalCache(url, etag, data);
+    }
+    return { ok: true, changed: true, status: response.status, data };
+}
@@ -173,9 +173,9 @@ async function loadUserLikes() {
     if (!ideaId) return;
 
     try {
-        const response = await fetch('/api/user_likes');
-        if (response.ok) {
-            const likedIdeas = await response.json();
+        const result = await conditionalFetch('/api/user_likes');
+        if (result.ok) {
+            const likedIdeas = result.data;
             if (likedIdeas.includes(ideaId)) {
                 const heartIcon = document.getElementById('heart-icon');
                 const likeBtn = document.getElementById('like-btn');
@@ -205,6 +205,8 @@ async function incrementViewCount() {
             const viewCount = document.getElementById('view-count');
             if (viewCount && data.views) {
                 viewCount.textContent = data.views;
+            } else if (viewCount && data.queued) {
+                viewCount.textContent = (parseInt(viewCount.textContent, 10) || 0) + 1;
             }
         }
     } catch (error) {
@@ -2,9 +2,9 @@ let userLikes = new Set();
 
 async function loadUserLikes() {
     try {
-        const response = await fetch('/api/user_likes');
-        if (response.ok) {
-            const likedIdeas = await response.json();
+        const result = await conditionalFetch('/api/user_likes');
+        if (result.ok) {
+            const likedIdeas = result.data;
             if (Array.isArray(likedIdeas)) {
                 userLikes.clear();
                 likedIdeas.forEach(ideaId => {
@@ -145,6 +145,129 @@ function handleContainerClick(e) {
     }
 }
 
+function escapeHtml(value) {
+    const div = document.createElement('div');
+    div.textContent = value == null ? '' : String(value);
+    return div.innerHTML;
+}
+
+function truncate(text, length) {
+    text = text || '';
+    return text.length > length ? text.slice(0, length) + '...' : text;
+}
+
+function renderIdeaCard(idea, currentUser) {
+    const liked = userLikes.has(idea.id);
+    const tags = idea.tags
+        ? idea.tags.split(',').slice(0, 4).map(tag => `<span class="idea-tag">#${escapeHtml(tag.trim())}</span>`).join('')
+        : '';
+    const collaborate = idea.open_collaboration === 1 && idea.username !== currentUser
+        ? `<a href="/teams?apply=${idea.id}" class="btn btn-primary" style="font-size: 0.8rem; padding: 0.4rem 0.8rem;" onclick="event.stopPropagation();">🤝 Collaborate</a>`
+        : '';
+
+    const card = document.createElement('div');
+    card.className = 'idea-card fade-in';
+    card.setAttribute('data-idea-id', idea.id);
+    card.innerHTML = `
+        <div class="idea-header">
+            <div class="idea-badges">
+                <div class="idea-category">${escapeHtml(idea.category || 'General')}</div>
+                <div class="idea-stage">${escapeHtml(idea.development_stage || 'Idea')}</div>
+            </div>
+            <h3 class="idea-title">${escapeHtml(idea.title)}</h3>
+            <p class="idea-problem"><strong>Problem:</strong> ${escapeHtml(truncate(idea.problem_statement, 180))}</p>
+            <p class="idea-solution"><strong>Solution:</strong> ${escapeHtml(truncate(idea.solution_description, 150))}</p>
+            ${tags ? `<div class="idea-tags">${tags}</div>` : ''}
+        </div>
+        <div class="idea-footer">
+            <div class="idea-author">
+                <div class="author-avatar">${escapeHtml((idea.username || 'U')[0].toUpperCase())}</div>
+                <div class="author-info">
+                    <h4>${escapeHtml(idea.username)}</h4>
+                    <p>${escapeHtml(idea.created_date)}</p>
+                </div>
+            </div>
+            <div class="idea-stats">
+                <button class="like-button${liked ? ' liked' : ''}" id="like-btn-${idea.id}" data-liked="${liked}">
+                    <span class="heart">${liked ? '❤️' : '🤍'}</span> <span id="like-count-${idea.id}">${idea.like_count || 0}</span>
+                </button>
+                <button class="comment-button">
+                    💬 <span id="comment-count-${idea.id}">${idea.comment_count || 0}</span>
+                </button>
+                <div class="stat-item">
+                    👁️ ${idea.view_count || 0}
+                </div>
+                ${collaborate}
+            </div>
+        </div>`;
+    return card;
+}
+
+let loadingMore = false;
+
+async function loadMoreIdeas() {
+    const loadMore = document.getElementById('loadMore');
+    const grid = document.getElementById('ideasGrid');
+    if (!loadMore || !grid || loadingMore) return;
+
+    const cursor = loadMore.getAttribute('data-next-cursor');
+    if (!cursor) return;
+
+    loadingMore = true;
+    try {
+        const params = new URLSearchParams(window.location.search);
+        params.delete('cursor');
+        params.set('cursor', cursor);
+
+        const response = await fetch(`/api/ideas?${params.toString()}`);
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+
+        const data = await response.json();
+        const currentUser = grid.getAttribute('data-current-user');
+        data.ideas.forEach(idea => grid.appendChild(renderIdeaCard(idea, currentUser)));
+
+        if (data.next_cursor) {
+            loadMore.setAttribute('data-next-cursor', data.next_cursor);
+            const link = document.getElementById('loadMoreLink');
+            if (link) {
+                params.set('cursor', data.next_cursor);
+                link.href = `/ideas?${params.toString()}`;
+            }
+        } else {
+            loadMore.remove();
+        }
+    } catch (error) {
+        console.error('Error loading more ideas:', error);
+        showToast('Failed to load more ideas.', 'error');
+    } finally {
+        loadingMore = false;
+    }
+}
+
+function setupInfiniteScroll() {
+    const loadMore = document.getElementById('loadMore');
+    if (!loadMore) return;
+
+    const link = document.getElementById('loadMoreLink');
+    if (link) {
+        link.addEventListener('click', function(e) {
+            e.preventDefault();
+            loadMoreIdeas();
+        });
+    }
+
+    if ('IntersectionObserver' in window) {
+        const observer = new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting)) {
+                loadMoreIdeas();
+            }
+        }, { rootMargin: '400px' });
+        observer.observe(loadMore);
+    }
+}
+
 function attachEventListeners() {
     const container = document.querySelector('.container');
     if (!container) return;
@@ -156,5 +279,6 @@ function attachEventListeners() {
 document.addEventListener('DOMContentLoaded', function() {
     loadUserLikes().then(() => {
         attachEventListeners();
+        setupInfiniteScroll();
     });
 });
\ No newline at end of file
@@ -151,9 +151,9 @@
 
         async function loadQuizAnalytics() {
             try {
-                const response = await fetch('/get_quiz_analytics');
-                if (response.ok) {
-                    const analytics = await response.json();
+                const result = await conditionalFetch('/get_quiz_analytics');
+                if (result.ok) {
+                    const analytics = result.data;
                     
                     document.getElementById('total-quizzes').textContent = analytics.total_quizzes || 0;
                     document.getElementById('avg-accuracy').textContent = `${analytics.avg_accuracy || 0}%`;
@@ -249,13 +249,12 @@ async function evaluateIdea(ideaId, ideaTitle) {
         
         if (response.ok) {
             const data = await response.json();
-            console.log('Evaluation data received:', data);
+            console.log('Evaluation job queued:', data);
             
-            if (data.success && data.evaluation) {
-                displayEvaluation(data.evaluation);
-            } else {
+            if (!data.success || !data.job_id) {
                 throw new Error(data.message || 'Invalid response format');
             }
+            displayEvaluation(await waitForEvaluation(data.job_id));
         } else {
             const errorData = await response.json().catch(() => ({}));
             throw new Error(errorData.message || `Server error: ${response.status}`);
@@ -275,6 +274,24 @@ async function evaluateIdea(ideaId, ideaTitle) {
     }
 }
 
+async function waitForEvaluation(jobId) {
+    // Evaluations run in a background worker; poll until the job settles
+    while (true) {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        const response = await fetch(`/evaluation_jobs/${jobId}`);
+        const data = await response.json().catch(() => ({}));
+        if (!response.ok) {
+            throw new Error(data.error || `Server error: ${response.status}`);
+        }
+        if (data.status === 'done' && data.evaluation) {
+            return data.evaluation;
+        }
+        if (data.status === 'failed') {
+            throw new Error(data.error || 'Evaluation failed');
+        }
+    }
+}
+
 function displayEvaluation(evaluation) {
     console.log('Displaying evaluation:', evaluation);
     
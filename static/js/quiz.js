@@ -5,6 +5,8 @@
         let quizStartTime = null;
         let correctAnswers = 0;
         let totalPoints = 0;
+        let quizDifficulty = 0;
+        let quizDate = null;
 
         document.getElementById('quiz-date').textContent = new Date().toLocaleDateString('en-US', { 
             weekday: 'long', 
@@ -19,11 +21,14 @@
 
         async function loadDailyQuiz() {
             try {
-                const response = await fetch('/get_daily_quiz');
+                const difficulty = new URLSearchParams(window.location.search).get('difficulty');
+                const response = await fetch('/get_daily_quiz' + (difficulty ? `?difficulty=${encodeURIComponent(difficulty)}` : ''));
                 if (response.ok) {
                     const data = await response.json();
                     if (data.questions && data.questions.length > 0) {
                         quizQuestions = data.questions;
+                        quizDifficulty = data.difficulty || 0;
+                        quizDate = data.quiz_date;
                         quizStartTime = new Date();
                         displayQuestion(0);
                     } else {
@@ -98,23 +103,14 @@
             if (selectedAnswer === null) return;
 
             const currentQuestion = quizQuestions[currentQuestionIndex];
-            const isCorrect = selectedAnswer === currentQuestion.correct_answer;
             
             userAnswers[currentQuestionIndex] = {
                 questionId: currentQuestion.id,
                 selectedAnswer: selectedAnswer,
-                correct: isCorrect,
                 question: currentQuestion.question,
-                options: currentQuestion.options,
-                correctAnswer: currentQuestion.correct_answer,
-                explanation: currentQuestion.explanation
+                options: currentQuestion.options
             };
 
-            if (isCorrect) {
-                correctAnswers++;
-                totalPoints += 10;
-            }
-
             await submitQuizAnswer(currentQuestion.id, selectedAnswer);
 
             if (currentQuestionIndex === quizQuestions.length - 1) {
@@ -141,28 +137,42 @@
         }
 
         async function finishQuiz() {
-            const accuracy = Math.round((correctAnswers / quizQuestions.length) * 100);
             const timeTaken = Math.round((new Date() - quizStartTime) / 1000 / 60); 
             
-
+            // The server grades the quiz and sends back the answers
             try {
-                await fetch('/update_quiz_stats', {
+                const response = await fetch('/update_quiz_stats', {
                     method: 'POST',
                     headers: { 'Content-Type': 'application/json' },
                     body: JSON.stringify({
-                        questions_answered: quizQuestions.length,
-                        correct_answers: correctAnswers,
-                        accuracy: accuracy,
-                        points_earned: totalPoints,
+                        difficulty: quizDifficulty,
+                        quiz_date: quizDate,
                         time_taken: timeTaken,
-                        quiz_data: userAnswers
+                        quiz_data: userAnswers.map(answer => ({
+                            questionId: answer.questionId,
+                            selectedAnswer: answer.selectedAnswer
+                        }))
                     })
                 });
+                const grade = await response.json();
+                if (!response.ok) {
+                    showError(grade.error || 'Failed to submit quiz. Please try again.');
+                    return;
+                }
+
+                correctAnswers = grade.correct_answers;
+                totalPoints = grade.points_earned;
+                const results = new Map(grade.results.map(result => [result.questionId, result]));
+                userAnswers.forEach(answer => {
+                    const result = results.get(answer.questionId) || {};
+                    answer.correct = result.correct;
+                    answer.explanation = result.explanation;
+                });
+                displayResults(grade.accuracy, timeTaken);
             } catch (error) {
                 console.error('Error updating quiz stats:', error);
+                showError('Error submitting quiz. Please check your connection.');
             }
-
-            displayResults(accuracy, timeTaken);
         }
 
         function displayResults(accuracy, timeTaken) {
@@ -235,18 +245,16 @@
                                             <strong>Your answer:</strong> ${String.fromCharCode(65 + answer.selectedAnswer)}. ${answer.options[answer.selectedAnswer]}
                                         </div>
                                     </div>
-                                    ${!answer.correct ? `
-                                        <div class="answer-row">
-                                            <div class="answer-status correct">✓</div>
-                                            <div class="answer-text">
-                                                <strong>Correct answer:</strong> ${String.fromCharCode(65 + answer.correctAnswer)}. ${answer.options[answer.correctAnswer]}
-                                            </div>
-                                        </div>
-                                    ` : ''}
-                                </div>
-                                <div class="answer-explanation">
-                                    💡 <strong>Explanation:</strong> ${answer.explanation}
                                 </div>
+                                ${answer.explanation ? `
+                                    <div class="answer-explanation">
+                                        💡 <strong>Explanation:</strong> ${answer.explanation}
+                                    </div>
+                                ` : `
+                                    <div class="answer-explanation">
+                                        💡 Correct answers stay hidden while this quiz is still open to other players.
+                                    </div>
+                                `}
                             </div>
                         `).join('')}
                     </div>
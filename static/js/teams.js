@@ -43,7 +43,7 @@
             document.body.style.overflow = 'hidden';
             
             // Load chat messages
-            loadChatMessages(teamId);
+            loadChatMessages(teamId, true);
             
             // Start polling for new messages
             chatInterval = setInterval(() => {
@@ -63,12 +63,12 @@
             }
         }
 
-        async function loadChatMessages(teamId) {
+        async function loadChatMessages(teamId, forceRender = false) {
             try {
-                const response = await fetch(`/api/team_messages/${teamId}`);
-                if (response.ok) {
-                    const messages = await response.json();
-                    renderChatMessages(messages);
+                const result = await conditionalFetch(`/api/team_messages/${teamId}`);
+                // Unchanged polls leave the rendered chat (and its scroll position) alone
+                if (result.ok && (result.changed || forceRender)) {
+                    renderChatMessages(result.data);
                 }
             } catch (error) {
                 console.error('Error loading chat messages:', error);
@@ -0,0 +1,239 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+import click
+from database import execute_query
+from image_variants import remove_variants
+
+CHUNK_SIZE = 65536
+KEY_PATTERN = re.compile(r'^[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(\.[a-z0-9]+)?$')
+# Flat names written by the upload route before content addressing
+LEGACY_PATTERN = re.compile(r'^profile_\d+_\d+_[^/]+$')
+
+# Every column that may hold an upload key; anything not listed here is
+# treated as unreferenced by the collector
+REFERENCES = [('users', 'profile_image')]
+
+def blob_key(digest, ext=''):
+    # Two levels of 256 directories keep each listing small even with
+    # millions of blobs
+    return f'{digest[:2]}/{digest[2:4]}/{digest}{ext.lower()}'
+
+class BlobStore:
+    # Keys are content addresses, so put() of an existing key is a no-op and
+    # a blob is never rewritten in place. The primitives map directly onto
+    # object-store calls (HEAD, PUT, COPY-in-place, DELETE, LIST)
+    name = 'base'
+
+    def exists(self, key):
+        raise NotImplementedError
+
+    def put(self, key, path):
+        raise NotImplementedError
+
+    def touch(self, key):
+        raise NotImplementedError
+
+    def modified_at(self, key):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def iter_keys(self):
+        raise NotImplementedError
+
+    def staging_dir(self):
+        return None
+
+    def save(self, stream, ext=''):
+        # Hash while spooling to disk so large uploads are never held in memory
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=self.staging_dir(), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    f.write(chunk)
+            key = blob_key(digest.hexdigest(), ext)
+            if self.exists(key):
+                # Refresh the timestamp so the collector's grace period covers
+                # the reference about to be written
+                self.touch(key)
+                return key, False
+            self.put(key, tmp_path)
+            return key, True
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+class FilesystemBlobStore(BlobStore):
+    name = 'filesystem'
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, key):
+        return os.path.join(self.root, *key.split('/'))
+
+    def staging_dir(self):
+        # Same filesystem as the blobs, so put() is an atomic rename
+        path = os.path.join(self.root, '.staging')
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def exists(self, key):
+        return os.path.isfile(self._path(key))
+
+    def put(self, key, path):
+        target = self._path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(path, target)
+
+    def touch(self, key):
+        os.utime(self._path(key))
+
+    def modified_at(self, key):
+        try:
+            return os.path.getmtime(self._path(key))
+        except FileNotFoundError:
+            return None
+
+    def delete(self, key):
+        path = self._path(key)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        # Drop shard directories left empty; a concurrent put() recreates them
+        for directory in (os.path.dirname(path), os.path.dirname(os.path.dirname(path))):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                break
+        return True
+
+    def iter_keys(self):
+        if not os.path.isdir(self.root):
+            return
+        for entry in os.scandir(self.root):
+            if entry.is_file() and LEGACY_PATTERN.match(entry.name):
+                yield entry.name, entry.stat().st_mtime
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [name for name in dirnames if not name.startswith('.')]
+            for filename in filenames:
+                key = os.path.relpath(os.path.join(dirpath, filename), self.root).replace(os.sep, '/')
+                if KEY_PATTERN.match(key):
+                    yield key, os.path.getmtime(os.path.join(dirpath, filename))
+
+def create_store(name='filesystem', root='static/uploads'):
+    if name == 'filesystem':
+        return FilesystemBlobStore(root)
+    raise ValueError(f"Unknown upload store '{name}'")
+
+def referenced_keys():
+    keys = set()
+    for table, column in REFERENCES:
+        keys.update(row[0] for row in execute_query(f'SELECT DISTINCT {column} FROM {table} WHERE {column} IS NOT NULL'))
+    return keys
+
+class UploadCollector:
+    def __init__(self, store=None, interval=3600.0, grace=3600.0, static_prefix='uploads'):
+        self.store = store
+        self.interval = interval
+        self.grace = grace
+        self.static_prefix = static_prefix
+        self.static_folder = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._runs = 0
+        self._deleted = 0
+        self._last_run_ms = 0.0
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._thread = threading.Thread(target=self._run, name='upload-gc', daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def request(self):
+        # Called after a reference is dropped; the sweep still honours the
+        # grace period, so waking early is always safe
+        if self._thread is not None and self._pid == os.getpid():
+            self._wake.set()
+
+    def collect(self):
+        start = time.perf_counter()
+        # List before reading references: a blob uploaded after the listing
+        # is not a candidate, and one re-used after it has a fresh timestamp
+        candidates = list(self.store.iter_keys())
+        referenced = referenced_keys()
+        cutoff = time.time() - self.grace
+        deleted = 0
+        for key, modified in candidates:
+            if key in referenced or modified > cutoff:
+                continue
+            modified = self.store.modified_at(key)
+            if modified is None or modified > cutoff:
+                continue
+            if self.store.delete(key):
+                deleted += 1
+                if self.static_folder:
+                    remove_variants(self.static_folder, f'{self.static_prefix}/{key}')
+        with self._lock:
+            self._runs += 1
+            self._deleted += deleted
+            self._last_run_ms = (time.perf_counter() - start) * 1000
+        return len(candidates), deleted
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.collect()
+            except Exception as e:
+                print(f"Error collecting unreferenced uploads: {e}")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'store': self.store.name if self.store else None,
+                'runs': self._runs,
+                'deleted': self._deleted,
+                'last_run_ms': round(self._last_run_ms, 3),
+                'interval': self.interval,
+                'grace': self.grace
+            }
+
+upload_collector = UploadCollector()
+
+def get_upload_store():
+    return upload_collector.store
+
+@click.command('gc-uploads')
+@click.option('--grace', type=float, default=None, help='Only delete blobs unmodified for this many seconds.')
+def gc_uploads_command(grace):
+    if grace is not None:
+        upload_collector.grace = grace
+    scanned, deleted = upload_collector.collect()
+    print(f"Scanned {scanned} uploads, deleted {deleted} unreferenced")
+
+def init_app(app):
+    # Relative to the app, like the migrations, not to the working directory
+    upload_folder = os.path.join(app.root_path, app.config.get('UPLOAD_FOLDER', 'static/uploads'))
+    upload_collector.store = create_store(app.config.get('UPLOAD_STORE', 'filesystem'), upload_folder)
+    upload_collector.interval = app.config.get('UPLOAD_GC_INTERVAL', upload_collector.interval)
+    upload_collector.grace = app.config.get('UPLOAD_GC_GRACE', upload_collector.grace)
+    upload_collector.static_folder = app.static_folder
+    upload_collector.static_prefix = os.path.relpath(os.path.abspath(upload_folder), app.static_folder).replace(os.sep, '/')
+    app.cli.add_command(gc_uploads_command)
+    if app.config.get('UPLOAD_GC_ENABLED'):
+        upload_collector.start()
@@ -0,0 +1,143 @@
+import json
+import click
+from database import execute_single, transaction
+
+RECENT_SCORES_LIMIT = 10
+
+# Counters adjusted by the write paths (submit/delete idea, likes, views) so
+# pages read one user_stats row instead of aggregating ideas and quiz_analytics
+COUNTER_COLUMNS = ('ideas_count', 'likes_received', 'views_received')
+
+REBUILD_QUERY = '''
+    INSERT OR REPLACE INTO user_stats 
+    (user_id, ideas_count, likes_received, views_received, total_quizzes, accuracy_sum, recent_scores, updated_at)
+    SELECT 
+        u.id,
+        (SELECT COUNT(*) FROM ideas WHERE user_id = u.id),
+        (SELECT COALESCE(SUM(like_count), 0) FROM ideas WHERE user_id = u.id),
+        (SELECT COALESCE(SUM(view_count), 0) FROM ideas WHERE user_id = u.id),
+        (SELECT COUNT(*) FROM quiz_analytics WHERE user_id = u.id),
+        (SELECT COALESCE(SUM(accuracy), 0) FROM quiz_analytics WHERE user_id = u.id),
+        (SELECT json_group_array(accuracy) FROM (
+            SELECT accuracy FROM quiz_analytics WHERE user_id = u.id 
+            ORDER BY quiz_date DESC, id DESC LIMIT {limit}
+        )),
+        CURRENT_TIMESTAMP
+    FROM users u
+'''.format(limit=RECENT_SCORES_LIMIT)
+
+def rebuild_user_stats(conn, user_id=None):
+    if user_id is None:
+        return conn.execute(REBUILD_QUERY).rowcount
+    return conn.execute(REBUILD_QUERY + ' WHERE u.id = ?', (user_id,)).rowcount
+
+def _ensure_row(tx, user_id):
+    tx.execute('INSERT OR IGNORE INTO user_stats (user_id) VALUES (?)', (user_id,))
+
+def adjust_user_stats(tx, user_id, **deltas):
+    unknown = set(deltas) - set(COUNTER_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown user_stats columns: {', '.join(sorted(unknown))}")
+    if not deltas:
+        return
+    
+    _ensure_row(tx, user_id)
+    assignments = ', '.join(f'{column} = MAX({column} + ?, 0)' for column in deltas)
+    tx.execute(
+        f'UPDATE user_stats SET {assignments}, updated_at = CURRENT_TIMESTAMP WHERE user_id = ?',
+        (*deltas.values(), user_id)
+    )
+
+def adjust_idea_owner_stats(tx, idea_id, **deltas):
+    owner = tx.single('SELECT user_id FROM ideas WHERE id = ?', (idea_id,))
+    if owner and owner[0] is not None:
+        adjust_user_stats(tx, owner[0], **deltas)
+
+def add_views_received(tx, idea_deltas):
+    # Batched form for the view buffer flush: one upsert per idea, no lookups
+    tx.executemany('''
+        INSERT INTO user_stats (user_id, views_received)
+        SELECT user_id, ? FROM ideas WHERE id = ? AND user_id IS NOT NULL
+        ON CONFLICT (user_id) DO UPDATE SET 
+        views_received = views_received + excluded.views_received,
+        updated_at = CURRENT_TIMESTAMP
+    ''', [(delta, idea_id) for idea_id, delta in idea_deltas])
+
+def record_quiz_result(tx, user_id, accuracy):
+    _ensure_row(tx, user_id)
+    row = tx.single('SELECT recent_scores FROM user_stats WHERE user_id = ?', (user_id,))
+    recent_scores = ([accuracy] + json.loads(row[0] or '[]'))[:RECENT_SCORES_LIMIT]
+    tx.execute('''
+        UPDATE user_stats SET 
+        total_quizzes = total_quizzes + 1,
+        accuracy_sum = accuracy_sum + ?,
+        recent_scores = ?,
+        updated_at = CURRENT_TIMESTAMP
+        WHERE user_id = ?
+    ''', (accuracy, json.dumps(recent_scores), user_id))
+
+def record_quiz_answers(tx, quiz_id, user_id, answers):
+    # Category and correctness come from quiz_questions, not the client payload;
+    # trg_quiz_answers_insert folds each row into quiz_category_stats
+    rows = []
+    for answer in answers:
+        if not isinstance(answer, dict) or answer.get('questionId') is None:
+            continue
+        selected = answer.get('selectedAnswer')
+        rows.append((quiz_id, user_id, selected, selected, answer['questionId']))
+    
+    tx.executemany('''
+        INSERT INTO quiz_answers (quiz_id, user_id, question_id, category, selected_answer, is_correct)
+        SELECT ?, ?, q.id, COALESCE(q.category, 'General'), ?, q.correct_answer IS ?
+        FROM quiz_questions q WHERE q.id = ?
+    ''', rows)
+    return len(rows)
+
+def improvement_rate(recent_scores):
+    # recent_scores is newest first; compare the latest three to the oldest three
+    if len(recent_scores) < 6:
+        return 0
+    
+    earliest = sum(recent_scores[-3:]) / 3
+    latest = sum(recent_scores[:3]) / 3
+    if earliest <= 0:
+        return 0
+    return max(0, round(((latest - earliest) / earliest) * 100, 1))
+
+def get_user_stats(user_id):
+    row = execute_single('''
+        SELECT u.quiz_streak, u.total_points, s.ideas_count, s.likes_received, s.views_received,
+               s.total_quizzes, s.accuracy_sum, s.recent_scores, s.updated_at,
+               (SELECT category FROM quiz_category_stats c WHERE c.user_id = u.id 
+                ORDER BY accuracy DESC, answered DESC LIMIT 1) as best_category
+        FROM users u LEFT JOIN user_stats s ON s.user_id = u.id
+        WHERE u.id = ?
+    ''', (user_id,))
+    if not row:
+        return None
+    
+    total_quizzes = row['total_quizzes'] or 0
+    recent_scores = [round(score) for score in json.loads(row['recent_scores'] or '[]')]
+    return {
+        'quiz_streak': row['quiz_streak'] or 0,
+        'total_points': row['total_points'] or 0,
+        'ideas_count': row['ideas_count'] or 0,
+        'likes_received': row['likes_received'] or 0,
+        'views_received': row['views_received'] or 0,
+        'total_quizzes': total_quizzes,
+        'avg_accuracy': round(row['accuracy_sum'] / total_quizzes, 1) if total_quizzes else 0,
+        'recent_scores': recent_scores,
+        'improvement_rate': improvement_rate(recent_scores),
+        'best_category': row['best_category'],
+        'updated_at': row['updated_at']
+    }
+
+@click.command('rebuild-user-stats')
+@click.option('--user-id', type=int, default=None, help='Rebuild a single user instead of everyone.')
+def rebuild_user_stats_command(user_id):
+    with transaction() as tx:
+        rebuilt = rebuild_user_stats(tx.conn, user_id)
+    print(f"Rebuilt user_stats for {rebuilt} user(s)")
+
+def init_app(app):
+    app.cli.add_command(rebuild_user_stats_command)
@@ -0,0 +1,148 @@
+import atexit
+import os
+import threading
+import time
+from database import transaction
+from user_stats import add_views_received
+
+class ViewCountBuffer:
+    # While the database is unreachable, flushes back off up to
+    # MAX_RETRY_DELAY and views for ideas beyond max_pending_ideas are dropped
+    MAX_RETRY_DELAY = 60.0
+
+    def __init__(self, flush_interval=5.0, max_events=500, max_pending_ideas=10000):
+        self.flush_interval = flush_interval
+        self.max_events = max_events
+        self.max_pending_ideas = max_pending_ideas
+        self._reset()
+        self._atexit_registered = False
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        # Runs in a forked child too: views buffered by the parent belong to
+        # the parent's flush, so the child starts empty to avoid counting twice.
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending = {}
+        self._events = 0
+        self._thread = None
+        self._pid = os.getpid()
+        self._flushes = 0
+        self._flushed_views = 0
+        self._failed_flushes = 0
+        self._consecutive_failures = 0
+        self._dropped_views = 0
+        self._last_flush_ms = 0.0
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='view-count-flush', daemon=True)
+            self._thread.start()
+        if not self._atexit_registered:
+            atexit.register(self.flush)
+            self._atexit_registered = True
+
+    def _add(self, idea_id, delta):
+        # Caller holds self._lock
+        if idea_id not in self._pending and len(self._pending) >= self.max_pending_ideas:
+            self._dropped_views += delta
+            return
+        self._pending[idea_id] = self._pending.get(idea_id, 0) + delta
+        self._events += delta
+
+    def record(self, idea_id):
+        with self._lock:
+            self._add(idea_id, 1)
+            # Backing off after a failure; the next timed flush picks these up
+            flush_now = self._events >= self.max_events and not self._consecutive_failures
+        if self._thread is None or self._pid != os.getpid():
+            self.start()
+        if flush_now:
+            self._wake.set()
+
+    def pending(self, idea_id):
+        with self._lock:
+            return self._pending.get(idea_id, 0)
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._events = 0
+            if not batch:
+                return 0
+
+            start = time.perf_counter()
+            try:
+                # Deltas are added to the stored value, so workers flushing
+                # their own buffers never overwrite each other's counts
+                with transaction() as tx:
+                    tx.executemany(
+                        'UPDATE ideas SET view_count = view_count + ? WHERE id = ?',
+                        [(delta, idea_id) for idea_id, delta in batch.items()]
+                    )
+                    add_views_received(tx, batch.items())
+            except Exception:
+                with self._lock:
+                    for idea_id, delta in batch.items():
+                        self._add(idea_id, delta)
+                    self._failed_flushes += 1
+                    self._consecutive_failures += 1
+                raise
+
+            views = sum(batch.values())
+            with self._lock:
+                self._flushes += 1
+                self._flushed_views += views
+                self._consecutive_failures = 0
+                self._last_flush_ms = (time.perf_counter() - start) * 1000
+            # Listing pages and idea details are cached with their view
+            # counts, so drop them once the new counts are stored
+            from idea_listing import invalidate_idea_listing
+            invalidate_idea_listing()
+            return views
+
+    def _retry_delay(self):
+        with self._lock:
+            failures = self._consecutive_failures
+        if not failures:
+            return self.flush_interval
+        return min(self.flush_interval * 2 ** failures, max(self.MAX_RETRY_DELAY, self.flush_interval))
+
+    def _run(self):
+        while True:
+            self._wake.wait(self._retry_delay())
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error flushing view counts: {e}")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pending_ideas': len(self._pending),
+                'pending_views': sum(self._pending.values()),
+                'flushes': self._flushes,
+                'flushed_views': self._flushed_views,
+                'failed_flushes': self._failed_flushes,
+                'consecutive_failures': self._consecutive_failures,
+                'dropped_views': self._dropped_views,
+                'last_flush_ms': round(self._last_flush_ms, 3),
+                'flush_interval': self.flush_interval,
+                'max_events': self.max_events,
+                'max_pending_ideas': self.max_pending_ideas
+            }
+
+view_counter = ViewCountBuffer()
+
+def init_app(app):
+    view_counter.flush_interval = app.config.get('VIEW_FLUSH_INTERVAL', view_counter.flush_interval)
+    view_counter.max_events = app.config.get('VIEW_FLUSH_MAX_EVENTS', view_counter.max_events)
+    view_counter.max_pending_ideas = app.config.get('VIEW_BUFFER_MAX_PENDING_IDEAS', view_counter.max_pending_ideas)
+    if app.config.get('VIEW_BUFFER_ENABLED'):
+        view_counter.start()